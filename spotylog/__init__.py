@@ -1,6 +1,13 @@
+from .analytics import ListeningStats
+from .async_client import AsyncSpotifyClient
 from .auth import SpotifyAuth
+from .cache import ResponseCache
 from .client import SpotifyClient
-from .models import Track, Playlist
+from .history import HistoryLogger, HistoryStore
+from .models import Album, Artist, Playlist, Track, TrackBatch
+from .sessions import Session, Sessionizer, sessionize
 from .utils import format_track_info
 
-__all__ = ["SpotifyAuth", "SpotifyClient", "Track", "Playlist", "format_track_info"]
\ No newline at end of file
+__all__ = ["AsyncSpotifyClient", "SpotifyAuth", "ResponseCache", "SpotifyClient", "HistoryStore", "HistoryLogger",
+           "ListeningStats", "Track", "Playlist", "Artist", "Album", "TrackBatch", "Session", "Sessionizer",
+           "sessionize", "format_track_info"]
\ No newline at end of file
@@ -0,0 +1,255 @@
+from collections import Counter
+from .utils import timestamp_ms
+
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Listening analytics need the numpy package. Install it with `pip install numpy`.")
+    return numpy
+
+class _Vocabulary:
+    def __init__(self):
+        """Map repeated values, such as artist IDs, to consecutive integer codes."""
+        self.codes = {}
+        self.values = []
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+class ListeningStats:
+    def __init__(self, store):
+        """
+        Top tracks, artists, albums and genres, listening time and heatmaps over any window of a HistoryStore.
+
+        Plays are loaded once into columnar NumPy arrays, with tracks, artists and albums
+        dictionary-encoded as integer codes, and every aggregate is a vectorized group-by
+        (numpy.bincount) over the slice of those arrays that falls in the window. refresh()
+        only reads the plays stored since the previous call, and all-time totals are
+        updated from those alone, so a dashboard refresh costs milliseconds.
+
+        Args:
+            store (HistoryStore): The listening history to analyse.
+        """
+        np = self._np = _import_numpy()
+        self.store = store
+        self.cursor = None
+        self.played_at = np.empty(0, np.int64)
+        self.durations = np.empty(0, np.int64)
+        self.tracks = np.empty(0, np.int64)
+        self.albums = np.empty(0, np.int64)
+        # Plays of tracks with several artists count for each of them, so artists are
+        # kept flattened, with the play row each artist code belongs to. Artists are
+        # coded by their IDs from the store's play_artists table
+        self.artists = np.empty(0, np.int64)
+        self.artist_rows = np.empty(0, np.int64)
+        self._tracks = _Vocabulary()
+        self._track_names = []
+        self._albums = _Vocabulary()
+        self._artists = _Vocabulary()
+        self._artist_names = {}
+        self._totals = {}
+        self._buffers = {}
+        self.refresh()
+
+    def _append(self, name, values):
+        """Append to a column, growing its buffer geometrically so refreshes don't copy the whole history."""
+        np = self._np
+        column = getattr(self, name)
+        size = len(column) + len(values)
+        buffer = self._buffers.get(name)
+        if buffer is None or size > len(buffer):
+            buffer = np.empty(max(size, 2 * len(column), 1024), np.int64)
+            buffer[:len(column)] = column
+            self._buffers[name] = buffer
+        buffer[len(column):size] = values
+        setattr(self, name, buffer[:size])
+
+    def refresh(self):
+        """
+        Load the plays stored since the last refresh and update the all-time totals.
+
+        Plays are read after the newest one already loaded, as HistoryLogger stores them.
+
+        Returns:
+            int: The number of new plays loaded.
+        """
+        np = self._np
+        offset = len(self.played_at)
+        played_at, durations, tracks, albums, artists, artist_rows = [], [], [], [], [], []
+        start = self.cursor + 1 if self.cursor is not None else None
+        for row in self.store.plays(start=start, batch_size=10000):
+            track_key = row["track_id"] or row["track_name"]
+            code = self._tracks.code(track_key)
+            if code == len(self._track_names):
+                self._track_names.append(row["track_name"])
+            played_at.append(row["played_at"])
+            durations.append(row["duration_ms"] or 0)
+            tracks.append(code)
+            albums.append(self._albums.code(row["album"]))
+            if row["artist_ids"]:
+                for artist_id in row["artist_ids"].split(","):
+                    artists.append(self._artists.code(artist_id))
+                    artist_rows.append(offset + len(played_at) - 1)
+        if not played_at:
+            return 0
+        if len(self._artist_names) < len(self._artists.values):
+            self._artist_names = self.store.artist_names()
+
+        new = {
+            "played_at": np.array(played_at, np.int64),
+            "durations": np.array(durations, np.int64),
+            "tracks": np.array(tracks, np.int64),
+            "albums": np.array(albums, np.int64),
+            "artists": np.array(artists, np.int64),
+            "artist_rows": np.array(artist_rows, np.int64),
+        }
+        for name, values in new.items():
+            self._append(name, values)
+        self.cursor = played_at[-1]
+
+        # Fold the new plays into the all-time totals instead of recounting everything
+        new_artist_durations = new["durations"][new["artist_rows"] - offset]
+        for name, codes, weights in (("tracks", new["tracks"], new["durations"]),
+                                     ("albums", new["albums"], new["durations"]),
+                                     ("artists", new["artists"], new_artist_durations)):
+            size = len(getattr(self, f"_{name}").values)
+            for by, counts in (("plays", np.bincount(codes, minlength=size)),
+                               ("minutes", np.bincount(codes, weights=weights, minlength=size) / 60000)):
+                total = self._totals.get((name, by))
+                if total is not None:
+                    counts[:len(total)] += total
+                self._totals[(name, by)] = counts
+        return len(played_at)
+
+    def _window(self, start, end):
+        """Return the [lo, hi) play rows between two timestamps, found by binary search."""
+        np = self._np
+        lo = 0 if start is None else int(np.searchsorted(self.played_at, timestamp_ms(start), "left"))
+        hi = len(self.played_at) if end is None else int(np.searchsorted(self.played_at, timestamp_ms(end), "left"))
+        return lo, max(lo, hi)
+
+    def _counts(self, name, start, end, by):
+        """Count plays, or sum minutes, per code of `name` in a window."""
+        if by not in ("plays", "minutes"):
+            raise ValueError(f"Unknown measure: {by!r}. Use 'plays' or 'minutes'.")
+        if start is None and end is None:
+            return self._totals.get((name, by), self._np.zeros(0))
+        np = self._np
+        lo, hi = self._window(start, end)
+        size = len(getattr(self, f"_{name}").values)
+        if name == "artists":
+            first, last = np.searchsorted(self.artist_rows, [lo, hi], "left")
+            codes = self.artists[first:last]
+            weights = self.durations[self.artist_rows[first:last]]
+        else:
+            codes = getattr(self, name)[lo:hi]
+            weights = self.durations[lo:hi]
+        if by == "plays":
+            return np.bincount(codes, minlength=size)
+        return np.bincount(codes, weights=weights, minlength=size) / 60000
+
+    def _top(self, counts, n):
+        """Return the codes and values of the `n` largest non-zero counts, largest first."""
+        np = self._np
+        order = np.argsort(-counts, kind="stable")[:n]
+        order = order[counts[order] > 0]
+        return order, counts[order]
+
+    def top_tracks(self, n=10, start=None, end=None, by="plays"):
+        """
+        Return the most played tracks in a window.
+
+        Args:
+            n (int): The number of tracks to return.
+            start: The start of the window, as a datetime, an ISO 8601 string or Unix milliseconds. None for no limit.
+            end: The end of the window, excluded, in the same forms.
+            by (str): Rank by "plays" or listening "minutes".
+
+        Returns:
+            list: (track_id, track_name, plays or minutes) tuples, largest first.
+        """
+        codes, values = self._top(self._counts("tracks", start, end, by), n)
+        return [(self._tracks.values[code], self._track_names[code], value.item()) for code, value in zip(codes, values)]
+
+    def top_artists(self, n=10, start=None, end=None, by="plays"):
+        """
+        Return the most played artists in a window.
+
+        Every artist of a track is counted for its plays. Artists without an ID, such as
+        those of local files, are not counted.
+
+        Args:
+            n (int): The number of artists to return.
+            start: The start of the window, as for top_tracks().
+            end: The end of the window, excluded.
+            by (str): Rank by "plays" or listening "minutes".
+
+        Returns:
+            list: (artist_id, artist_name, plays or minutes) tuples, largest first.
+        """
+        codes, values = self._top(self._counts("artists", start, end, by), n)
+        artist_ids = self._artists.values
+        return [(artist_ids[code], self._artist_names.get(artist_ids[code]), value.item()) for code, value in zip(codes, values)]
+
+    def top_albums(self, n=10, start=None, end=None, by="plays"):
+        """Return the most played albums in a window, as (album, plays or minutes) tuples, largest first."""
+        codes, values = self._top(self._counts("albums", start, end, by), n)
+        return [(self._albums.values[code], value.item()) for code, value in zip(codes, values)]
+
+    def top_genres(self, genres, n=10, start=None, end=None, by="plays"):
+        """
+        Return the most played genres in a window.
+
+        The history does not record genres, so they come from the artists' genres.
+
+        Args:
+            genres (dict): Maps artist IDs to their genres, e.g. from the "genres" of artist objects.
+            n (int): The number of genres to return.
+            start: The start of the window, as for top_tracks().
+            end: The end of the window, excluded.
+            by (str): Rank by "plays" or listening "minutes".
+
+        Returns:
+            list: (genre, plays or minutes) tuples, largest first.
+        """
+        counts = self._counts("artists", start, end, by)
+        totals = Counter()
+        for code in self._np.flatnonzero(counts):
+            for genre in genres.get(self._artists.values[code], ()):
+                totals[genre] += counts[code].item()
+        return totals.most_common(n)
+
+    def listening_minutes(self, start=None, end=None):
+        """Return the total listening time in a window, in minutes."""
+        lo, hi = self._window(start, end)
+        return self.durations[lo:hi].sum().item() / 60000
+
+    def play_count(self, start=None, end=None):
+        """Return the number of plays in a window."""
+        lo, hi = self._window(start, end)
+        return hi - lo
+
+    def hour_heatmap(self, start=None, end=None, utc_offset=0):
+        """
+        Count plays by day of the week and hour of the day.
+
+        Args:
+            start: The start of the window, as for top_tracks().
+            end: The end of the window, excluded.
+            utc_offset (int): The offset of the local time zone from UTC, in seconds.
+
+        Returns:
+            numpy.ndarray: A 7 x 24 array of play counts, with Monday as row 0 and midnight as column 0.
+        """
+        np = self._np
+        lo, hi = self._window(start, end)
+        seconds = self.played_at[lo:hi] // 1000 + utc_offset
+        # 1 January 1970 was a Thursday, day 3 of a week starting on Monday
+        weekdays = (seconds // 86400 + 3) % 7
+        hours = seconds // 3600 % 24
+        return np.bincount(weekdays * 24 + hours, minlength=7 * 24).reshape(7, 24)
\ No newline at end of file
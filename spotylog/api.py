@@ -0,0 +1,296 @@
+# Request builders shared by SpotifyClient and AsyncSpotifyClient. Each builder describes
+# one Spotify Web API call without sending it, so the blocking and the async client send
+# exactly the same requests and parse the responses the same way.
+from collections import namedtuple
+from .diff import diff_tracks
+
+# A Spotify Web API call. `parse` turns the decoded body into the client method's return
+# value (the body itself if None) and `container` names the key holding the paging
+# object of a paged endpoint, e.g. "albums" for browse/new-releases.
+ApiRequest = namedtuple("ApiRequest", ["method", "endpoint", "params", "data", "parse", "container"],
+                        defaults=(None, None, None, None))
+
+# Maximum number of IDs or URIs the API accepts in a single request
+LIBRARY_BATCH_SIZE = 50
+PLAYLIST_BATCH_SIZE = 100
+
+# Minimal `fields` projections for playlist snapshots: only track IDs and the paging
+# data needed to fetch the remaining pages, instead of full track, album and artist objects
+SNAPSHOT_TRACK_FIELDS = "total,limit,offset,next,items(track(id,uri))"
+SNAPSHOT_FIELDS = f"id,name,snapshot_id,tracks({SNAPSHOT_TRACK_FIELDS})"
+
+def _params(**params):
+    """Build query parameters, leaving out the ones set to None."""
+    return {key: value for key, value in params.items() if value is not None} or None
+
+def _items(body):
+    return body.get("items", [])
+
+def _device(endpoint, device_id):
+    return f"{endpoint}?device_id={device_id}" if device_id else endpoint
+
+def search(query, type="track", limit=10):
+    """Search for tracks, albums, artists, or playlists."""
+    return ApiRequest("get", "search", _params(q=query, type=type, limit=limit))
+
+def user_playlists(limit=None):
+    """Get a page of the current user's playlists."""
+    return ApiRequest("get", "me/playlists", _params(limit=limit))
+
+def create_playlist(user_id, name, description="", public=False):
+    """Create a new playlist for the user."""
+    data = {
+        "name": name,
+        "description": description,
+        "public": public,
+    }
+    return ApiRequest("post", f"users/{user_id}/playlists", data=data)
+
+def recently_played(after=None, before=None, limit=50):
+    """Get the recently played tracks, returning the list of play history items."""
+    return ApiRequest("get", "me/player/recently-played", _params(limit=limit, after=after, before=before), parse=_items)
+
+def top_items(kind, time_range="medium_term", limit=20):
+    """Get the user's top "tracks" or "artists", returning the list of items."""
+    return ApiRequest("get", f"me/top/{kind}", _params(time_range=time_range, limit=limit), parse=_items)
+
+def playlist(playlist_id, fields=None):
+    """Get a playlist, including the first page of its tracks, optionally projected to `fields`."""
+    return ApiRequest("get", f"playlists/{playlist_id}", _params(fields=fields))
+
+def playlist_tracks(playlist_id, limit=100, fields=None):
+    """Get a page of a playlist's tracks, optionally projected to `fields`."""
+    return ApiRequest("get", f"playlists/{playlist_id}/tracks", _params(limit=limit, fields=fields))
+
+def saved_tracks(limit=50):
+    """Get a page of the tracks saved in the user's library."""
+    return ApiRequest("get", "me/tracks", _params(limit=limit))
+
+def start_playback(device_id=None, context_uri=None, uris=None):
+    """Start or resume playback on a device."""
+    data = {}
+    if context_uri:
+        data["context_uri"] = context_uri
+    if uris:
+        data["uris"] = uris
+    return ApiRequest("put", _device("me/player/play", device_id), data=data)
+
+def pause_playback(device_id=None):
+    """Pause playback on a device."""
+    return ApiRequest("put", _device("me/player/pause", device_id))
+
+def skip_to_next(device_id=None):
+    """Skip to the next track."""
+    return ApiRequest("post", _device("me/player/next", device_id))
+
+def skip_to_previous(device_id=None):
+    """Skip to the previous track."""
+    return ApiRequest("post", _device("me/player/previous", device_id))
+
+def set_volume(volume_percent, device_id=None):
+    """Set the playback volume."""
+    endpoint = f"me/player/volume?volume_percent={volume_percent}"
+    return ApiRequest("put", f"{endpoint}&device_id={device_id}" if device_id else endpoint)
+
+def save_tracks(track_ids):
+    """Save one batch of at most LIBRARY_BATCH_SIZE tracks to the user's library."""
+    return ApiRequest("put", "me/tracks", data={"ids": track_ids})
+
+def remove_tracks(track_ids):
+    """Remove one batch of at most LIBRARY_BATCH_SIZE tracks from the user's library."""
+    return ApiRequest("delete", "me/tracks", data={"ids": track_ids})
+
+def check_saved_tracks(track_ids):
+    """Check if one batch of at most LIBRARY_BATCH_SIZE tracks is saved in the user's library."""
+    return ApiRequest("get", "me/tracks/contains", {"ids": ",".join(track_ids)})
+
+def new_releases(limit=20):
+    """Get a page of new album releases, returning the list of albums."""
+    return ApiRequest("get", "browse/new-releases", _params(limit=limit),
+                      parse=lambda body: body.get("albums", {}).get("items", []), container="albums")
+
+def featured_playlists(limit=20):
+    """Get a page of featured playlists, returning the list of playlists."""
+    return ApiRequest("get", "browse/featured-playlists", _params(limit=limit),
+                      parse=lambda body: body.get("playlists", {}).get("items", []), container="playlists")
+
+def recommendations(seed_tracks=None, seed_artists=None, seed_genres=None, limit=20):
+    """Get personalized recommendations, returning the list of tracks."""
+    params = _params(
+        seed_tracks=",".join(seed_tracks) if seed_tracks else None,
+        seed_artists=",".join(seed_artists) if seed_artists else None,
+        seed_genres=",".join(seed_genres) if seed_genres else None,
+        limit=limit,
+    )
+    return ApiRequest("get", "recommendations", params, parse=lambda body: body.get("tracks", []))
+
+def reorder_playlist_tracks(playlist_id, range_start, insert_before, range_length=1):
+    """Reorder tracks in a playlist."""
+    data = {
+        "range_start": range_start,
+        "insert_before": insert_before,
+        "range_length": range_length,
+    }
+    return ApiRequest("put", f"playlists/{playlist_id}/tracks", data=data)
+
+def add_tracks_to_playlist(playlist_id, track_uris):
+    """Add one batch of at most PLAYLIST_BATCH_SIZE tracks to a playlist."""
+    return ApiRequest("post", f"playlists/{playlist_id}/tracks", data={"uris": track_uris})
+
+def remove_tracks_from_playlist(playlist_id, track_uris):
+    """Remove one batch of at most PLAYLIST_BATCH_SIZE tracks from a playlist."""
+    return ApiRequest("delete", f"playlists/{playlist_id}/tracks", data={"uris": track_uris})
+
+def update_playlist_details(playlist_id, name=None, description=None, public=None):
+    """Update playlist details."""
+    data = {}
+    if name:
+        data["name"] = name
+    if description:
+        data["description"] = description
+    if public is not None:
+        data["public"] = public
+    return ApiRequest("put", f"playlists/{playlist_id}", data=data)
+
+def page_of(request, body):
+    """Return the paging object of a response to a paged request."""
+    return body.get(request.container, {}) if request.container else body
+
+def with_offset(request, offset):
+    """Return a copy of a paged request asking for the page at `offset`."""
+    return request._replace(params={**(request.params or {}), "offset": offset})
+
+def remaining_offsets(page):
+    """
+    Return the offsets of the pages after `page`, known up front from its `total`.
+
+    Args:
+        page (dict): A paging object with items, limit, offset and total.
+
+    Returns:
+        range: The offsets of every remaining page.
+    """
+    items = page.get("items", [])
+    limit = page.get("limit") or len(items)
+    if not limit:
+        return range(0)
+    return range(page.get("offset", 0) + len(items), page.get("total") or 0, limit)
+
+def endpoint_from_url(base_url, url):
+    """Turn an absolute API URL, such as a paging `next` link, into an endpoint relative to `base_url`."""
+    prefix = f"{base_url}/"
+    return url[len(prefix):] if url.startswith(prefix) else url
+
+def _snapshot_key(item):
+    """Return the ID of a playlist item's track, or the URI of a local file."""
+    track = item.get("track") or {}
+    return track.get("id") or track.get("uri")
+
+def playlist_snapshot(playlist, items):
+    """
+    Build a playlist snapshot from a playlist object and all of its track items.
+
+    Tracks are listed by ID, and local files, which have no ID, by their URI.
+    """
+    return {
+        "id": playlist["id"],
+        "name": playlist["name"],
+        "snapshot_id": playlist.get("snapshot_id"),
+        "tracks": [_snapshot_key(item) for item in items],
+    }
+
+def compare_playlist_changes(old_snapshot, new_snapshot):
+    """
+    Compare two playlist snapshots to identify changes, taking order and duplicates into account.
+
+    Args:
+        old_snapshot (dict): The old playlist snapshot.
+        new_snapshot (dict): The new playlist snapshot.
+
+    Returns:
+        dict: A dictionary of changes: added_tracks, removed_tracks and moved_tracks, in playlist
+        order and with one entry per copy of a duplicated track, and edits, the minimal edit script
+        from spotylog.diff.diff_tracks().
+    """
+    edits = diff_tracks(old_snapshot["tracks"], new_snapshot["tracks"])
+
+    def tracks(op):
+        return [track for edit in edits if edit.op == op for track in edit.track_ids]
+
+    return {
+        "added_tracks": tracks("insert"),
+        "removed_tracks": tracks("delete"),
+        "moved_tracks": tracks("move"),
+        "edits": edits,
+    }
+
+def format_search_results(results, type="track"):
+    """Turn search results into rows for export."""
+    items = results.get(f"{type}s", {}).get("items", [])
+
+    data = []
+    for item in items:
+        if type == "track":
+            data.append({
+                "Name": item.get("name"),
+                "Artists": ", ".join(artist["name"] for artist in item.get("artists", [])),
+                "Album": item.get("album", {}).get("name"),
+                "Duration (ms)": item.get("duration_ms"),
+                "Popularity": item.get("popularity"),
+            })
+        elif type == "album":
+            data.append({
+                "Name": item.get("name"),
+                "Artists": ", ".join(artist["name"] for artist in item.get("artists", [])),
+                "Release Date": item.get("release_date"),
+                "Total Tracks": item.get("total_tracks"),
+            })
+        elif type == "artist":
+            data.append({
+                "Name": item.get("name"),
+                "Genres": ", ".join(item.get("genres", [])),
+                "Popularity": item.get("popularity"),
+            })
+    return data
+
+def format_playlists(playlists):
+    """Turn playlist objects into rows for export."""
+    data = []
+    for playlist in playlists:
+        data.append({
+            "Name": playlist.get("name"),
+            "Description": playlist.get("description"),
+            "Owner": playlist.get("owner", {}).get("display_name"),
+            "Tracks": playlist.get("tracks", {}).get("total"),
+            "Public": playlist.get("public"),
+        })
+    return data
+
+def track_rows(items):
+    """
+    Turn tracks into rows for export, one at a time.
+
+    This is a generator, so rows from a pagination iterator such as iter_saved_tracks()
+    can be written straight to disk without holding every page in memory.
+
+    Args:
+        items (iterable): Tracks, or playlist, saved-track or history items wrapping one under "track".
+
+    Yields:
+        dict: One row per track, with "Played At" or "Added At" when the item has it.
+    """
+    for item in items:
+        track = item.get("track") if isinstance(item.get("track"), dict) else item
+        row = {
+            "ID": track.get("id"),
+            "Name": track.get("name"),
+            "Artists": ", ".join(artist["name"] for artist in track.get("artists", [])),
+            "Album": (track.get("album") or {}).get("name"),
+            "Duration (ms)": track.get("duration_ms"),
+            "Popularity": track.get("popularity"),
+        }
+        if "played_at" in item:
+            row["Played At"] = item["played_at"]
+        elif "added_at" in item:
+            row["Added At"] = item["added_at"]
+        yield row
\ No newline at end of file
@@ -1,28 +1,511 @@
 import aiohttp
 import asyncio
+import copy
+from collections import deque
+from functools import partial
+from . import api, incremental
+from .cache import make_cache_key
+from .decoders import get_decoder
+from .excel_utils import save_to_excel
+from .ratelimit import get_rate_limiter, parse_retry_after
+from .retry import CircuitBreaker, RetryPolicy
+from .singleflight import AsyncSingleFlight
+from .utils import chunked
+
+async def gather_bounded(aws, limit=16):
+    """
+    Await many awaitables with at most `limit` of them running at once.
+
+    Args:
+        aws (iterable): The coroutines or other awaitables to run.
+        limit (int): The maximum number of awaitables in flight at once.
+
+    Returns:
+        list: The results, in input order.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(aw):
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(bounded(aw) for aw in aws))
+
+async def fetch_many(aws, limit=16):
+    """
+    Run many awaitables with at most `limit` of them running at once, yielding results as they complete.
+
+    Args:
+        aws (iterable): The coroutines or other awaitables to run.
+        limit (int): The maximum number of awaitables in flight at once.
+
+    Yields:
+        tuple: The input index of each awaitable and its result, in completion order.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def bounded(index, aw):
+        async with semaphore:
+            return index, await aw
+
+    tasks = [asyncio.ensure_future(bounded(index, aw)) for index, aw in enumerate(aws)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
 
 class AsyncSpotifyClient:
-    def __init__(self, access_token):
+    def __init__(self, access_token, limit=100, limit_per_host=10, ttl_dns_cache=300, keep_alive=True, keepalive_timeout=15.0,
+                 rate_limiter=None, max_rate_limit_retries=5, retry_policy=None, circuit_breaker=None, json_decoder=None):
+        """
+        Create an async client that keeps one pooled aiohttp session open.
+
+        The session is created on first use, so the client can be built outside a running event loop.
+
+        Args:
+            access_token (str): The OAuth access token.
+            limit (int): The maximum number of simultaneous connections.
+            limit_per_host (int): The maximum number of simultaneous connections to one host.
+            ttl_dns_cache (int): How long resolved addresses are cached, in seconds.
+            keep_alive (bool): Whether to keep connections open between requests.
+            keepalive_timeout (float): How long an idle connection is kept open, in seconds.
+            rate_limiter (RateLimiter): The limiter pacing requests. Defaults to the one shared by every client using this token.
+            max_rate_limit_retries (int): How many times a request answered with 429 is retried after its Retry-After delay.
+            retry_policy (RetryPolicy): Which failed requests are retried, and when. Defaults to RetryPolicy().
+            circuit_breaker (CircuitBreaker): Fails requests fast while the API is degraded. Defaults to CircuitBreaker().
+            json_decoder (str or callable): How response bodies are decoded: "auto" (orjson when installed), "orjson",
+                "json" or a callable taking bytes. Defaults to the standard library.
+        """
         self.access_token = access_token
         self.base_url = "https://api.spotify.com/v1"
         self.headers = {
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json",
         }
+        self.rate_limiter = rate_limiter or get_rate_limiter(access_token)
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._inflight = AsyncSingleFlight(copy=copy.deepcopy)
+        self._loads = get_decoder(json_decoder or "json")
+        self._connector_options = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "use_dns_cache": True,
+            "ttl_dns_cache": ttl_dns_cache,
+            "force_close": not keep_alive,
+            "keepalive_timeout": keepalive_timeout if keep_alive else None,
+        }
+        self.session = None
+
+    def _get_session(self):
+        """Return the shared session, creating it and its connector if needed."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(**self._connector_options)
+            self.session = aiohttp.ClientSession(connector=connector, headers=self.headers)
+        return self.session
+
+    async def close(self):
+        """Close the session and release its pooled connections."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
 
     async def _get(self, endpoint, params=None):
-        """Async helper method for GET requests."""
+        """Async helper method for GET requests. Identical concurrent requests share a single network call, each getting its own copy of the body."""
+        key = make_cache_key(endpoint, params)
+        return await self._inflight.do(key, lambda: self._fetch(endpoint, params))
+
+    async def _fetch(self, endpoint, params=None):
+        """Send a GET request to the API."""
+        return await self._send("get", endpoint, params=params)
+
+    async def _send(self, method, endpoint, params=None, data=None, raw=False):
+        """
+        Send a request through the rate limiter, retry policy and circuit breaker.
+
+        This follows the same rules as SpotifyClient._send: 429 responses pause every
+        request sharing the rate limiter for the Retry-After delay, and only transient
+        failures of idempotent requests are retried.
+
+        Args:
+            method (str): The session method to call: "get", "post", "put" or "delete".
+            endpoint (str): The API endpoint, relative to the base URL.
+            params (dict): The query parameters.
+            data (dict): The JSON body.
+            raw (bool): Whether to return the undecoded body instead.
+
+        Returns:
+            The decoded JSON body, or None for an empty response. The body as bytes if `raw` is set.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+        """
         url = f"{self.base_url}/{endpoint}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=self.headers, params=params) as response:
-                response.raise_for_status()
-                return await response.json()
+        attempt = 0
+        rate_limited = 0
+        delay = None
+        resend = False
+        while True:
+            # A re-send after a 429 is the same attempt, so it doesn't pass the breaker again,
+            # which would turn a half-open trial into CircuitOpenError
+            if not resend:
+                self.circuit_breaker.before_request()
+            resend = False
+            await self.rate_limiter.acquire_async()
+            self.retry_policy.record_request()
+            settled = False
+            try:
+                async with getattr(self._get_session(), method)(url, params=params, json=data) as response:
+                    if response.status == 429 and rate_limited < self.max_rate_limit_retries:
+                        rate_limited += 1
+                        self.rate_limiter.backoff(parse_retry_after(response.headers.get("Retry-After")))
+                        resend = True
+                        continue
+                    settled = True
+                    if not self.retry_policy.is_transient(response.status):
+                        self.circuit_breaker.record_success()
+                        response.raise_for_status()
+                        return await response.read() if raw else await self._decode(response)
+                    self.circuit_breaker.record_failure()
+                    attempt += 1
+                    if not self.retry_policy.should_retry(method, attempt):
+                        response.raise_for_status()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self.circuit_breaker.record_failure()
+                attempt += 1
+                if not self.retry_policy.should_retry(method, attempt):
+                    raise
+            except BaseException:
+                # Any other error, such as a cancellation, still settles the attempt, so a trial
+                # request can't leave the circuit half open
+                if not settled:
+                    self.circuit_breaker.record_failure()
+                raise
+            delay = self.retry_policy.next_delay(delay)
+            await asyncio.sleep(delay)
+
+    async def _decode(self, response):
+        """Decode a JSON response body, or return None for an empty one such as 204 No Content."""
+        if response.status == 204:
+            return None
+        return await response.json(content_type=None, loads=self._loads)
+
+    async def get_raw(self, endpoint, params=None):
+        """Send a GET request and return the undecoded response body as bytes, e.g. to write it straight to a file."""
+        return await self._send("get", endpoint, params=params, raw=True)
+
+    async def _call(self, request):
+        """Send a request built by spotylog.api and return its parsed result."""
+        if request.method == "get":
+            body = await self._get(request.endpoint, params=request.params)
+        else:
+            body = await self._send(request.method, request.endpoint, data=request.data)
+        return request.parse(body) if request.parse else body
+
+    async def _fetch_all_pages(self, request, page=None, max_workers=8):
+        """
+        Fetch every item of a paged request, requesting the remaining pages concurrently.
+
+        Args:
+            request (ApiRequest): The request for the first page; its params are applied to every page.
+            page (dict): An already fetched first page. If given, `request` is not sent.
+            max_workers (int): The maximum number of pages requested at once.
+
+        Returns:
+            list: All items, in the order the API returns them.
+        """
+        async def fetch(offset):
+            paged = api.with_offset(request, offset)
+            return api.page_of(request, await self._get(paged.endpoint, params=paged.params))
+
+        if page is None:
+            page = await fetch((request.params or {}).get("offset", 0))
+        items = list(page.get("items", []))
+        pages = await gather_bounded((fetch(offset) for offset in api.remaining_offsets(page)), max_workers)
+        for next_page in pages:
+            items.extend(next_page.get("items", []))
+        return items
+
+    async def _paginate(self, request, lookahead=2, page=None):
+        """
+        Yield the items of a paged request one at a time, with the next pages already in flight.
+
+        Offset-paged endpoints report `total`, so up to `lookahead` later pages are requested
+        while the caller handles the current one. Cursor-paged endpoints, such as recently
+        played, only reveal the next page, so one page is prefetched. At most `lookahead`
+        pages are held besides the current one.
+
+        Args:
+            request (ApiRequest): The request for the first page.
+            lookahead (int): The maximum number of pages requested ahead of the caller.
+            page (dict): An already fetched first page. If given, `request` is not sent.
+
+        Yields:
+            dict: The items of every page, in order.
+        """
+        async def fetch(endpoint, params=None):
+            return api.page_of(request, await self._get(endpoint, params=params))
+
+        lookahead = max(1, lookahead)
+        if page is None:
+            page = await fetch(request.endpoint, request.params)
+        offsets = iter(api.remaining_offsets(page)) if "total" in page else None
+        pending = deque()
+
+        def schedule(page):
+            if offsets is None:
+                if not pending and page.get("next"):
+                    pending.append(asyncio.ensure_future(fetch(api.endpoint_from_url(self.base_url, page["next"]))))
+                return
+            for offset in offsets:
+                paged = api.with_offset(request, offset)
+                pending.append(asyncio.ensure_future(fetch(paged.endpoint, paged.params)))
+                if len(pending) >= lookahead:
+                    return
+
+        try:
+            while page:
+                if len(pending) < lookahead:
+                    schedule(page)
+                for item in page.get("items", []):
+                    yield item
+                if not pending:
+                    break
+                page = await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
 
     async def search(self, query, type="track", limit=10):
         """Async search for tracks, albums, artists, or playlists."""
-        params = {
-            "q": query,
-            "type": type,
-            "limit": limit,
-        }
-        return await self._get("search", params=params)
\ No newline at end of file
+        return await self._call(api.search(query, type=type, limit=limit))
+
+    async def get_user_playlists(self):
+        """Get the current user's playlists."""
+        return await self._call(api.user_playlists())
+
+    def iter_user_playlists(self, page_size=50, lookahead=2):
+        """Iterate asynchronously over all of the current user's playlists, keeping `lookahead` pages in flight."""
+        return self._paginate(api.user_playlists(limit=page_size), lookahead)
+
+    async def get_all_user_playlists(self, max_workers=8):
+        """Fetch all of the current user's playlists, requesting up to `max_workers` pages at once."""
+        return await self._fetch_all_pages(api.user_playlists(limit=50), max_workers=max_workers)
+
+    async def create_playlist(self, user_id, name, description="", public=False):
+        """Create a new playlist for the user."""
+        return await self._call(api.create_playlist(user_id, name, description, public))
+
+    async def save_search_results_to_excel(self, query, type="track", limit=10, filename="search_results.xlsx"):
+        """Search for items and save the results to an Excel file, writing it off the event loop."""
+        results = await self.search(query, type=type, limit=limit)
+        data = api.format_search_results(results, type)
+        await asyncio.get_running_loop().run_in_executor(None, save_to_excel, data, filename)
+
+    async def save_user_playlists_to_excel(self, filename="user_playlists.xlsx"):
+        """Get the current user's playlists and save them to an Excel file, writing it off the event loop."""
+        playlists = (await self.get_user_playlists()).get("items", [])
+        data = api.format_playlists(playlists)
+        await asyncio.get_running_loop().run_in_executor(None, save_to_excel, data, filename)
+
+    async def _append_items(self, items, filename, field, watermark, format, **state):
+        """Append items to an incremental export off the event loop."""
+        append = partial(incremental.append_items, items, filename, field, watermark, format, **state)
+        return await asyncio.get_running_loop().run_in_executor(None, append)
+
+    async def export_recently_played(self, filename, format=None):
+        """Append the tracks played since the last export, resuming from the watermark kept next to `filename`."""
+        export = incremental.RecentlyPlayedExport(filename)
+        while not export.done:
+            export.add(await self.get_recently_played_tracks(after=export.after, limit=incremental.RECENTLY_PLAYED_LIMIT))
+        return await self._append_items(export.items(), filename, "played_at", export.watermark, format)
+
+    async def export_saved_tracks(self, filename, format=None):
+        """Append the tracks saved since the last export, fetching pages only until the watermark is reached."""
+        watermark = incremental.read_watermark(filename)
+        items = []
+        async for item in self.iter_saved_tracks():
+            if incremental.is_older(item, "added_at", watermark):
+                break
+            items.append(item)
+        items = incremental.new_items(items, "added_at", watermark)
+        return await self._append_items(items, filename, "added_at", watermark, format)
+
+    async def export_playlist_tracks(self, playlist_id, filename, format=None):
+        """Append the tracks added to a playlist since the last export, skipping unchanged playlists by snapshot_id."""
+        watermark = incremental.read_watermark(filename)
+        snapshot_id = (await self.get_playlist(playlist_id, fields="snapshot_id")).get("snapshot_id")
+        if watermark and snapshot_id == watermark.get("snapshot_id"):
+            return 0
+        items = [item async for item in self.iter_playlist_tracks(playlist_id)]
+        items = incremental.new_items(items, "added_at", watermark)
+        return await self._append_items(items, filename, "added_at", watermark, format, snapshot_id=snapshot_id)
+
+    async def generate_playlist(self, user_id, name, description="", public=False, tracks=None):
+        """Generate a playlist with the given track IDs, or with tracks recommended from the user's top tracks."""
+        if not tracks:
+            # Get recommended tracks based on user's top tracks
+            top_tracks = await self.get_top_tracks(limit=5)
+            recommendations = await self.get_recommendations(seed_tracks=[track["id"] for track in top_tracks])
+            tracks = [track["id"] for track in recommendations]
+
+        # Create the playlist
+        playlist = await self.create_playlist(user_id, name, description, public)
+
+        # Add tracks to the playlist
+        await self.add_tracks_to_playlist(playlist["id"], [f"spotify:track:{track_id}" for track_id in tracks])
+        return playlist
+
+    async def get_recently_played_tracks(self, after=None, before=None, limit=50):
+        """Fetch recently played tracks within a specific time range."""
+        return await self._call(api.recently_played(after=after or None, before=before or None, limit=limit))
+
+    def iter_recently_played(self, page_size=50, lookahead=1):
+        """Iterate asynchronously over the recently played tracks, following the `before` cursor."""
+        return self._paginate(api.recently_played(limit=page_size), lookahead)
+
+    async def get_top_tracks(self, time_range="medium_term", limit=20):
+        """Fetch the user's top tracks for a specific time range."""
+        return await self._call(api.top_items("tracks", time_range, limit))
+
+    def iter_top_tracks(self, time_range="medium_term", page_size=50, lookahead=2):
+        """Iterate asynchronously over all of the user's top tracks, keeping `lookahead` pages in flight."""
+        return self._paginate(api.top_items("tracks", time_range, page_size), lookahead)
+
+    async def get_top_artists(self, time_range="medium_term", limit=20):
+        """Fetch the user's top artists for a specific time range."""
+        return await self._call(api.top_items("artists", time_range, limit))
+
+    def iter_top_artists(self, time_range="medium_term", page_size=50, lookahead=2):
+        """Iterate asynchronously over all of the user's top artists, keeping `lookahead` pages in flight."""
+        return self._paginate(api.top_items("artists", time_range, page_size), lookahead)
+
+    async def get_playlist(self, playlist_id, fields=None):
+        """Fetch a playlist, optionally projected to a Spotify `fields` selection."""
+        return await self._call(api.playlist(playlist_id, fields=fields))
+
+    async def get_playlist_tracks_page(self, playlist_id, offset=0, limit=100, fields=None):
+        """Fetch the page of a playlist's tracks starting at `offset`."""
+        return await self._call(api.with_offset(api.playlist_tracks(playlist_id, limit=limit, fields=fields), offset))
+
+    async def get_playlist_snapshot(self, playlist_id, max_workers=8):
+        """Fetch a snapshot of a playlist's track IDs, using a minimal `fields` projection and up to `max_workers` concurrent pages."""
+        playlist = await self._call(api.playlist(playlist_id, fields=api.SNAPSHOT_FIELDS))
+        tracks = api.playlist_tracks(playlist_id, fields=api.SNAPSHOT_TRACK_FIELDS)
+        items = await self._fetch_all_pages(tracks, page=playlist["tracks"], max_workers=max_workers)
+        return api.playlist_snapshot(playlist, items)
+
+    def iter_playlist_tracks(self, playlist_id, page_size=100, lookahead=2, fields=None):
+        """
+        Iterate asynchronously over all tracks of a playlist.
+
+        Args:
+            playlist_id (str): The ID of the playlist.
+            page_size (int): The number of tracks requested per page (max 100).
+            lookahead (int): The maximum number of pages requested ahead of the caller.
+            fields (str): A `fields` projection for each page. It must keep "total" and "limit" for pages to be requested ahead.
+
+        Yields:
+            dict: Each playlist item, with the track under "track".
+        """
+        return self._paginate(api.playlist_tracks(playlist_id, limit=page_size, fields=fields), lookahead)
+
+    async def get_all_playlist_tracks(self, playlist_id, max_workers=8, fields=None):
+        """Fetch all tracks of a playlist, optionally projected to `fields`, requesting up to `max_workers` pages at once."""
+        return await self._fetch_all_pages(api.playlist_tracks(playlist_id, fields=fields), max_workers=max_workers)
+
+    def compare_playlist_changes(self, old_snapshot, new_snapshot):
+        """Compare two playlist snapshots to identify changes."""
+        return api.compare_playlist_changes(old_snapshot, new_snapshot)
+
+    async def start_playback(self, device_id=None, context_uri=None, uris=None):
+        """Start or resume playback on a device."""
+        await self._call(api.start_playback(device_id, context_uri, uris))
+
+    async def pause_playback(self, device_id=None):
+        """Pause playback on a device."""
+        await self._call(api.pause_playback(device_id))
+
+    async def skip_to_next(self, device_id=None):
+        """Skip to the next track."""
+        await self._call(api.skip_to_next(device_id))
+
+    async def skip_to_previous(self, device_id=None):
+        """Skip to the previous track."""
+        await self._call(api.skip_to_previous(device_id))
+
+    async def set_volume(self, volume_percent, device_id=None):
+        """Set the playback volume."""
+        await self._call(api.set_volume(volume_percent, device_id))
+
+    async def save_tracks(self, track_ids, max_workers=8):
+        """Save tracks to the user's library, sending batches of 50 IDs concurrently."""
+        chunks = chunked(track_ids, api.LIBRARY_BATCH_SIZE)
+        await gather_bounded((self._call(api.save_tracks(chunk)) for chunk in chunks), max_workers)
+
+    async def remove_tracks(self, track_ids, max_workers=8):
+        """Remove tracks from the user's library, sending batches of 50 IDs concurrently."""
+        chunks = chunked(track_ids, api.LIBRARY_BATCH_SIZE)
+        await gather_bounded((self._call(api.remove_tracks(chunk)) for chunk in chunks), max_workers)
+
+    async def check_saved_tracks(self, track_ids, max_workers=8):
+        """Check if tracks are saved in the user's library, returning one boolean per track ID in input order."""
+        chunks = chunked(track_ids, api.LIBRARY_BATCH_SIZE)
+        results = await gather_bounded((self._call(api.check_saved_tracks(chunk)) for chunk in chunks), max_workers)
+        return [saved for result in results for saved in result]
+
+    def iter_saved_tracks(self, page_size=50, lookahead=2):
+        """Iterate asynchronously over all tracks saved in the user's library, keeping `lookahead` pages in flight."""
+        return self._paginate(api.saved_tracks(limit=page_size), lookahead)
+
+    async def get_all_saved_tracks(self, max_workers=8):
+        """Fetch all tracks saved in the user's library, requesting up to `max_workers` pages at once."""
+        return await self._fetch_all_pages(api.saved_tracks(), max_workers=max_workers)
+
+    async def get_new_releases(self, limit=20):
+        """Fetch new album releases."""
+        return await self._call(api.new_releases(limit))
+
+    def iter_new_releases(self, page_size=50, lookahead=2):
+        """Iterate asynchronously over all new album releases."""
+        return self._paginate(api.new_releases(page_size), lookahead)
+
+    async def get_featured_playlists(self, limit=20):
+        """Fetch featured playlists."""
+        return await self._call(api.featured_playlists(limit))
+
+    def iter_featured_playlists(self, page_size=50, lookahead=2):
+        """Iterate asynchronously over all featured playlists."""
+        return self._paginate(api.featured_playlists(page_size), lookahead)
+
+    async def get_recommendations(self, seed_tracks=None, seed_artists=None, seed_genres=None, limit=20):
+        """Fetch personalized recommendations."""
+        return await self._call(api.recommendations(seed_tracks, seed_artists, seed_genres, limit))
+
+    async def reorder_playlist_tracks(self, playlist_id, range_start, insert_before, range_length=1):
+        """Reorder tracks in a playlist."""
+        await self._call(api.reorder_playlist_tracks(playlist_id, range_start, insert_before, range_length))
+
+    async def add_tracks_to_playlist(self, playlist_id, track_uris):
+        """Add tracks to a playlist, sending batches of 100 URIs one after another to keep their order."""
+        for chunk in chunked(track_uris, api.PLAYLIST_BATCH_SIZE):
+            await self._call(api.add_tracks_to_playlist(playlist_id, chunk))
+
+    async def remove_tracks_from_playlist(self, playlist_id, track_uris, max_workers=8):
+        """Remove tracks from a playlist, sending batches of 100 URIs concurrently."""
+        chunks = chunked(track_uris, api.PLAYLIST_BATCH_SIZE)
+        await gather_bounded((self._call(api.remove_tracks_from_playlist(playlist_id, chunk)) for chunk in chunks), max_workers)
+
+    async def update_playlist_details(self, playlist_id, name=None, description=None, public=None):
+        """Update playlist details."""
+        await self._call(api.update_playlist_details(playlist_id, name, description, public))
\ No newline at end of file
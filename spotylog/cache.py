@@ -0,0 +1,277 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+# Time-to-live in seconds per endpoint prefix. The longest matching prefix wins and
+# a TTL of 0 means responses from that endpoint are never cached.
+DEFAULT_TTL_POLICIES = {
+    "me/player": 0,
+    "me/tracks/contains": 0,
+    "me/top": 3600,
+    "me/playlists": 300,
+    "me/tracks": 300,
+    "me/albums": 300,
+    "me/following": 300,
+    "playlists": 300,
+    "search": 3600,
+    "browse": 3600,
+    "recommendations": 3600,
+    "tracks": 86400,
+    "albums": 86400,
+    "artists": 86400,
+}
+
+def make_cache_key(endpoint, params=None, namespace=None):
+    """
+    Build a stable cache key from an endpoint and its query parameters.
+
+    Args:
+        endpoint (str): The API endpoint, relative to the base URL.
+        params (dict): The query parameters. Parameters set to None are ignored.
+        namespace (str): Scopes the key, e.g. to one account, so responses such as me/* are never shared.
+
+    Returns:
+        str: The endpoint followed by its sorted, URL-encoded parameters, after the namespace if there is one.
+    """
+    key = endpoint
+    if params:
+        items = sorted((name, value) for name, value in params.items() if value is not None)
+        if items:
+            key = f"{endpoint}?{urlencode(items)}"
+    return f"{namespace}:{key}" if namespace else key
+
+def invalidation_prefixes(endpoint):
+    """
+    Return the endpoint prefixes whose cached responses a write to `endpoint` makes stale.
+
+    A write changes the resource it names, e.g. me/tracks or playlists/{id} for
+    playlists/{id}/tracks, and a change to any playlist also shows in me/playlists.
+    """
+    parts = endpoint.split("?", 1)[0].split("/")
+    prefixes = ["/".join(parts[:2])]
+    if parts[0] in ("playlists", "users"):
+        prefixes.append("me/playlists")
+    return prefixes
+
+def token_namespace(access_token):
+    """Return a cache namespace for an access token: a short hash, so the token itself is never stored."""
+    return hashlib.sha256(access_token.encode()).hexdigest()[:16]
+
+class ResponseCache:
+    def __init__(self, path=None, max_entries=1024, max_disk_bytes=64 * 1024 * 1024, ttl_policies=None, default_ttl=3600):
+        """
+        A two-tier response cache: an in-memory LRU in front of an optional SQLite file.
+
+        Both tiers keep bodies as the JSON they arrived as, and every lookup decodes a new
+        object with the caller's decoder, so a caller changing a result cannot change what
+        later calls get.
+
+        Args:
+            path (str): The SQLite file for the on-disk tier. If None, only the memory tier is used.
+            max_entries (int): The maximum number of entries kept in memory.
+            max_disk_bytes (int): The maximum total size of the bodies stored on disk.
+            ttl_policies (dict): Per-endpoint-prefix TTLs, merged over DEFAULT_TTL_POLICIES.
+            default_ttl (int): The TTL for endpoints that match no policy.
+        """
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_policies = dict(DEFAULT_TTL_POLICIES)
+        if ttl_policies:
+            self.ttl_policies.update(ttl_policies)
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, body TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL, etag TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            self._db.commit()
+
+    def ttl_for(self, endpoint):
+        """Return the TTL for an endpoint, using the longest matching policy prefix."""
+        endpoint = endpoint.split("?", 1)[0]
+        best = None
+        for prefix in self.ttl_policies:
+            if (endpoint == prefix or endpoint.startswith(prefix + "/")) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        return self.ttl_policies[best] if best is not None else self.default_ttl
+
+    def get(self, key, loads=None):
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): The cache key, as built by make_cache_key.
+            loads (callable): Decodes the stored JSON, e.g. the client's decoder. Defaults to json.loads.
+
+        Returns:
+            The cached body, or None if there is no fresh entry.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            fresh = entry is not None and entry[1] > time.time()
+            if fresh:
+                self.hits += 1
+            else:
+                if entry is not None and not entry[2]:
+                    self._memory.pop(key, None)
+                self.misses += 1
+        return (loads or json.loads)(entry[0]) if fresh else None
+
+    def get_stale(self, key, loads=None):
+        """
+        Look up an expired entry that can be revalidated with its ETag.
+
+        Args:
+            key (str): The cache key, as built by make_cache_key.
+            loads (callable): Decodes the stored JSON. Defaults to json.loads.
+
+        Returns:
+            tuple: The stored body and its ETag, or None if there is no such entry.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+        if entry is not None and entry[2]:
+            return (loads or json.loads)(entry[0]), entry[2]
+        return None
+
+    def revalidate(self, key, ttl):
+        """
+        Mark a stale entry as fresh again after the server answered 304 Not Modified.
+
+        Args:
+            key (str): The cache key, as built by make_cache_key.
+            ttl (int): The number of seconds the entry stays fresh.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                return
+            self.revalidations += 1
+            self._remember(key, entry[0], now + ttl, entry[2])
+            if self._db is not None:
+                self._db.execute("UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?", (now + ttl, now, key))
+                self._db.commit()
+
+    def invalidate(self, prefix, namespace=None):
+        """
+        Remove the entries of an endpoint and everything under it, from both tiers.
+
+        Args:
+            prefix (str): The endpoint, e.g. "me/tracks". Its paths and queries are removed too.
+            namespace (str): The namespace the keys were built with, as for make_cache_key.
+        """
+        key = make_cache_key(prefix, namespace=namespace)
+        # Keys under the prefix sort between prefix + "/" and prefix + "0", or prefix + "?" and prefix + "@"
+        ranges = ((f"{key}/", f"{key}0"), (f"{key}?", f"{key}@"))
+        with self._lock:
+            for stored in [stored for stored in self._memory if stored == key or any(lo <= stored < hi for lo, hi in ranges)]:
+                del self._memory[stored]
+            if self._db is not None:
+                self._db.execute(
+                    "DELETE FROM responses WHERE key = ? OR (key >= ? AND key < ?) OR (key >= ? AND key < ?)",
+                    (key, *ranges[0], *ranges[1]),
+                )
+                self._db.commit()
+
+    def _lookup(self, key):
+        """Return the (JSON, expires_at, etag) entry for a key from either tier, fresh or not."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            return entry
+
+        if self._db is not None:
+            row = self._db.execute("SELECT body, expires_at, etag FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+                entry = (row[0], row[1], row[2])
+                self._remember(key, *entry)
+                return entry
+        return None
+
+    def set(self, key, body, ttl, etag=None):
+        """
+        Store a response in both tiers.
+
+        Args:
+            key (str): The cache key, as built by make_cache_key.
+            body: The JSON body as it arrived, in bytes, which is stored without re-encoding, or a decoded body.
+            ttl (int): The number of seconds the entry stays fresh. Nothing is stored if it is 0.
+            etag (str): The response's ETag. Entries with an ETag are kept after expiry so they can be revalidated.
+        """
+        if not ttl:
+            return
+        now = time.time()
+        expires_at = now + ttl
+        encoded = body if isinstance(body, bytes) else json.dumps(body)
+        with self._lock:
+            self._remember(key, encoded, expires_at, etag)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, body, size, expires_at, accessed_at, etag) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, encoded, len(encoded), expires_at, now, etag),
+                )
+                self._evict_disk()
+                self._db.commit()
+
+    def _remember(self, key, encoded, expires_at, etag=None):
+        """Insert an entry into the memory tier, evicting the least recently used ones."""
+        self._memory[key] = (encoded, expires_at, etag)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _evict_disk(self):
+        """Delete expired rows that cannot be revalidated, then the least recently used ones until the disk tier fits its cap."""
+        self._db.execute("DELETE FROM responses WHERE expires_at <= ? AND etag IS NULL", (time.time(),))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= self.max_disk_bytes:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self):
+        """Return the hit, miss and eviction counters."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "revalidations": self.revalidations,
+                "memory_entries": len(self._memory),
+            }
+
+    def close(self):
+        """Close the on-disk tier."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
\ No newline at end of file
@@ -1,10 +1,12 @@
 import argparse
-from spotylog import SpotifyAuth, SpotifyClient
+import requests
+from spotylog import HistoryLogger, HistoryStore, SpotifyAuth, SpotifyClient
 
 def main():
     parser = argparse.ArgumentParser(description="Interact with the Spotify API.")
     parser.add_argument("--search", help="Search for tracks, albums, or artists.")
     parser.add_argument("--export", help="Export data to Excel, CSV, or JSON.", choices=["excel", "csv", "json"])
+    parser.add_argument("--log-history", metavar="DB", help="Keep logging listening history to a SQLite file until interrupted.")
     args = parser.parse_args()
 
     auth = SpotifyAuth()
@@ -23,5 +25,16 @@ def main():
         else:
             print(results)
 
+    if args.log_history:
+        with HistoryStore(args.log_history) as store:
+            try:
+                HistoryLogger(client, store).run()
+            except KeyboardInterrupt:
+                pass
+            except requests.HTTPError as error:
+                # Most likely the access token expired; the plays logged so far are kept
+                print(f"Stopped logging history: {error}")
+            print(f"{len(store)} plays logged to {args.log_history}")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
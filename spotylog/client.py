@@ -1,68 +1,354 @@
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import takewhile
 import requests
+from requests.adapters import HTTPAdapter
+from . import api, incremental
 from .excel_utils import save_to_excel
-import requests_cache
-from tenacity import retry, stop_after_attempt, wait_exponential
+from .cache import ResponseCache, invalidation_prefixes, make_cache_key, token_namespace
+from .decoders import get_decoder
+from .ratelimit import get_rate_limiter, parse_retry_after
+from .retry import CircuitBreaker, RetryPolicy
+from .singleflight import SingleFlight
+from .utils import chunked
 
 class SpotifyClient:
-    def __init__(self, access_token):
+    def __init__(self, access_token, pool_connections=10, pool_maxsize=10, pool_block=False, keep_alive=True, cache=None,
+                 rate_limiter=None, max_rate_limit_retries=5, retry_policy=None, circuit_breaker=None, json_decoder=None):
+        """
+        Create a client that reuses pooled connections to the Spotify API.
+
+        Args:
+            access_token (str): The OAuth access token.
+            pool_connections (int): The number of per-host connection pools to keep.
+            pool_maxsize (int): The maximum number of connections kept open per host.
+            pool_block (bool): Whether to block instead of opening extra connections once a host's pool is full.
+            keep_alive (bool): Whether to keep connections open between requests.
+            cache (ResponseCache): The cache for GET responses. Defaults to an in-memory cache; pass False to disable caching.
+            rate_limiter (RateLimiter): The limiter pacing requests. Defaults to the one shared by every client using this token.
+            max_rate_limit_retries (int): How many times a request answered with 429 is retried after its Retry-After delay.
+            retry_policy (RetryPolicy): Which failed requests are retried, and when. Defaults to RetryPolicy().
+            circuit_breaker (CircuitBreaker): Fails requests fast while the API is degraded. Defaults to CircuitBreaker().
+            json_decoder (str or callable): How response bodies are decoded: "auto" (orjson when installed), "orjson",
+                "json" or a callable taking bytes. Defaults to requests' own Response.json().
+        """
         self.access_token = access_token
         self.base_url = "https://api.spotify.com/v1"
         self.headers = {
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json",
         }
-        requests_cache.install_cache("spotify_cache", expire_after=3600)  # Cache expires after 1 hour
+        self.session = self._create_session(pool_connections, pool_maxsize, pool_block, keep_alive)
+        if cache is None:
+            cache = ResponseCache()
+        self.cache = cache or None
+        self.rate_limiter = rate_limiter or get_rate_limiter(access_token)
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._inflight = SingleFlight(copy=copy.deepcopy)
+        self._cache_namespace = token_namespace(access_token)
+        self._loads = get_decoder(json_decoder) if json_decoder else None
+
+    def _create_session(self, pool_connections, pool_maxsize, pool_block, keep_alive):
+        """Create the pooled session shared by every request this client makes."""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(self.headers)
+        if not keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def close(self):
+        """Close the session and release its pooled connections."""
+        self.session.close()
+        if self.cache:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     def _get(self, endpoint, params=None):
-        """Helper method for GET requests."""
+        """
+        Helper method for GET requests, served from the cache when a fresh entry exists.
+
+        Identical requests made concurrently from several threads share a single network call.
+        Every caller gets its own copy of the body, so results can be changed freely. Cache
+        keys are scoped to the access token, so clients of different accounts can share one
+        cache file.
+        """
+        key = make_cache_key(endpoint, params, self._cache_namespace)
+        return self._inflight.do(key, lambda: self._cached_get(endpoint, params, key))
+
+    def _cached_get(self, endpoint, params, key):
+        """Serve a GET request from the cache, revalidating or fetching it when needed."""
+        if not self.cache:
+            return self._decode(self._fetch(endpoint, params))
+        ttl = self.cache.ttl_for(endpoint)
+        if not ttl:
+            return self._decode(self._fetch(endpoint, params))
+
+        body = self.cache.get(key, self._loads)
+        if body is not None:
+            return body
+
+        # Revalidate an expired entry with its ETag instead of downloading the body again
+        stale = self.cache.get_stale(key, self._loads)
+        headers = {"If-None-Match": stale[1]} if stale else None
+        response = self._fetch(endpoint, params, headers=headers)
+        if stale and response.status_code == 304:
+            self.cache.revalidate(key, ttl)
+            return stale[0]
+
+        body = self._decode(response)
+        if body is not None:
+            # A client decoding the raw body itself keeps it as it arrived, so it's never
+            # re-encoded; hits are decoded with the same decoder either way
+            self.cache.set(key, response.content if self._loads else body, ttl, etag=response.headers.get("ETag"))
+        return body
+
+    def _send(self, method, endpoint, **kwargs):
+        """
+        Send a request through the rate limiter, retry policy and circuit breaker.
+
+        A 429 pauses every request sharing the rate limiter for the Retry-After delay,
+        then the request is sent again, up to max_rate_limit_retries times. Transient
+        failures of idempotent requests are retried as the retry policy allows; other
+        errors, such as a 404, are raised straight away.
+
+        Writes drop the cached responses they can make stale, e.g. a PUT to me/tracks
+        drops every cached page of me/tracks.
+
+        Args:
+            method (str): The session method to call: "get", "post", "put" or "delete".
+            endpoint (str): The API endpoint, relative to the base URL.
+            **kwargs: Passed on to the session method.
+
+        Returns:
+            requests.Response: The response, after raise_for_status.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+        """
         url = f"{self.base_url}/{endpoint}"
-        response = requests.get(url, headers=self.headers, params=params)
+        attempt = 0
+        rate_limited = 0
+        delay = None
+        resend = False
+        while True:
+            # A re-send after a 429 is the same attempt, so it doesn't pass the breaker again,
+            # which would turn a half-open trial into CircuitOpenError
+            if not resend:
+                self.circuit_breaker.before_request()
+            resend = False
+            self.rate_limiter.acquire()
+            self.retry_policy.record_request()
+            response = error = None
+            try:
+                response = getattr(self.session, method)(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = exc
+            except BaseException:
+                # Any other error still settles the attempt, so a trial request can't leave the circuit half open
+                self.circuit_breaker.record_failure()
+                raise
+
+            if response is not None and response.status_code == 429 and rate_limited < self.max_rate_limit_retries:
+                rate_limited += 1
+                self.rate_limiter.backoff(parse_retry_after(response.headers.get("Retry-After")))
+                resend = True
+                continue
+            if not self.retry_policy.is_transient(response.status_code if response is not None else None, error):
+                self.circuit_breaker.record_success()
+                break
+
+            self.circuit_breaker.record_failure()
+            attempt += 1
+            if not self.retry_policy.should_retry(method, attempt):
+                break
+            delay = self.retry_policy.next_delay(delay)
+            time.sleep(delay)
+
+        if method != "get" and self.cache:
+            for prefix in invalidation_prefixes(endpoint):
+                self.cache.invalidate(prefix, self._cache_namespace)
+        if error is not None:
+            raise error
         response.raise_for_status()
+        return response
+
+    def _fetch(self, endpoint, params=None, headers=None):
+        """Send a GET request to the API, bypassing the cache, and return the response."""
+        return self._send("get", endpoint, params=params, headers=headers)
+
+    def _decode(self, response):
+        """Decode a JSON response body, or return None for an empty one such as 204 No Content."""
+        if response.status_code == 204 or not response.content:
+            return None
+        if self._loads:
+            return self._loads(response.content)
         return response.json()
 
+    def get_raw(self, endpoint, params=None):
+        """
+        Send a GET request and return the undecoded response body.
+
+        The body is neither decoded nor cached, so it can be written straight to a file
+        or handed to another store without a decode and re-encode round trip.
+
+        Args:
+            endpoint (str): The API endpoint, relative to the base URL, e.g. "me/tracks".
+            params (dict): The query parameters.
+
+        Returns:
+            bytes: The raw JSON body.
+        """
+        return self._fetch(endpoint, params).content
+
     def _post(self, endpoint, data=None):
         """Helper method for POST requests."""
-        url = f"{self.base_url}/{endpoint}"
-        response = requests.post(url, headers=self.headers, json=data)
-        response.raise_for_status()
-        return response.json()
+        return self._decode(self._send("post", endpoint, json=data))
 
     def _put(self, endpoint, data=None):
         """Helper method for PUT requests."""
-        url = f"{self.base_url}/{endpoint}"
-        response = requests.put(url, headers=self.headers, json=data)
-        response.raise_for_status()
-        return response.json()
+        return self._decode(self._send("put", endpoint, json=data))
 
     def _delete(self, endpoint, data=None):
         """Helper method for DELETE requests."""
-        url = f"{self.base_url}/{endpoint}"
-        response = requests.delete(url, headers=self.headers, json=data)
-        response.raise_for_status()
-        return response.json()
+        return self._decode(self._send("delete", endpoint, json=data))
+
+    def _call(self, request):
+        """Send a request built by spotylog.api and return its parsed result."""
+        if request.method == "get":
+            body = self._get(request.endpoint, params=request.params)
+        else:
+            body = getattr(self, f"_{request.method}")(request.endpoint, data=request.data)
+        return request.parse(body) if request.parse else body
+
+    def _paginate(self, request, prefetch=False, page=None):
+        """
+        Yield the items of a paged request one at a time, following `next` links.
+
+        Only the current page (and the prefetched one) is held in memory.
+
+        Args:
+            request (ApiRequest): The request for the first page.
+            prefetch (bool): Whether to fetch the next page in the background while the current one is consumed.
+            page (dict): An already fetched first page. If given, `request` is not sent.
+
+        Yields:
+            dict: The items of every page, in order.
+        """
+        def fetch(endpoint, params=None):
+            return api.page_of(request, self._get(endpoint, params=params))
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            if page is None:
+                page = fetch(request.endpoint, request.params)
+            while page:
+                next_url = page.get("next")
+                future = None
+                if next_url and executor:
+                    future = executor.submit(fetch, api.endpoint_from_url(self.base_url, next_url))
+                yield from page.get("items", [])
+                if not next_url:
+                    break
+                page = future.result() if future else fetch(api.endpoint_from_url(self.base_url, next_url))
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_all_pages(self, request, page=None, max_workers=8):
+        """
+        Fetch every item of a paged request, requesting the remaining pages concurrently.
+
+        The first page reports `total`, so the offsets of every other page are known up
+        front and can be requested in parallel instead of following `next` links one by one.
+
+        Args:
+            request (ApiRequest): The request for the first page; its params are applied to every page.
+            page (dict): An already fetched first page. If given, `request` is not sent.
+            max_workers (int): The maximum number of pages requested at once.
+
+        Returns:
+            list: All items, in the order the API returns them.
+        """
+        def fetch(offset):
+            paged = api.with_offset(request, offset)
+            return api.page_of(request, self._get(paged.endpoint, params=paged.params))
+
+        if page is None:
+            page = fetch((request.params or {}).get("offset", 0))
+        items = list(page.get("items", []))
+        offsets = api.remaining_offsets(page)
+        if not offsets:
+            return items
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for next_page in executor.map(fetch, offsets):
+                items.extend(next_page.get("items", []))
+        return items
+
+    def _dispatch_chunks(self, func, chunks, max_workers=8):
+        """
+        Call `func` once per chunk, concurrently, and return the results in chunk order.
+
+        Args:
+            func (callable): The function to call with each chunk.
+            chunks (list): The chunks, as built by chunked.
+            max_workers (int): The maximum number of requests in flight at once.
+
+        Returns:
+            list: The result of each call, aligned with `chunks`.
+        """
+        if len(chunks) <= 1:
+            return [func(chunk) for chunk in chunks]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(func, chunks))
 
     def search(self, query, type="track", limit=10):
         """Search for tracks, albums, artists, or playlists."""
-        params = {
-            "q": query,
-            "type": type,
-            "limit": limit,
-        }
-        return self._get("search", params=params)
+        return self._call(api.search(query, type=type, limit=limit))
 
     def get_user_playlists(self):
         """Get the current user's playlists."""
-        return self._get("me/playlists")
+        return self._call(api.user_playlists())
+
+    def iter_user_playlists(self, page_size=50, prefetch=False):
+        """
+        Iterate over all of the current user's playlists.
+
+        Args:
+            page_size (int): The number of playlists requested per page (max 50).
+            prefetch (bool): Whether to fetch the next page in the background.
+
+        Yields:
+            dict: Each playlist.
+        """
+        return self._paginate(api.user_playlists(limit=page_size), prefetch=prefetch)
+
+    def get_all_user_playlists(self, max_workers=8):
+        """
+        Fetch all of the current user's playlists, requesting pages concurrently.
+
+        Args:
+            max_workers (int): The maximum number of pages requested at once.
+
+        Returns:
+            list: All playlists, in order.
+        """
+        return self._fetch_all_pages(api.user_playlists(limit=50), max_workers=max_workers)
 
     def create_playlist(self, user_id, name, description="", public=False):
         """Create a new playlist for the user."""
-        data = {
-            "name": name,
-            "description": description,
-            "public": public,
-        }
-        return self._post(f"users/{user_id}/playlists", data=data)
+        return self._call(api.create_playlist(user_id, name, description, public))
 
     def save_search_results_to_excel(self, query, type="track", limit=10, filename="search_results.xlsx"):
         """
@@ -75,35 +361,9 @@ class SpotifyClient:
             filename (str): The name of the Excel file.
         """
         results = self.search(query, type=type, limit=limit)
-        items = results.get(f"{type}s", {}).get("items", [])
-
-        # Format data for Excel
-        data = []
-        for item in items:
-            if type == "track":
-                data.append({
-                    "Name": item.get("name"),
-                    "Artists": ", ".join(artist["name"] for artist in item.get("artists", [])),
-                    "Album": item.get("album", {}).get("name"),
-                    "Duration (ms)": item.get("duration_ms"),
-                    "Popularity": item.get("popularity"),
-                })
-            elif type == "album":
-                data.append({
-                    "Name": item.get("name"),
-                    "Artists": ", ".join(artist["name"] for artist in item.get("artists", [])),
-                    "Release Date": item.get("release_date"),
-                    "Total Tracks": item.get("total_tracks"),
-                })
-            elif type == "artist":
-                data.append({
-                    "Name": item.get("name"),
-                    "Genres": ", ".join(item.get("genres", [])),
-                    "Popularity": item.get("popularity"),
-                })
 
         # Save to Excel
-        save_to_excel(data, filename)
+        save_to_excel(api.format_search_results(results, type), filename)
 
     def save_user_playlists_to_excel(self, filename="user_playlists.xlsx"):
         """
@@ -114,19 +374,69 @@ class SpotifyClient:
         """
         playlists = self.get_user_playlists().get("items", [])
 
-        # Format data for Excel
-        data = []
-        for playlist in playlists:
-            data.append({
-                "Name": playlist.get("name"),
-                "Description": playlist.get("description"),
-                "Owner": playlist.get("owner", {}).get("display_name"),
-                "Tracks": playlist.get("tracks", {}).get("total"),
-                "Public": playlist.get("public"),
-            })
-
         # Save to Excel
-        save_to_excel(data, filename)
+        save_to_excel(api.format_playlists(playlists), filename)
+
+    def export_recently_played(self, filename, format=None):
+        """
+        Append the tracks played since the last export to a CSV, NDJSON or Parquet export.
+
+        The newest played_at written is kept in a watermark file next to the export and
+        sent as the `after` cursor on the next run, so only new plays are fetched. Pages
+        are fetched until one comes back short, as HistoryLogger.poll() does.
+
+        Args:
+            filename (str): The export file, or dataset directory for Parquet. The format follows its extension.
+            format (str): "csv", "ndjson" or "parquet", to override the extension.
+
+        Returns:
+            int: The number of plays appended.
+        """
+        export = incremental.RecentlyPlayedExport(filename)
+        while not export.done:
+            export.add(self.get_recently_played_tracks(after=export.after, limit=incremental.RECENTLY_PLAYED_LIMIT))
+        return incremental.append_items(export.items(), filename, "played_at", export.watermark, format)
+
+    def export_saved_tracks(self, filename, format=None):
+        """
+        Append the tracks saved since the last export to a CSV, NDJSON or Parquet export.
+
+        Saved tracks come newest first, so pages stop being fetched at the first track
+        that is older than the watermark.
+
+        Args:
+            filename (str): The export file, or dataset directory for Parquet. The format follows its extension.
+            format (str): "csv", "ndjson" or "parquet", to override the extension.
+
+        Returns:
+            int: The number of tracks appended.
+        """
+        watermark = incremental.read_watermark(filename)
+        items = takewhile(lambda item: not incremental.is_older(item, "added_at", watermark), self.iter_saved_tracks())
+        items = incremental.new_items(items, "added_at", watermark)
+        return incremental.append_items(items, filename, "added_at", watermark, format)
+
+    def export_playlist_tracks(self, playlist_id, filename, format=None):
+        """
+        Append the tracks added to a playlist since the last export to a CSV, NDJSON or Parquet export.
+
+        The playlist's snapshot_id is recorded in the watermark, so a playlist that has
+        not changed costs a single small request.
+
+        Args:
+            playlist_id (str): The ID of the playlist.
+            filename (str): The export file, or dataset directory for Parquet. The format follows its extension.
+            format (str): "csv", "ndjson" or "parquet", to override the extension.
+
+        Returns:
+            int: The number of tracks appended.
+        """
+        watermark = incremental.read_watermark(filename)
+        snapshot_id = self.get_playlist(playlist_id, fields="snapshot_id").get("snapshot_id")
+        if watermark and snapshot_id == watermark.get("snapshot_id"):
+            return 0
+        items = incremental.new_items(self.iter_playlist_tracks(playlist_id), "added_at", watermark)
+        return incremental.append_items(items, filename, "added_at", watermark, format, snapshot_id=snapshot_id)
 
     def generate_playlist(self, user_id, name, description="", public=False, tracks=None):
         """
@@ -141,16 +451,15 @@ class SpotifyClient:
         """
         if not tracks:
             # Get recommended tracks based on user's top tracks
-            top_tracks = self._get("me/top/tracks", params={"limit": 5})
-            seed_tracks = ",".join([track["id"] for track in top_tracks["items"]])
-            recommendations = self._get("recommendations", params={"seed_tracks": seed_tracks})
-            tracks = [track["id"] for track in recommendations["tracks"]]
+            top_tracks = self.get_top_tracks(limit=5)
+            recommendations = self.get_recommendations(seed_tracks=[track["id"] for track in top_tracks])
+            tracks = [track["id"] for track in recommendations]
 
         # Create the playlist
         playlist = self.create_playlist(user_id, name, description, public)
 
         # Add tracks to the playlist
-        self._post(f"playlists/{playlist['id']}/tracks", data={"uris": [f"spotify:track:{track_id}" for track_id in tracks]})
+        self.add_tracks_to_playlist(playlist["id"], [f"spotify:track:{track_id}" for track_id in tracks])
         return playlist
 
     def get_recently_played_tracks(self, after=None, before=None, limit=50):
@@ -165,14 +474,20 @@ class SpotifyClient:
         Returns:
             list: A list of recently played tracks.
         """
-        params = {"limit": limit}
-        if after:
-            params["after"] = after
-        if before:
-            params["before"] = before
+        return self._call(api.recently_played(after=after or None, before=before or None, limit=limit))
 
-        response = self._get("me/player/recently-played", params=params)
-        return response.get("items", [])
+    def iter_recently_played(self, page_size=50, prefetch=False):
+        """
+        Iterate over the recently played tracks, following the `before` cursor.
+
+        Args:
+            page_size (int): The number of tracks requested per page (max 50).
+            prefetch (bool): Whether to fetch the next page in the background.
+
+        Yields:
+            dict: Each play history item, with the track under "track".
+        """
+        return self._paginate(api.recently_played(limit=page_size), prefetch=prefetch)
 
     def get_top_tracks(self, time_range="medium_term", limit=20):
         """
@@ -185,12 +500,21 @@ class SpotifyClient:
         Returns:
             list: A list of top tracks.
         """
-        params = {
-            "time_range": time_range,
-            "limit": limit,
-        }
-        response = self._get("me/top/tracks", params=params)
-        return response.get("items", [])
+        return self._call(api.top_items("tracks", time_range, limit))
+
+    def iter_top_tracks(self, time_range="medium_term", page_size=50, prefetch=False):
+        """
+        Iterate over all of the user's top tracks for a specific time range.
+
+        Args:
+            time_range (str): The time range for the data. Options: "short_term", "medium_term", "long_term".
+            page_size (int): The number of tracks requested per page (max 50).
+            prefetch (bool): Whether to fetch the next page in the background.
+
+        Yields:
+            dict: Each top track.
+        """
+        return self._paginate(api.top_items("tracks", time_range, page_size), prefetch=prefetch)
 
     def get_top_artists(self, time_range="medium_term", limit=20):
         """
@@ -203,29 +527,96 @@ class SpotifyClient:
         Returns:
             list: A list of top artists.
         """
-        params = {
-            "time_range": time_range,
-            "limit": limit,
-        }
-        response = self._get("me/top/artists", params=params)
-        return response.get("items", [])
+        return self._call(api.top_items("artists", time_range, limit))
 
-    def get_playlist_snapshot(self, playlist_id):
+    def iter_top_artists(self, time_range="medium_term", page_size=50, prefetch=False):
+        """
+        Iterate over all of the user's top artists for a specific time range.
+
+        Args:
+            time_range (str): The time range for the data. Options: "short_term", "medium_term", "long_term".
+            page_size (int): The number of artists requested per page (max 50).
+            prefetch (bool): Whether to fetch the next page in the background.
+
+        Yields:
+            dict: Each top artist.
+        """
+        return self._paginate(api.top_items("artists", time_range, page_size), prefetch=prefetch)
+
+    def get_playlist(self, playlist_id, fields=None):
+        """
+        Fetch a playlist.
+
+        Args:
+            playlist_id (str): The ID of the playlist.
+            fields (str): A Spotify `fields` projection, e.g. "name,tracks.items(track(id))", to download only those fields.
+
+        Returns:
+            dict: The playlist object, including the first page of its tracks.
+        """
+        return self._call(api.playlist(playlist_id, fields=fields))
+
+    def get_playlist_tracks_page(self, playlist_id, offset=0, limit=100, fields=None):
+        """
+        Fetch one page of a playlist's tracks.
+
+        Args:
+            playlist_id (str): The ID of the playlist.
+            offset (int): The index of the first track of the page.
+            limit (int): The number of tracks per page (max 100).
+            fields (str): A `fields` projection for the page.
+
+        Returns:
+            dict: The paging object, with the playlist items under "items" and the playlist length under "total".
+        """
+        return self._call(api.with_offset(api.playlist_tracks(playlist_id, limit=limit, fields=fields), offset))
+
+    def get_playlist_snapshot(self, playlist_id, max_workers=8):
         """
         Fetch a snapshot of a playlist's current state.
+
+        Only track IDs are downloaded, using a minimal `fields` projection.
         
         Args:
             playlist_id (str): The ID of the playlist.
+            max_workers (int): The maximum number of track pages requested at once.
         
         Returns:
             dict: A snapshot of the playlist's tracks.
         """
-        playlist = self._get(f"playlists/{playlist_id}")
-        return {
-            "id": playlist["id"],
-            "name": playlist["name"],
-            "tracks": [track["track"]["id"] for track in playlist["tracks"]["items"]],
-        }
+        playlist = self._call(api.playlist(playlist_id, fields=api.SNAPSHOT_FIELDS))
+        tracks = api.playlist_tracks(playlist_id, fields=api.SNAPSHOT_TRACK_FIELDS)
+        items = self._fetch_all_pages(tracks, page=playlist["tracks"], max_workers=max_workers)
+        return api.playlist_snapshot(playlist, items)
+
+    def iter_playlist_tracks(self, playlist_id, page_size=100, prefetch=False, fields=None):
+        """
+        Iterate over all tracks of a playlist.
+
+        Args:
+            playlist_id (str): The ID of the playlist.
+            page_size (int): The number of tracks requested per page (max 100).
+            prefetch (bool): Whether to fetch the next page in the background.
+            fields (str): A `fields` projection for each page. It must keep "next" for pagination to continue.
+
+        Yields:
+            dict: Each playlist item, with the track under "track".
+        """
+        return self._paginate(api.playlist_tracks(playlist_id, limit=page_size, fields=fields), prefetch=prefetch)
+
+    def get_all_playlist_tracks(self, playlist_id, max_workers=8, fields=None):
+        """
+        Fetch all tracks of a playlist, requesting pages concurrently.
+
+        Args:
+            playlist_id (str): The ID of the playlist.
+            max_workers (int): The maximum number of pages requested at once.
+            fields (str): A `fields` projection for each page. It must keep "total" and "limit" for the pages to be fanned out.
+
+        Returns:
+            list: All playlist items, in order.
+        """
+        return self._fetch_all_pages(api.playlist_tracks(playlist_id, fields=fields), max_workers=max_workers)
 
     def compare_playlist_changes(self, old_snapshot, new_snapshot):
         """
@@ -238,13 +629,7 @@ class SpotifyClient:
         Returns:
             dict: A dictionary of changes (added_tracks, removed_tracks).
         """
-        old_tracks = set(old_snapshot["tracks"])
-        new_tracks = set(new_snapshot["tracks"])
-
-        return {
-            "added_tracks": list(new_tracks - old_tracks),
-            "removed_tracks": list(old_tracks - new_tracks),
-        }
+        return api.compare_playlist_changes(old_snapshot, new_snapshot)
 
     def start_playback(self, device_id=None, context_uri=None, uris=None):
         """
@@ -255,87 +640,108 @@ class SpotifyClient:
             context_uri (str): The context URI (e.g., a playlist or album).
             uris (list): A list of track URIs to play.
         """
-        data = {}
-        if context_uri:
-            data["context_uri"] = context_uri
-        if uris:
-            data["uris"] = uris
-        self._put(f"me/player/play?device_id={device_id}" if device_id else "me/player/play", data=data)
+        self._call(api.start_playback(device_id, context_uri, uris))
 
     def pause_playback(self, device_id=None):
         """Pause playback on a device."""
-        self._put(f"me/player/pause?device_id={device_id}" if device_id else "me/player/pause")
+        self._call(api.pause_playback(device_id))
 
     def skip_to_next(self, device_id=None):
         """Skip to the next track."""
-        self._post(f"me/player/next?device_id={device_id}" if device_id else "me/player/next")
+        self._call(api.skip_to_next(device_id))
 
     def skip_to_previous(self, device_id=None):
         """Skip to the previous track."""
-        self._post(f"me/player/previous?device_id={device_id}" if device_id else "me/player/previous")
+        self._call(api.skip_to_previous(device_id))
 
     def set_volume(self, volume_percent, device_id=None):
         """Set the playback volume."""
-        self._put(f"me/player/volume?volume_percent={volume_percent}&device_id={device_id}" if device_id else f"me/player/volume?volume_percent={volume_percent}")
+        self._call(api.set_volume(volume_percent, device_id))
 
-    def save_tracks(self, track_ids):
-        """Save tracks to the user's library."""
-        self._put("me/tracks", data={"ids": track_ids})
+    def save_tracks(self, track_ids, max_workers=8):
+        """Save tracks to the user's library, sending batches of 50 IDs concurrently."""
+        chunks = chunked(track_ids, api.LIBRARY_BATCH_SIZE)
+        self._dispatch_chunks(lambda chunk: self._call(api.save_tracks(chunk)), chunks, max_workers)
 
-    def remove_tracks(self, track_ids):
-        """Remove tracks from the user's library."""
-        self._delete("me/tracks", data={"ids": track_ids})
+    def remove_tracks(self, track_ids, max_workers=8):
+        """Remove tracks from the user's library, sending batches of 50 IDs concurrently."""
+        chunks = chunked(track_ids, api.LIBRARY_BATCH_SIZE)
+        self._dispatch_chunks(lambda chunk: self._call(api.remove_tracks(chunk)), chunks, max_workers)
 
-    def check_saved_tracks(self, track_ids):
-        """Check if tracks are saved in the user's library."""
-        response = self._get("me/tracks/contains", params={"ids": ",".join(track_ids)})
-        return response
+    def check_saved_tracks(self, track_ids, max_workers=8):
+        """
+        Check if tracks are saved in the user's library.
+
+        Args:
+            track_ids (list): The track IDs to check. They are sent in concurrent batches of 50.
+            max_workers (int): The maximum number of requests in flight at once.
+
+        Returns:
+            list: One boolean per track ID, in input order.
+        """
+        chunks = chunked(track_ids, api.LIBRARY_BATCH_SIZE)
+        results = self._dispatch_chunks(lambda chunk: self._call(api.check_saved_tracks(chunk)), chunks, max_workers)
+        return [saved for result in results for saved in result]
+
+    def iter_saved_tracks(self, page_size=50, prefetch=False):
+        """
+        Iterate over all tracks saved in the user's library.
+
+        Args:
+            page_size (int): The number of tracks requested per page (max 50).
+            prefetch (bool): Whether to fetch the next page in the background.
+
+        Yields:
+            dict: Each saved item, with the track under "track".
+        """
+        return self._paginate(api.saved_tracks(limit=page_size), prefetch=prefetch)
+
+    def get_all_saved_tracks(self, max_workers=8):
+        """
+        Fetch all tracks saved in the user's library, requesting pages concurrently.
+
+        Args:
+            max_workers (int): The maximum number of pages requested at once.
+
+        Returns:
+            list: All saved items, in order.
+        """
+        return self._fetch_all_pages(api.saved_tracks(), max_workers=max_workers)
 
     def get_new_releases(self, limit=20):
         """Fetch new album releases."""
-        response = self._get("browse/new-releases", params={"limit": limit})
-        return response.get("albums", {}).get("items", [])
+        return self._call(api.new_releases(limit))
+
+    def iter_new_releases(self, page_size=50, prefetch=False):
+        """Iterate over all new album releases."""
+        return self._paginate(api.new_releases(page_size), prefetch=prefetch)
 
     def get_featured_playlists(self, limit=20):
         """Fetch featured playlists."""
-        response = self._get("browse/featured-playlists", params={"limit": limit})
-        return response.get("playlists", {}).get("items", [])
+        return self._call(api.featured_playlists(limit))
+
+    def iter_featured_playlists(self, page_size=50, prefetch=False):
+        """Iterate over all featured playlists."""
+        return self._paginate(api.featured_playlists(page_size), prefetch=prefetch)
 
     def get_recommendations(self, seed_tracks=None, seed_artists=None, seed_genres=None, limit=20):
         """Fetch personalized recommendations."""
-        params = {
-            "seed_tracks": ",".join(seed_tracks) if seed_tracks else None,
-            "seed_artists": ",".join(seed_artists) if seed_artists else None,
-            "seed_genres": ",".join(seed_genres) if seed_genres else None,
-            "limit": limit,
-        }
-        response = self._get("recommendations", params=params)
-        return response.get("tracks", [])
+        return self._call(api.recommendations(seed_tracks, seed_artists, seed_genres, limit))
 
     def reorder_playlist_tracks(self, playlist_id, range_start, insert_before, range_length=1):
         """Reorder tracks in a playlist."""
-        data = {
-            "range_start": range_start,
-            "insert_before": insert_before,
-            "range_length": range_length,
-        }
-        self._put(f"playlists/{playlist_id}/tracks", data=data)
+        self._call(api.reorder_playlist_tracks(playlist_id, range_start, insert_before, range_length))
 
     def add_tracks_to_playlist(self, playlist_id, track_uris):
-        """Add tracks to a playlist."""
-        self._post(f"playlists/{playlist_id}/tracks", data={"uris": track_uris})
+        """Add tracks to a playlist, sending batches of 100 URIs one after another to keep their order."""
+        for chunk in chunked(track_uris, api.PLAYLIST_BATCH_SIZE):
+            self._call(api.add_tracks_to_playlist(playlist_id, chunk))
 
-    def remove_tracks_from_playlist(self, playlist_id, track_uris):
-        """Remove tracks from a playlist."""
-        self._delete(f"playlists/{playlist_id}/tracks", data={"uris": track_uris})
+    def remove_tracks_from_playlist(self, playlist_id, track_uris, max_workers=8):
+        """Remove tracks from a playlist, sending batches of 100 URIs concurrently."""
+        chunks = chunked(track_uris, api.PLAYLIST_BATCH_SIZE)
+        self._dispatch_chunks(lambda chunk: self._call(api.remove_tracks_from_playlist(playlist_id, chunk)), chunks, max_workers)
 
     def update_playlist_details(self, playlist_id, name=None, description=None, public=None):
         """Update playlist details."""
-        data = {}
-        if name:
-            data["name"] = name
-        if description:
-            data["description"] = description
-        if public is not None:
-            data["public"] = public
-        self._put(f"playlists/{playlist_id}", data=data)
\ No newline at end of file
+        self._call(api.update_playlist_details(playlist_id, name, description, public))
\ No newline at end of file
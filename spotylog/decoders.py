@@ -0,0 +1,33 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def get_decoder(decoder="auto"):
+    """
+    Return a function that decodes a JSON body given as bytes.
+
+    Args:
+        decoder (str or callable): "auto" for orjson when it is installed and the standard
+            library otherwise, "orjson", "json", or a callable taking bytes.
+
+    Returns:
+        callable: The decoding function.
+
+    Raises:
+        ImportError: If "orjson" is requested but not installed.
+        ValueError: If the decoder name is unknown.
+    """
+    if callable(decoder):
+        return decoder
+    if decoder == "auto":
+        return orjson.loads if orjson else json.loads
+    if decoder == "orjson":
+        if orjson is None:
+            raise ImportError("orjson is not installed. Install it with `pip install orjson`.")
+        return orjson.loads
+    if decoder == "json":
+        return json.loads
+    raise ValueError(f"Unknown JSON decoder: {decoder!r}")
\ No newline at end of file
@@ -0,0 +1,139 @@
+# Order-aware diff of two playlist snapshots. The tracks kept in place are a longest
+# common subsequence of the two track lists; everything else is a delete, an insert, or,
+# when the same track is both deleted and inserted, a move.
+from bisect import bisect_left
+from collections import defaultdict, deque, namedtuple
+
+# One step of an edit script. Deletes and moves take `track_ids` from `old_index` in the
+# old list; inserts and moves put them at `new_index` in the new list. Each edit covers a
+# run of consecutive positions.
+Edit = namedtuple("Edit", ["op", "old_index", "new_index", "track_ids"])
+
+def longest_common_subsequence(old, new):
+    """
+    Find a longest common subsequence of two lists, with the Hunt-Szymanski algorithm.
+
+    It runs in O((n + r) log n) time, where r is the number of matching pairs, so it stays
+    fast on long playlists where each track appears only a few times. None stands for an
+    unknown item and only matches in the common prefix and suffix, so many of them can't
+    make r quadratic.
+
+    Args:
+        old (list): The first list.
+        new (list): The second list.
+
+    Returns:
+        list: (old_index, new_index) pairs of the matched items, in order.
+    """
+    # Skip the common prefix and suffix, which is most of the list for typical edits
+    start = 0
+    while start < len(old) and start < len(new) and old[start] == new[start]:
+        start += 1
+    end_old, end_new = len(old), len(new)
+    while end_old > start and end_new > start and old[end_old - 1] == new[end_new - 1]:
+        end_old -= 1
+        end_new -= 1
+
+    positions = defaultdict(list)
+    for i in range(end_old - 1, start - 1, -1):
+        if old[i] is not None:
+            positions[old[i]].append(i)
+
+    # thresholds[k] is the smallest old index ending a common subsequence of length k + 1,
+    # and links[k] the chain of matches leading to it
+    thresholds = []
+    links = []
+    for j in range(start, end_new):
+        # Old positions are visited in decreasing order so one new item matches at most once
+        for i in positions.get(new[j], ()):
+            k = bisect_left(thresholds, i)
+            link = ((i, j), links[k - 1] if k else None)
+            if k == len(thresholds):
+                thresholds.append(i)
+                links.append(link)
+            else:
+                thresholds[k] = i
+                links[k] = link
+
+    middle = []
+    link = links[-1] if links else None
+    while link is not None:
+        middle.append(link[0])
+        link = link[1]
+    middle.reverse()
+
+    prefix = [(i, i) for i in range(start)]
+    suffix = [(end_old + k, end_new + k) for k in range(len(old) - end_old)]
+    return prefix + middle + suffix
+
+def _runs(edits):
+    """Merge single-track edits on consecutive positions into range edits."""
+    merged = []
+    for edit in edits:
+        last = merged[-1] if merged else None
+        if (last is not None and last.op == edit.op
+                and (edit.old_index is None or edit.old_index == last.old_index + len(last.track_ids))
+                and (edit.new_index is None or edit.new_index == last.new_index + len(last.track_ids))):
+            merged[-1] = last._replace(track_ids=last.track_ids + edit.track_ids)
+        else:
+            merged.append(edit)
+    return merged
+
+def diff_tracks(old, new):
+    """
+    Build a minimal edit script turning one ordered track list into another.
+
+    The tracks of a longest common subsequence stay where they are. A track that is
+    removed from one place and added at another, including a duplicate moving around,
+    becomes a move instead of a delete and an insert. Consecutive tracks edited together
+    are merged into range edits.
+
+    Args:
+        old (list): The old track IDs, in playlist order. Duplicates are allowed.
+        new (list): The new track IDs.
+
+    Returns:
+        list: The Edit steps: deletes ordered by old index, then inserts and moves ordered by new index.
+    """
+    kept = longest_common_subsequence(old, new)
+    kept_old = {i for i, _ in kept}
+    kept_new = {j for _, j in kept}
+    deleted = [i for i in range(len(old)) if i not in kept_old]
+    inserted = [j for j in range(len(new)) if j not in kept_new]
+
+    # Pair each inserted track with the earliest unpaired deletion of the same track.
+    # Unknown (None) tracks are never paired, as there is no telling they are the same
+    sources = defaultdict(deque)
+    for i in deleted:
+        if old[i] is not None:
+            sources[old[i]].append(i)
+    placed = []
+    for j in inserted:
+        source = sources.get(new[j])
+        if source:
+            placed.append(Edit("move", source.popleft(), j, [new[j]]))
+        else:
+            placed.append(Edit("insert", None, j, [new[j]]))
+    moved = {edit.old_index for edit in placed if edit.op == "move"}
+    deletes = [Edit("delete", i, None, [old[i]]) for i in deleted if i not in moved]
+    return _runs(deletes) + _runs(placed)
+
+def apply_edits(old, edits):
+    """
+    Apply an edit script from diff_tracks() to a track list.
+
+    Args:
+        old (list): The old track IDs.
+        edits (list): The Edit steps.
+
+    Returns:
+        list: The new track IDs.
+    """
+    removed = set()
+    for edit in edits:
+        if edit.op in ("delete", "move"):
+            removed.update(range(edit.old_index, edit.old_index + len(edit.track_ids)))
+    tracks = [track for i, track in enumerate(old) if i not in removed]
+    for edit in sorted((edit for edit in edits if edit.op != "delete"), key=lambda edit: edit.new_index):
+        tracks[edit.new_index:edit.new_index] = edit.track_ids
+    return tracks
\ No newline at end of file
@@ -1,39 +1,330 @@
 import csv
+import gzip
+import io
 import json
+import os
+from itertools import chain, islice
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment
+from .utils import parse_timestamp
 
-def save_to_excel(data, filename="spotify_data.xlsx"):
-    """Save data to an Excel file with formatting."""
-    wb = Workbook()
-    ws = wb.active
+# The most rows an Excel worksheet can hold, header included
+EXCEL_MAX_ROWS = 1048576
 
-    if data:
-        headers = data[0].keys()
-        ws.append(headers)
+def _header_row(ws, headers):
+    """Build a bold, centered header row for a write-only worksheet."""
+    cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal="center")
+        cells.append(cell)
+    return cells
 
-        # Format headers
-        for cell in ws[1]:
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(horizontal="center")
+def save_to_excel(data, filename="spotify_data.xlsx", headers=None, max_rows_per_sheet=EXCEL_MAX_ROWS):
+    """
+    Save rows to an Excel file with formatting, streaming them to disk.
 
-        # Write data rows
-        for row in data:
+    The workbook is written in openpyxl's write-only mode, so rows are not kept in
+    memory and peak memory stays flat however many rows are written. When a sheet
+    is full, writing continues on a new sheet that repeats the header.
+
+    Args:
+        data (iterable): The rows, as dicts. Any iterator works, e.g. a generator over pages.
+        filename (str): The name of the Excel file.
+        headers (list): The columns to write. Defaults to the keys of the first row.
+        max_rows_per_sheet (int): The most rows per sheet, header included.
+
+    Returns:
+        int: The number of data rows written.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet")
+    rows = iter(data)
+    first = next(rows, None)
+    count = 0
+
+    if first is not None:
+        headers = list(headers or first.keys())
+        ws.append(_header_row(ws, headers))
+        sheet_rows = 1
+
+        # Write data rows, starting a new sheet whenever the current one is full
+        for row in chain([first], rows):
+            if sheet_rows >= max_rows_per_sheet:
+                ws = wb.create_sheet(f"Sheet{len(wb.worksheets) + 1}")
+                ws.append(_header_row(ws, headers))
+                sheet_rows = 1
             ws.append([row.get(header) for header in headers])
+            sheet_rows += 1
+            count += 1
 
     wb.save(filename)
     print(f"Data saved to {filename}")
+    return count
+
+def _open_text(filename, compression=None, buffer_size=1024 * 1024, append=False):
+    """
+    Open a file for writing text, compressing it on the fly.
+
+    Args:
+        filename (str): The file to write.
+        compression (str): "gzip", "zstd" or "none". Defaults to gzip for ".gz" and zstd for ".zst" files.
+        buffer_size (int): How many bytes are buffered before each write to the compressor or the file.
+        append (bool): Whether to add to the end of the file. Compressed files get a new gzip member or zstd frame.
+
+    Returns:
+        io.TextIOWrapper: The UTF-8 text stream, to be closed by the caller.
+    """
+    if compression is None:
+        compression = "gzip" if filename.endswith(".gz") else "zstd" if filename.endswith(".zst") else "none"
+    mode = "ab" if append else "wb"
+    if compression == "gzip":
+        raw = gzip.open(filename, mode)
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError("zstd compression needs the zstandard package. Install it with `pip install zstandard`.")
+        raw = zstandard.ZstdCompressor().stream_writer(open(filename, mode))
+    elif compression == "none":
+        raw = open(filename, mode, buffering=0)
+    else:
+        raise ValueError(f"Unknown compression: {compression!r}")
+    return io.TextIOWrapper(io.BufferedWriter(raw, buffer_size), encoding="utf-8", newline="")
+
+def save_to_csv(data, filename="spotify_data.csv", headers=None, compression=None, append=False):
+    """
+    Save rows to a CSV file, streaming them to disk.
+
+    Args:
+        data (iterable): The rows, as dicts. Any iterator works, e.g. a generator over pages.
+        filename (str): The name of the CSV file.
+        headers (list): The columns to write. Defaults to the keys of the first row; other keys are left out.
+        compression (str): "gzip", "zstd" or "none". Defaults to the file extension.
+        append (bool): Whether to add the rows to an existing file, whose header is then not repeated.
+
+    Returns:
+        int: The number of data rows written. With no rows, only the header is written, if known.
+    """
+    rows = iter(data)
+    first = next(rows, None)
+    count = 0
+    if append and first is None:
+        return count
+    new_file = not append or not os.path.exists(filename) or os.path.getsize(filename) == 0
+    with _open_text(filename, compression, append=append) as file:
+        if headers is None and first is not None:
+            headers = list(first.keys())
+        if headers is not None:
+            writer = csv.DictWriter(file, fieldnames=headers, extrasaction="ignore")
+            if new_file:
+                writer.writeheader()
+        if first is not None:
+            for row in chain([first], rows):
+                writer.writerow(row)
+                count += 1
+    print(f"Data saved to {filename}")
+    return count
+
+def save_to_json(data, filename="spotify_data.json", indent=4, compression=None):
+    """
+    Save rows to a JSON file as one array, streaming them to disk.
+
+    Args:
+        data (iterable): The rows. Any iterator works.
+        filename (str): The name of the JSON file.
+        indent (int): The indentation, as for json.dump. None writes the array compactly.
+        compression (str): "gzip", "zstd" or "none". Defaults to the file extension.
+
+    Returns:
+        int: The number of rows written.
+    """
+    separator = "," if indent is not None else ", "
+    pad = " " * (indent or 0)
+    count = 0
+    with _open_text(filename, compression) as file:
+        file.write("[")
+        for row in data:
+            text = json.dumps(row, indent=indent)
+            if indent is not None:
+                # Indent each element one level inside the array, as json.dump does
+                text = "\n" + "\n".join(pad + line for line in text.split("\n"))
+            file.write(separator + text if count else text)
+            count += 1
+        file.write("\n]" if count and indent is not None else "]")
+    print(f"Data saved to {filename}")
+    return count
+
+def save_to_ndjson(data, filename="spotify_data.ndjson", compression=None, append=False):
+    """
+    Save rows to a newline-delimited JSON file, one compact JSON object per line.
+
+    Args:
+        data (iterable): The rows. Any iterator works.
+        filename (str): The name of the NDJSON file.
+        compression (str): "gzip", "zstd" or "none". Defaults to the file extension.
+        append (bool): Whether to add the rows to the end of an existing file.
+
+    Returns:
+        int: The number of rows written.
+    """
+    count = 0
+    with _open_text(filename, compression, append=append) as file:
+        for row in data:
+            file.write(json.dumps(row, separators=(",", ":")))
+            file.write("\n")
+            count += 1
+    print(f"Data saved to {filename}")
+    return count
+
+# Column types for the rows built by spotylog.api, by column name. Other columns are
+# typed from their value in the first row, or written as strings.
+ARROW_TYPES = {
+    "Played At": "timestamp",
+    "Added At": "timestamp",
+    "Duration (ms)": "int64",
+    "Popularity": "int16",
+    "Total Tracks": "int32",
+    "Tracks": "int32",
+    "Public": "bool",
+}
+
+# Columns with few distinct values, stored dictionary-encoded
+DICTIONARY_COLUMNS = ("Artists", "Album", "Owner", "Genres")
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Arrow and Parquet export need the pyarrow package. Install it with `pip install pyarrow`.")
+    return pyarrow
+
+def _arrow_schema(pa, row):
+    """Infer an Arrow schema from the first row."""
+    types = {
+        "timestamp": pa.timestamp("ms", tz="UTC"),
+        "int64": pa.int64(),
+        "int32": pa.int32(),
+        "int16": pa.int16(),
+        "bool": pa.bool_(),
+    }
+    fields = []
+    for name, value in row.items():
+        if name in ARROW_TYPES:
+            type = types[ARROW_TYPES[name]]
+        elif isinstance(value, bool):
+            type = pa.bool_()
+        elif isinstance(value, int):
+            type = pa.int64()
+        elif isinstance(value, float):
+            type = pa.float64()
+        else:
+            type = pa.string()
+        fields.append(pa.field(name, type))
+    return pa.schema(fields)
+
+def _record_batches(pa, data, schema, batch_size):
+    """
+    Turn rows into Arrow record batches of at most `batch_size` rows.
+
+    Args:
+        pa (module): The pyarrow module.
+        data (iterable): The rows, as dicts.
+        schema (pyarrow.Schema): The schema, or None to infer it from the first row.
+        batch_size (int): The number of rows per batch.
+
+    Returns:
+        tuple: The schema and an iterator over the record batches.
+    """
+    rows = iter(data)
+    first = next(rows, None)
+    if schema is None:
+        schema = _arrow_schema(pa, first) if first is not None else pa.schema([])
+    timestamps = [field.name for field in schema if pa.types.is_timestamp(field.type)]
+
+    def batches():
+        if first is None:
+            return
+        pending = chain([first], rows)
+        while True:
+            chunk = list(islice(pending, batch_size))
+            if not chunk:
+                return
+            columns = {field.name: [row.get(field.name) for row in chunk] for field in schema}
+            for name in timestamps:
+                columns[name] = [parse_timestamp(value) for value in columns[name]]
+            yield pa.RecordBatch.from_pydict(columns, schema=schema)
 
-def save_to_csv(data, filename="spotify_data.csv"):
-    """Save data to a CSV file."""
-    with open(filename, mode="w", newline="", encoding="utf-8") as file:
-        writer = csv.DictWriter(file, fieldnames=data[0].keys())
-        writer.writeheader()
-        writer.writerows(data)
+    return schema, batches()
+
+def save_to_parquet(data, filename="spotify_data.parquet", schema=None, row_group_size=65536, compression="zstd", append=False):
+    """
+    Save rows to a Parquet file with typed columns, streaming them to disk one row group at a time.
+
+    Timestamps such as "Played At" are stored as UTC timestamps, durations and
+    popularity as integers, and artist and album names dictionary-encoded.
+
+    Args:
+        data (iterable): The rows, as dicts. Any iterator works, e.g. api.track_rows() over a pagination iterator.
+        filename (str): The name of the Parquet file.
+        schema (pyarrow.Schema): The column types. Defaults to ARROW_TYPES and the values of the first row.
+        row_group_size (int): The number of rows per row group, and so held in memory at once.
+        compression (str): The Parquet compression codec, e.g. "zstd", "snappy" or "none".
+        append (bool): Treat `filename` as a dataset directory and add the rows to it as a new part file.
+            pandas, DuckDB and pyarrow read the directory as one table.
+
+    Returns:
+        int: The number of rows written.
+    """
+    pa = _import_pyarrow()
+    import pyarrow.parquet as pq
+
+    if append:
+        if os.path.isfile(filename):
+            raise ValueError(f"{filename} is a file; appending needs a Parquet dataset directory.")
+        rows = iter(data)
+        first = next(rows, None)
+        if first is None:
+            return 0
+        data = chain([first], rows)
+        os.makedirs(filename, exist_ok=True)
+        parts = [name for name in os.listdir(filename) if name.endswith(".parquet")]
+        filename = os.path.join(filename, f"part-{len(parts):05d}.parquet")
+
+    schema, batches = _record_batches(pa, data, schema, row_group_size)
+    dictionary = [field.name for field in schema if field.name in DICTIONARY_COLUMNS]
+    count = 0
+    with pq.ParquetWriter(filename, schema, compression=compression, use_dictionary=dictionary) as writer:
+        for batch in batches:
+            writer.write_batch(batch, row_group_size=row_group_size)
+            count += batch.num_rows
     print(f"Data saved to {filename}")
+    return count
+
+def save_to_arrow(data, filename="spotify_data.arrow", schema=None, batch_size=65536, compression="zstd"):
+    """
+    Save rows to an Arrow IPC (Feather v2) file with typed columns, streaming them to disk in record batches.
+
+    Args:
+        data (iterable): The rows, as dicts. Any iterator works.
+        filename (str): The name of the Arrow file.
+        schema (pyarrow.Schema): The column types. Defaults to ARROW_TYPES and the values of the first row.
+        batch_size (int): The number of rows per record batch.
+        compression (str): "zstd", "lz4" or None.
 
-def save_to_json(data, filename="spotify_data.json"):
-    """Save data to a JSON file."""
-    with open(filename, mode="w", encoding="utf-8") as file:
-        json.dump(data, file, indent=4)
-    print(f"Data saved to {filename}")
\ No newline at end of file
+    Returns:
+        int: The number of rows written.
+    """
+    pa = _import_pyarrow()
+
+    schema, batches = _record_batches(pa, data, schema, batch_size)
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    count = 0
+    with pa.OSFile(filename, "wb") as sink, pa.ipc.new_file(sink, schema, options=options) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            count += batch.num_rows
+    print(f"Data saved to {filename}")
+    return count
\ No newline at end of file
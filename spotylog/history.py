@@ -0,0 +1,275 @@
+import sqlite3
+import threading
+from datetime import datetime
+import requests
+from .retry import CircuitOpenError
+from .utils import timestamp_ms
+
+# The most plays me/player/recently-played returns per request
+RECENTLY_PLAYED_LIMIT = 50
+
+# The plays columns plus the play's artist IDs from play_artists, joined with ",". Spotify
+# IDs are base62, so the join can be split back without ambiguity, unlike artist names.
+_PLAY_COLUMNS = ("plays.*, (SELECT group_concat(artist_id) FROM play_artists "
+                 "WHERE play_artists.played_at = plays.played_at) AS artist_ids")
+
+def _where(start, end, column="plays.played_at"):
+    """Build the SQL condition and parameters for a [start, end) time range."""
+    conditions, params = [], []
+    if start is not None:
+        conditions.append(f"{column} >= ?")
+        params.append(timestamp_ms(start))
+    if end is not None:
+        conditions.append(f"{column} < ?")
+        params.append(timestamp_ms(end))
+    return conditions, params
+
+def _is_outage(error):
+    """Return whether an HTTP error means the API is down or rate limiting, rather than a problem with the request."""
+    response = error.response
+    return response is not None and (response.status_code == 429 or response.status_code >= 500)
+
+class HistoryStore:
+    def __init__(self, path="spotylog_history.sqlite"):
+        """
+        An append-only SQLite store of listening history, one row per play.
+
+        Plays are keyed by their played_at time in milliseconds, so the same play
+        fetched twice is only stored once, and the newest stored play is the cursor
+        to resume from after a restart. played_at is the table's primary key, so time
+        ranges are read in order straight from it; plays are also indexed by track and,
+        through the play_artists table, by artist. Artist names are kept once per artist
+        in the artists table.
+
+        Args:
+            path (str): The SQLite file. ":memory:" keeps the history in memory.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS plays ("
+            "played_at INTEGER PRIMARY KEY, track_id TEXT, track_name TEXT, artists TEXT, "
+            "album TEXT, duration_ms INTEGER, context_uri TEXT)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS play_artists ("
+            "artist_id TEXT NOT NULL, played_at INTEGER NOT NULL, PRIMARY KEY (artist_id, played_at)) WITHOUT ROWID"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS artists (artist_id TEXT PRIMARY KEY, name TEXT)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS plays_track_id ON plays (track_id, played_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS play_artists_played_at ON play_artists (played_at)")
+        self._db.commit()
+
+    def add(self, items):
+        """
+        Insert play history items in one transaction, skipping plays already stored.
+
+        Args:
+            items (iterable): Play history items from me/player/recently-played.
+
+        Returns:
+            int: The number of new plays stored.
+        """
+        rows = []
+        artists = []
+        names = {}
+        for item in items:
+            track = item.get("track") or {}
+            played_at = timestamp_ms(item["played_at"])
+            for artist in track.get("artists", []):
+                if artist.get("id"):
+                    artists.append((artist["id"], played_at))
+                    names[artist["id"]] = artist.get("name")
+            rows.append((
+                played_at,
+                track.get("id"),
+                track.get("name"),
+                ", ".join(artist["name"] for artist in track.get("artists", [])),
+                (track.get("album") or {}).get("name"),
+                track.get("duration_ms"),
+                (item.get("context") or {}).get("uri"),
+            ))
+        with self._lock:
+            with self._db:
+                inserted = self._db.executemany("INSERT OR IGNORE INTO plays VALUES (?, ?, ?, ?, ?, ?, ?)", rows).rowcount
+                self._db.executemany("INSERT OR IGNORE INTO play_artists VALUES (?, ?)", artists)
+                self._db.executemany("INSERT OR REPLACE INTO artists VALUES (?, ?)", names.items())
+            return inserted
+
+    def artist_names(self):
+        """Return the name of every artist in the history, keyed by artist ID."""
+        with self._lock:
+            return dict(self._db.execute("SELECT artist_id, name FROM artists"))
+
+    def cursor(self):
+        """Return the played_at of the newest stored play, in Unix milliseconds, or None if the store is empty."""
+        with self._lock:
+            return self._db.execute("SELECT MAX(played_at) FROM plays").fetchone()[0]
+
+    def _query(self, sql, params, batch_size):
+        """Run a query and yield its rows, reading `batch_size` rows at a time."""
+        with self._lock:
+            cursor = self._db.cursor()
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(sql, params)
+        try:
+            while True:
+                with self._lock:
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+    def plays(self, start=None, end=None, track_id=None, artist_id=None, batch_size=1000):
+        """
+        Yield the stored plays in a time range, oldest first, as they are read from the database.
+
+        Args:
+            start: The earliest play to include, as a datetime, an ISO 8601 string or Unix milliseconds.
+            end: The play time to stop before, in the same forms.
+            track_id (str): Only include plays of this track.
+            artist_id (str): Only include plays of tracks by this artist.
+            batch_size (int): How many rows are read from the database at a time.
+
+        Yields:
+            sqlite3.Row: Each play, with the columns played_at (Unix milliseconds), track_id, track_name,
+            artists (names joined with ", ", for display), album, duration_ms and context_uri, and
+            artist_ids (the artists' IDs joined with ",", or None if they have no ID).
+        """
+        if artist_id is not None:
+            conditions, params = _where(start, end, "play_artists.played_at")
+            sql = (f"SELECT {_PLAY_COLUMNS} FROM play_artists JOIN plays ON plays.played_at = play_artists.played_at "
+                   "WHERE " + " AND ".join(["play_artists.artist_id = ?"] + conditions) + " ORDER BY play_artists.played_at")
+            params.insert(0, artist_id)
+        else:
+            conditions, params = _where(start, end)
+            if track_id is not None:
+                conditions.insert(0, "plays.track_id = ?")
+                params.insert(0, track_id)
+            sql = f"SELECT {_PLAY_COLUMNS} FROM plays" + (" WHERE " + " AND ".join(conditions) if conditions else "") + " ORDER BY played_at"
+        return self._query(sql, params, batch_size)
+
+    def count(self, start=None, end=None):
+        """Return the number of plays in a [start, end) time range, counted from the played_at index."""
+        conditions, params = _where(start, end)
+        sql = "SELECT COUNT(*) FROM plays" + (" WHERE " + " AND ".join(conditions) if conditions else "")
+        with self._lock:
+            return self._db.execute(sql, params).fetchone()[0]
+
+    def plays_per_day(self, start=None, end=None, utc_offset=0):
+        """
+        Count plays per calendar day.
+
+        Args:
+            start: The earliest play to include, as for plays().
+            end: The play time to stop before.
+            utc_offset (int): The offset of the days' time zone from UTC, in seconds, e.g. 3600 for UTC+1.
+
+        Returns:
+            list: (date, count) pairs in date order, with dates as datetime.date.
+        """
+        conditions, params = _where(start, end)
+        sql = ("SELECT date((played_at / 1000) + ?, 'unixepoch') AS day, COUNT(*) FROM plays"
+               + (" WHERE " + " AND ".join(conditions) if conditions else "") + " GROUP BY day ORDER BY day")
+        with self._lock:
+            rows = self._db.execute(sql, [utc_offset] + params).fetchall()
+        return [(datetime.strptime(day, "%Y-%m-%d").date(), count) for day, count in rows]
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM plays").fetchone()[0]
+
+    def close(self):
+        """Close the database."""
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class HistoryLogger:
+    def __init__(self, client, store, active_interval=120.0, idle_interval=1800.0):
+        """
+        Keep the whole listening history by polling recently played tracks into a HistoryStore.
+
+        The API only returns the last 50 plays, so they must be collected before they
+        fall out of that window. Polls that find new plays are followed by a short wait;
+        while nothing is playing the wait doubles up to `idle_interval`, which should
+        stay well under the time it takes to play 50 tracks.
+
+        Args:
+            client (SpotifyClient): The client used to fetch recently played tracks.
+            store (HistoryStore): Where plays are stored. Its newest play is the `after` cursor.
+            active_interval (float): The wait after a poll that found new plays, in seconds.
+            idle_interval (float): The longest wait between polls, in seconds.
+        """
+        self.client = client
+        self.store = store
+        self.active_interval = active_interval
+        self.idle_interval = idle_interval
+        self.interval = active_interval
+
+    def poll(self):
+        """
+        Fetch and store the plays newer than the stored cursor.
+
+        A full page means more plays may be waiting, so pages are fetched until one
+        comes back short.
+
+        Returns:
+            int: The number of new plays stored.
+        """
+        added = 0
+        while True:
+            items = self.client.get_recently_played_tracks(after=self.store.cursor(), limit=RECENTLY_PLAYED_LIMIT)
+            inserted = self.store.add(items)
+            added += inserted
+            if len(items) < RECENTLY_PLAYED_LIMIT or not inserted:
+                return added
+
+    def next_interval(self, added):
+        """Return the wait before the next poll: short after new plays, growing while idle."""
+        if added:
+            self.interval = self.active_interval
+        else:
+            self.interval = min(self.idle_interval, self.interval * 2)
+        return self.interval
+
+    def run(self, stop_event=None, max_polls=None):
+        """
+        Poll until `stop_event` is set or `max_polls` polls have been made.
+
+        Connection problems, 5xx and 429 responses that outlast the client's retries and
+        an open circuit breaker count as an idle poll, so an outage slows polling down
+        instead of stopping the logger. Other HTTP errors, such as a 401 once the access
+        token has expired, are raised: polling again with the same client cannot fix them.
+
+        Args:
+            stop_event (threading.Event): Set it to stop the logger, e.g. from another thread.
+            max_polls (int): The number of polls to make, or None to run until stopped.
+
+        Returns:
+            int: The number of new plays stored.
+        """
+        stop_event = stop_event or threading.Event()
+        total = polls = 0
+        while not stop_event.is_set():
+            try:
+                added = self.poll()
+            except (requests.ConnectionError, requests.Timeout, CircuitOpenError):
+                added = 0
+            except requests.HTTPError as error:
+                if not _is_outage(error):
+                    raise
+                added = 0
+            total += added
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                break
+            stop_event.wait(self.next_interval(added))
+        return total
\ No newline at end of file
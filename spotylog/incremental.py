@@ -0,0 +1,170 @@
+# Incremental exports: each export keeps a watermark file next to its output recording
+# how far it got (the newest played_at or added_at written, and the playlist snapshot_id)
+# and the columns written, so the next run only fetches and appends newer rows, in the
+# same columns.
+import json
+import os
+from . import api
+from .excel_utils import save_to_csv, save_to_ndjson, save_to_parquet
+from .history import RECENTLY_PLAYED_LIMIT
+from .utils import parse_timestamp
+
+def watermark_path(filename):
+    """Return the path of the watermark file kept next to an export."""
+    return f"{filename.rstrip(os.sep)}.watermark.json"
+
+def read_watermark(filename):
+    """Return the watermark of an export, or an empty dict if it has never run."""
+    try:
+        with open(watermark_path(filename), encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+def write_watermark(filename, watermark):
+    """Replace the watermark of an export atomically, so an interrupted run never leaves it half written."""
+    path = watermark_path(filename)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        json.dump(watermark, file)
+    os.replace(f"{path}.tmp", path)
+
+def export_format(filename):
+    """Infer the export format from a file name: "parquet", "ndjson" or "csv"."""
+    name = filename.rstrip(os.sep)
+    for suffix in (".gz", ".zst"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    if name.endswith(".parquet"):
+        return "parquet"
+    if name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+def _item_key(item):
+    """Return the ID of an item's track, or its URI for a local file."""
+    track = item.get("track") or {}
+    return track.get("id") or track.get("uri")
+
+def is_newer(item, field, watermark):
+    """
+    Return whether an item is after the watermark and not yet exported.
+
+    Timestamps such as added_at only have second precision, so an item stamped with
+    the watermark's own time is new unless its track was among those written at that
+    time. Watermarks written before tracks were recorded cover everything at their time.
+    Items without a timestamp, which the API returns in very old playlists, are only new
+    on the first export.
+    """
+    value = watermark.get("value")
+    if value is None:
+        return True
+    stamp = parse_timestamp(item.get(field))
+    if stamp is None:
+        return False
+    value = parse_timestamp(value)
+    if "boundary_ids" not in watermark:
+        return stamp > value
+    return stamp > value or (stamp == value and _item_key(item) not in watermark["boundary_ids"])
+
+def is_older(item, field, watermark):
+    """Return whether an item is strictly before the watermark, so paging newest first can stop there."""
+    value = watermark.get("value")
+    if value is None:
+        return False
+    stamp = parse_timestamp(item.get(field))
+    return stamp is None or stamp < parse_timestamp(value)
+
+def after_cursor(watermark):
+    """Return the watermark as a Unix timestamp in milliseconds, for the `after` cursor, or None."""
+    value = watermark.get("value")
+    return int(parse_timestamp(value).timestamp() * 1000) if value else None
+
+def next_after_cursor(page, after, limit=RECENTLY_PLAYED_LIMIT):
+    """
+    Return the `after` cursor for the next page of recently played tracks, or None when there is none.
+
+    A full page means more plays may be waiting after its newest one.
+    """
+    if len(page) < limit:
+        return None
+    newest = max(int(parse_timestamp(item["played_at"]).timestamp() * 1000) for item in page)
+    return newest if after is None or newest > after else None
+
+class RecentlyPlayedExport:
+    def __init__(self, filename):
+        """
+        Track the paging of one recently played export, leaving the requests to the caller.
+
+        The sync and async clients fetch pages their own way but share this loop, so the
+        cursor and stop rule cannot drift between them:
+
+            while not export.done:
+                export.add(fetch(after=export.after, limit=RECENTLY_PLAYED_LIMIT))
+
+        Args:
+            filename (str): The export file, or dataset directory for Parquet, whose watermark to resume from.
+        """
+        self.watermark = read_watermark(filename)
+        self.after = after_cursor(self.watermark)
+        self.done = False
+        self._items = []
+
+    def add(self, page):
+        """Add a fetched page of plays and move the cursor on, or finish when no more can follow."""
+        self._items.extend(page)
+        self.after = next_after_cursor(page, self.after)
+        self.done = self.after is None
+
+    def items(self):
+        """Return the plays fetched that are newer than the watermark, oldest first."""
+        return new_items(self._items, "played_at", self.watermark)
+
+def new_items(items, field, watermark):
+    """Return the items not yet exported, oldest first, starting with any that have no timestamp."""
+    items = [item for item in items if is_newer(item, field, watermark)]
+    items.sort(key=lambda item: (item.get(field) is not None, parse_timestamp(item.get(field))))
+    return items
+
+def append_items(items, filename, field, watermark, format=None, **state):
+    """
+    Append items to an export and move its watermark forward.
+
+    Args:
+        items (list): The new items, oldest first, with the track under "track".
+        filename (str): The export file, or dataset directory for Parquet.
+        field (str): The item timestamp the watermark follows: "played_at" or "added_at".
+        watermark (dict): The watermark read before fetching the items.
+        format (str): "csv", "ndjson" or "parquet". Defaults to the file extension.
+        **state: Other values to record in the watermark, e.g. snapshot_id.
+
+    Returns:
+        int: The number of rows appended.
+    """
+    format = format or export_format(filename)
+    rows = api.track_rows(items)
+    # The first run's columns are kept, so a CSV header written once still fits later rows
+    columns = watermark.get("columns")
+    if columns is None and items:
+        columns = list(next(api.track_rows(items[:1])))
+    if format == "parquet":
+        count = save_to_parquet(rows, filename, append=True)
+    elif format == "ndjson":
+        count = save_to_ndjson(rows, filename, append=True)
+    else:
+        count = save_to_csv(rows, filename, headers=columns, append=True)
+
+    watermark = {**watermark, **state, "field": field}
+    if columns is not None:
+        watermark["columns"] = columns
+    stamped = [item for item in items if item.get(field) is not None]
+    if stamped:
+        # Remember which tracks were written at the newest time, to skip them if the next run sees that time again
+        value = max((item[field] for item in stamped), key=parse_timestamp)
+        boundary = [_item_key(item) for item in stamped if parse_timestamp(item[field]) == parse_timestamp(value)]
+        if watermark.get("value") is not None and parse_timestamp(watermark["value"]) == parse_timestamp(value):
+            boundary = watermark.get("boundary_ids", []) + boundary
+        watermark["value"] = value
+        watermark["boundary_ids"] = boundary
+    watermark["rows"] = watermark.get("rows", 0) + count
+    write_watermark(filename, watermark)
+    return count
\ No newline at end of file
@@ -1,19 +1,290 @@
+import sys
+import threading
+from array import array
+from collections.abc import Sequence
+from itertools import compress
+from .decoders import get_decoder
+
+def _intern(value):
+    """Intern a string so repeated names and IDs share one object, leaving None as is."""
+    return sys.intern(value) if value else value
+
+def _loads(data):
+    """Decode JSON text, passing already decoded objects through."""
+    return get_decoder("auto")(data) if isinstance(data, (str, bytes)) else data
+
+def _unwrap(data):
+    """Return the track of a playlist or history item, or the data itself if it is already a track."""
+    track = data.get("track")
+    return track if isinstance(track, dict) else data
+
+class Artist:
+    __slots__ = ("id", "name", "genres", "popularity")
+
+    def __init__(self, data):
+        self.id = _intern(data.get("id"))
+        self.name = _intern(data.get("name"))
+        self.genres = tuple(data.get("genres", ()))
+        self.popularity = data.get("popularity")
+
+    @classmethod
+    def from_json(cls, data):
+        """Build an artist from a decoded artist object or its JSON text."""
+        return cls(_loads(data))
+
+    def __str__(self):
+        return self.name
+
+class Album:
+    __slots__ = ("id", "name", "artists", "release_date", "total_tracks")
+
+    def __init__(self, data):
+        self.id = _intern(data.get("id"))
+        self.name = _intern(data.get("name"))
+        self.artists = [_intern(artist["name"]) for artist in data.get("artists", [])]
+        self.release_date = data.get("release_date")
+        self.total_tracks = data.get("total_tracks")
+
+    @classmethod
+    def from_json(cls, data):
+        """Build an album from a decoded album object or its JSON text."""
+        return cls(_loads(data))
+
+    def __str__(self):
+        return f"{self.name} by {', '.join(self.artists)}"
+
 class Track:
+    __slots__ = ("id", "name", "artists", "album", "duration_ms", "popularity")
+
     def __init__(self, data):
-        self.id = data.get("id")
-        self.name = data.get("name")
-        self.artists = [artist["name"] for artist in data.get("artists", [])]
-        self.album = data.get("album", {}).get("name")
+        self.id = _intern(data.get("id"))
+        self.name = _intern(data.get("name"))
+        self.artists = [_intern(artist["name"]) for artist in data.get("artists", [])]
+        self.album = _intern((data.get("album") or {}).get("name"))
+        self.duration_ms = data.get("duration_ms")
+        self.popularity = data.get("popularity")
+
+    @classmethod
+    def from_json(cls, data):
+        """Build a track from a decoded track object, a playlist or history item wrapping one, or JSON text."""
+        return cls(_unwrap(_loads(data)))
 
     def __str__(self):
         return f"{self.name} by {', '.join(self.artists)}"
 
 class Playlist:
-    def __init__(self, data):
+    __slots__ = ("id", "name", "description", "tracks")
+
+    def __init__(self, data, fetch_page=None):
+        """
+        A playlist whose tracks are fetched page by page when they are first used.
+
+        Args:
+            data (dict): The playlist object, including the first page of its tracks.
+            fetch_page (callable): Takes an offset and returns the paging object of the tracks starting there.
+                Without it only the tracks of the first page can be used.
+        """
         self.id = data.get("id")
         self.name = data.get("name")
         self.description = data.get("description")
-        self.tracks = data.get("tracks", {}).get("items", [])
+        self.tracks = PlaylistTracks(data.get("tracks") or {}, fetch_page)
+
+    @classmethod
+    def from_json(cls, data):
+        """Build a playlist from a decoded playlist object or its JSON text."""
+        return cls(_loads(data))
+
+    @classmethod
+    def from_client(cls, client, playlist_id):
+        """
+        Fetch a playlist with a SpotifyClient, leaving the pages after the first to be fetched on demand.
+
+        Args:
+            client (SpotifyClient): The client used to fetch the playlist and, later, its pages.
+            playlist_id (str): The ID of the playlist.
+
+        Returns:
+            Playlist: The playlist.
+        """
+        data = client.get_playlist(playlist_id)
+        limit = (data.get("tracks") or {}).get("limit") or 100
+        return cls(data, lambda offset: client.get_playlist_tracks_page(playlist_id, offset=offset, limit=limit))
+
+    @property
+    def total(self):
+        """The number of tracks in the playlist, known without fetching them."""
+        return len(self.tracks)
 
     def __str__(self):
-        return f"{self.name} - {len(self.tracks)} tracks"
\ No newline at end of file
+        return f"{self.name} - {len(self.tracks)} tracks"
+
+class PlaylistTracks(Sequence):
+    __slots__ = ("_total", "_limit", "_fetch_page", "_pages", "_lock")
+
+    def __init__(self, page, fetch_page=None):
+        """
+        The tracks of a playlist, as a sequence of Track that fetches its pages lazily.
+
+        The length is the playlist's `total`, so it is right without downloading every
+        page. Fetched pages are kept as TrackBatch objects and never fetched twice.
+
+        Args:
+            page (dict): The first paging object, with items, limit and total.
+            fetch_page (callable): Takes an offset and returns the paging object starting there.
+        """
+        items = page.get("items", [])
+        self._total = page.get("total", len(items))
+        self._limit = page.get("limit") or len(items) or 100
+        self._fetch_page = fetch_page
+        self._pages = {page.get("offset", 0): TrackBatch.from_items(items)}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._total
+
+    def _page(self, offset):
+        """Return the cached page starting at `offset`, fetching it first if needed."""
+        batch = self._pages.get(offset)
+        if batch is not None:
+            return batch
+        if self._fetch_page is None:
+            raise LookupError(f"The tracks at offset {offset} were not loaded and there is no client to fetch them.")
+        with self._lock:
+            batch = self._pages.get(offset)
+            if batch is None:
+                batch = self._pages[offset] = TrackBatch.from_items(self._fetch_page(offset).get("items", []))
+        return batch
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self._total))]
+        if index < 0:
+            index += self._total
+        if not 0 <= index < self._total:
+            raise IndexError("playlist track index out of range")
+        offset = index - index % self._limit
+        return self._page(offset)[index - offset]
+
+    def __iter__(self):
+        for offset in range(0, self._total, self._limit):
+            yield from self._page(offset)
+
+    @property
+    def loaded(self):
+        """The number of tracks fetched so far."""
+        return sum(len(batch) for batch in self._pages.values())
+
+    def to_batch(self):
+        """Fetch any missing pages and return every track as one TrackBatch."""
+        return TrackBatch.concat(self._page(offset) for offset in range(0, self._total, self._limit))
+
+class TrackBatch:
+    # The columns, in the order take() copies them
+    COLUMNS = ("ids", "names", "artists", "albums", "durations", "popularity")
+
+    def __init__(self):
+        """
+        A column-oriented batch of tracks.
+
+        Each attribute in COLUMNS holds one value per track: IDs, names, artists (a tuple
+        of names), album names, durations in milliseconds and popularity. Numbers are
+        kept in typed arrays, strings are interned and rows with the same artists share
+        one tuple, so a batch of history rows takes a fraction of the memory of the item
+        dicts or of one Track object per row. A missing duration or popularity is stored as -1.
+        """
+        self.ids = []
+        self.names = []
+        self.artists = []
+        self._artist_tuples = {}
+        self.albums = []
+        self.durations = array("q")
+        self.popularity = array("h")
+
+    @classmethod
+    def from_items(cls, items):
+        """
+        Build a batch in one pass over a page of items.
+
+        Args:
+            items (iterable): Track dicts, or playlist, saved-track or history items wrapping one under "track".
+
+        Returns:
+            TrackBatch: The tracks, in order.
+        """
+        batch = cls()
+        batch.extend(items)
+        return batch
+
+    def extend(self, items):
+        """Append the tracks of a page of items, as accepted by from_items."""
+        ids, names, artists, albums = self.ids, self.names, self.artists, self.albums
+        durations, popularity, artist_tuples = self.durations, self.popularity, self._artist_tuples
+        for item in items:
+            track = _unwrap(item)
+            ids.append(_intern(track.get("id")))
+            names.append(_intern(track.get("name")))
+            row_artists = tuple(_intern(artist["name"]) for artist in track.get("artists", []))
+            artists.append(artist_tuples.setdefault(row_artists, row_artists))
+            albums.append(_intern((track.get("album") or {}).get("name")))
+            duration = track.get("duration_ms")
+            durations.append(-1 if duration is None else duration)
+            score = track.get("popularity")
+            popularity.append(-1 if score is None else score)
+
+    @classmethod
+    def concat(cls, batches):
+        """Join batches into one, in order."""
+        batch = cls()
+        for part in batches:
+            for name in cls.COLUMNS:
+                getattr(batch, name).extend(getattr(part, name))
+        return batch
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        """Return the track at `index` as a Track."""
+        track = Track.__new__(Track)
+        track.id = self.ids[index]
+        track.name = self.names[index]
+        track.artists = list(self.artists[index])
+        track.album = self.albums[index]
+        track.duration_ms = None if self.durations[index] < 0 else self.durations[index]
+        track.popularity = None if self.popularity[index] < 0 else self.popularity[index]
+        return track
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def take(self, indices):
+        """Return a new batch holding the rows at `indices`, in that order."""
+        indices = list(indices)
+        batch = TrackBatch()
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            values = [column[index] for index in indices]
+            setattr(batch, name, array(column.typecode, values) if isinstance(column, array) else values)
+        return batch
+
+    def filter(self, column, predicate):
+        """
+        Return the rows whose value in `column` satisfies `predicate`.
+
+        Only the one column is scanned, without building a Track per row.
+
+        Args:
+            column (str): One of COLUMNS, e.g. "durations".
+            predicate (callable): Takes a column value and returns whether to keep the row.
+
+        Returns:
+            TrackBatch: The matching rows, in their original order.
+        """
+        mask = map(predicate, getattr(self, column))
+        return self.take(compress(range(len(self)), mask))
+
+    def sort(self, column, reverse=False):
+        """Return the rows sorted by the values in `column`. The sort is stable."""
+        values = getattr(self, column)
+        return self.take(sorted(range(len(self)), key=values.__getitem__, reverse=reverse))
\ No newline at end of file
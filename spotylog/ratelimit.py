@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+
+class RateLimiter:
+    def __init__(self, rate=20.0, burst=None):
+        """
+        A token bucket shared by every thread and coroutine that calls the API with one token.
+
+        Args:
+            rate (float): The sustained number of requests allowed per second.
+            burst (int): The bucket size, i.e. how many requests may go out at once. Defaults to `rate`.
+        """
+        self.rate = rate
+        self.capacity = burst or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token and return how long to wait before using it, plus the current backoff generation."""
+        with self._lock:
+            now = time.monotonic()
+            if now > self.updated:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+            self.tokens -= 1
+            ready_at = self.updated + max(0.0, -self.tokens) / self.rate
+            return max(0.0, ready_at - now), self._generation
+
+    def acquire(self):
+        """Block until a request may be sent. Requests waiting when a backoff starts are held until it ends."""
+        while True:
+            delay, generation = self._reserve()
+            if delay:
+                time.sleep(delay)
+            if generation == self._generation:
+                return
+
+    async def acquire_async(self):
+        """Wait, without blocking the event loop, until a request may be sent."""
+        while True:
+            delay, generation = self._reserve()
+            if delay:
+                await asyncio.sleep(delay)
+            if generation == self._generation:
+                return
+
+    def backoff(self, seconds):
+        """
+        Hold every request for `seconds`, e.g. after a 429 response with Retry-After.
+
+        Once the backoff ends the bucket restarts with a single token, so requests
+        resume at the sustained rate instead of bursting.
+
+        Args:
+            seconds (float): How long to pause all requests.
+        """
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until <= self.blocked_until:
+                return
+            self.blocked_until = until
+            self.updated = until
+            self.tokens = 1.0
+            self._generation += 1
+
+def parse_retry_after(value, default=1.0):
+    """
+    Parse a Retry-After header given in seconds.
+
+    Args:
+        value (str): The header value, or None if the header is missing.
+        default (float): The delay to use when the header is missing or not a number.
+
+    Returns:
+        float: The number of seconds to wait.
+    """
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return default
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(access_token, rate=20.0, burst=None):
+    """
+    Return the rate limiter shared by every client using `access_token`.
+
+    Args:
+        access_token (str): The OAuth access token the limiter is shared for.
+        rate (float): The rate for a newly created limiter.
+        burst (int): The bucket size for a newly created limiter.
+
+    Returns:
+        RateLimiter: The shared limiter.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(access_token)
+        if limiter is None:
+            limiter = _limiters[access_token] = RateLimiter(rate, burst)
+        return limiter
\ No newline at end of file
@@ -0,0 +1,125 @@
+import random
+import threading
+import time
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+class RetryPolicy:
+    def __init__(self, max_attempts=3, base_delay=0.5, max_delay=10.0, retry_budget=10, budget_ratio=0.1,
+                 retry_statuses=(500, 502, 503, 504), idempotent_methods=("get", "put", "delete")):
+        """
+        Decide which failed requests are retried and how long to wait between attempts.
+
+        Only idempotent requests that failed on a transient error (a 5xx response or a
+        connection problem) are retried. Every retry spends one token from a budget that
+        is refilled by `budget_ratio` tokens per request, so a degraded API cannot turn
+        every call into several.
+
+        Args:
+            max_attempts (int): The maximum number of attempts per request, including the first.
+            base_delay (float): The minimum delay between attempts, in seconds.
+            max_delay (float): The maximum delay between attempts, in seconds.
+            retry_budget (int): The maximum number of retry tokens that can be saved up.
+            budget_ratio (float): The retry tokens earned per request sent.
+            retry_statuses (tuple): The response statuses treated as transient.
+            idempotent_methods (tuple): The HTTP methods that are safe to send again.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_budget = retry_budget
+        self.budget_ratio = budget_ratio
+        self.retry_statuses = frozenset(retry_statuses)
+        self.idempotent_methods = frozenset(idempotent_methods)
+        self.tokens = float(retry_budget)
+        self._lock = threading.Lock()
+
+    def is_transient(self, status=None, error=None):
+        """Return whether a response status or connection error is worth retrying."""
+        if error is not None:
+            return True
+        return status in self.retry_statuses
+
+    def record_request(self):
+        """Earn a fraction of a retry token for a request sent."""
+        with self._lock:
+            self.tokens = min(self.retry_budget, self.tokens + self.budget_ratio)
+
+    def should_retry(self, method, attempt):
+        """
+        Decide whether a request that failed on a transient error is sent again.
+
+        Args:
+            method (str): The HTTP method, in lower case.
+            attempt (int): The number of attempts made so far.
+
+        Returns:
+            bool: True if the request should be retried. A retry token is spent if so.
+        """
+        if method not in self.idempotent_methods or attempt >= self.max_attempts:
+            return False
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def next_delay(self, previous=None):
+        """
+        Return the delay before the next attempt, using decorrelated jitter.
+
+        Args:
+            previous (float): The previous delay, or None before the first retry.
+
+        Returns:
+            float: The number of seconds to wait.
+        """
+        upper = (previous or self.base_delay) * 3
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Fail fast while the API keeps failing.
+
+        After `failure_threshold` consecutive transient failures the circuit opens and
+        requests raise CircuitOpenError. Once `reset_timeout` has passed a single trial
+        request is let through: success closes the circuit, failure opens it again. A
+        trial that never reports back is replaced by another after a further timeout.
+
+        Args:
+            failure_threshold (int): The consecutive failures that open the circuit.
+            reset_timeout (float): How long the circuit stays open, in seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may be sent."""
+        with self._lock:
+            if self.state == "closed":
+                return
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self.opened_at = time.monotonic()
+                return
+            raise CircuitOpenError("Spotify API circuit breaker is open; failing fast.")
+
+    def record_success(self):
+        """Close the circuit after a request that did not fail transiently."""
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self):
+        """Count a transient failure, opening the circuit once the threshold is reached."""
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
\ No newline at end of file
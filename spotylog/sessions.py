@@ -0,0 +1,176 @@
+from .utils import timestamp_ms
+
+class _TopCounter:
+    __slots__ = ("counts", "size")
+
+    def __init__(self, size=8):
+        """
+        Find the most frequent value of a stream in constant memory (the space-saving algorithm).
+
+        At most `size` values are counted. A new value takes the place of the least counted
+        one and inherits its count, so counts are overestimated by at most 1/size of the
+        stream: the value returned by top is exact whenever it leads the runner-up by more
+        than that, and whenever the stream has no more than `size` distinct values.
+        """
+        self.counts = {}
+        self.size = size
+
+    def add(self, value):
+        if value is None:
+            return
+        counts = self.counts
+        if value in counts:
+            counts[value] += 1
+        elif len(counts) < self.size:
+            counts[value] = 1
+        else:
+            least = min(counts, key=counts.get)
+            counts[value] = counts.pop(least) + 1
+
+    @property
+    def top(self):
+        """The most counted value, the earliest counted one on a tie, or None if nothing was counted."""
+        return max(self.counts, key=self.counts.get) if self.counts else None
+
+class Session:
+    __slots__ = ("start", "end", "tracks", "skips", "listened_ms", "_artists", "_contexts")
+
+    def __init__(self, start):
+        """
+        A listening session: consecutive plays with no idle gap longer than the sessionizer's threshold.
+
+        Attributes:
+            start (int): When the first play started, in Unix milliseconds.
+            end (int): When the last play is expected to have ended, in Unix milliseconds.
+            tracks (int): The number of plays.
+            skips (int): The number of plays followed by the next one before `skip_ratio` of the track had played.
+            listened_ms (int): The time spent listening, counting skipped plays up to the next play.
+        """
+        self.start = start
+        self.end = start
+        self.tracks = 0
+        self.skips = 0
+        self.listened_ms = 0
+        self._artists = _TopCounter()
+        self._contexts = _TopCounter()
+
+    @property
+    def duration_ms(self):
+        """The time from the first play to the end of the last one, in milliseconds."""
+        return self.end - self.start
+
+    @property
+    def artist_id(self):
+        """The ID of the artist of most plays in the session, counting every artist of a track."""
+        return self._artists.top
+
+    @property
+    def context_uri(self):
+        """The playlist, album or artist most plays were started from."""
+        return self._contexts.top
+
+    def __repr__(self):
+        return f"Session(start={self.start}, tracks={self.tracks}, skips={self.skips}, duration_ms={self.duration_ms})"
+
+class Sessionizer:
+    def __init__(self, idle_gap=30 * 60, skip_ratio=0.8):
+        """
+        Split a played_at-ordered stream of plays into listening sessions, in a single pass.
+
+        Only the open session and the last play are kept, so memory stays constant
+        however many years of history go through. The state survives between calls to
+        feed(), so newly logged plays can be added as they arrive.
+
+        Args:
+            idle_gap (float): The longest silence within a session, in seconds, from the end of one play to the next.
+            skip_ratio (float): A play counts as skipped when the next one starts before this share of it has played.
+        """
+        self.idle_gap_ms = idle_gap * 1000
+        self.skip_ratio = skip_ratio
+        self.session = None
+        self.cursor = None
+        self._last = None
+
+    def feed(self, plays):
+        """
+        Add plays and yield the sessions they close.
+
+        Args:
+            plays (iterable): Plays in played_at order, such as HistoryStore.plays() rows, with played_at
+                (Unix milliseconds or ISO 8601), duration_ms, artist_ids (IDs joined with ",") and context_uri.
+
+        Yields:
+            Session: Each session that ended before one of the plays started.
+        """
+        for play in plays:
+            played_at = timestamp_ms(play["played_at"])
+            duration = play["duration_ms"] or 0
+            last = self._last
+            if last is not None:
+                last_played_at, last_duration = last
+                gap = played_at - last_played_at
+                if gap - last_duration > self.idle_gap_ms:
+                    yield self._close()
+                else:
+                    self._settle(gap, last_duration)
+            if self.session is None:
+                self.session = Session(played_at)
+            session = self.session
+            session.tracks += 1
+            session.end = played_at + duration
+            if play["artist_ids"]:
+                for artist_id in play["artist_ids"].split(","):
+                    session._artists.add(artist_id)
+            session._contexts.add(play["context_uri"])
+            self._last = (played_at, duration)
+            self.cursor = played_at
+
+    def _settle(self, gap, duration):
+        """Count the previous play of the open session now that the gap to the next one is known."""
+        if gap < duration * self.skip_ratio:
+            self.session.skips += 1
+        self.session.listened_ms += min(gap, duration)
+
+    def _close(self):
+        """Close the open session, counting its last play in full."""
+        session = self.session
+        session.listened_ms += self._last[1]
+        self.session = None
+        self._last = None
+        return session
+
+    def flush(self, now=None):
+        """
+        Close the open session.
+
+        Args:
+            now: The current time, as a datetime, an ISO 8601 string or Unix milliseconds. If given, the session
+                is only closed once it has been idle for longer than the idle gap, so a session still in progress
+                keeps going on the next feed().
+
+        Returns:
+            Session: The closed session, or None.
+        """
+        if self.session is None:
+            return None
+        if now is not None and timestamp_ms(now) - self.session.end <= self.idle_gap_ms:
+            return None
+        return self._close()
+
+def sessionize(plays, idle_gap=30 * 60, skip_ratio=0.8):
+    """
+    Turn a played_at-ordered stream of plays into listening sessions.
+
+    Args:
+        plays (iterable): Plays in played_at order, e.g. HistoryStore.plays().
+        idle_gap (float): The longest silence within a session, in seconds.
+        skip_ratio (float): The share of a track that must play for it not to count as skipped.
+
+    Yields:
+        Session: Each session, in order, including the last one.
+    """
+    sessionizer = Sessionizer(idle_gap, skip_ratio)
+    yield from sessionizer.feed(plays)
+    session = sessionizer.flush()
+    if session is not None:
+        yield session
\ No newline at end of file
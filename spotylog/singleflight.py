@@ -0,0 +1,109 @@
+import asyncio
+import threading
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+        self.copies = []
+
+class _AsyncCall:
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+        self.copies = []
+
+class SingleFlight:
+    def __init__(self, copy=None):
+        """
+        Coalesce identical calls made concurrently from several threads into one.
+
+        Args:
+            copy (callable): Makes each waiter's own copy of the shared result, e.g. copy.deepcopy,
+                so callers that change their result don't change anyone else's. By default every
+                caller gets the same object.
+        """
+        self._copy = copy
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """
+        Run `func` unless a call with the same key is already in flight, in which case wait for its result.
+
+        Args:
+            key (str): Identifies identical calls, e.g. a cache key.
+            func (callable): The call to make, without arguments.
+
+        Returns:
+            The result of the shared call. If it raised, every waiter raises the same exception.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.copies.pop() if self._copy else call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            # The waiters' copies are made before the leader's caller can change the result
+            if self._copy and call.error is None:
+                call.copies = [self._copy(call.result) for _ in range(call.waiters)]
+            call.done.set()
+
+class AsyncSingleFlight:
+    def __init__(self, copy=None):
+        """
+        Coalesce identical coroutine calls made concurrently on one event loop into one.
+
+        Args:
+            copy (callable): Makes each waiter's own copy of the shared result, as for SingleFlight.
+        """
+        self._copy = copy
+        self._calls = {}
+
+    async def do(self, key, func):
+        """
+        Await `func()` unless a call with the same key is already in flight, in which case await its result.
+
+        Cancelling one waiter does not cancel the shared call for the others.
+
+        Args:
+            key (str): Identifies identical calls, e.g. a cache key.
+            func (callable): Returns the coroutine to run.
+
+        Returns:
+            The result of the shared call.
+        """
+        call = self._calls.get(key)
+        leader = call is None
+        if leader:
+            call = self._calls[key] = _AsyncCall(asyncio.ensure_future(func()))
+            call.task.add_done_callback(lambda task: self._finish(key, call))
+        else:
+            call.waiters += 1
+        result = await asyncio.shield(call.task)
+        return call.copies.pop() if self._copy and not leader else result
+
+    def _finish(self, key, call):
+        """Release the key and, before any caller resumes, copy the result for each waiter."""
+        self._calls.pop(key, None)
+        if self._copy and not call.task.cancelled() and call.task.exception() is None:
+            call.copies = [self._copy(call.task.result()) for _ in range(call.waiters)]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from .models import Track  # Import the Track class from models.py
+from datetime import datetime
 
 def format_track_info(track_data):
     """
@@ -10,5 +10,48 @@ def format_track_info(track_data):
     Returns:
         str: A formatted string representation of the track.
     """
-    track = Track(track_data)  # Create a Track object
-    return str(track)  # Use the Track's __str__ method
\ No newline at end of file
+    # Format straight from the dict rather than building a Track for every call
+    artists = ", ".join(artist["name"] for artist in track_data.get("artists", []))
+    return f"{track_data.get('name')} by {artists}"
+
+def chunked(items, size):
+    """
+    Split a sequence into consecutive chunks.
+    
+    Args:
+        items (list): The items to split.
+        size (int): The maximum length of each chunk.
+    
+    Returns:
+        list: A list of lists, each holding at most `size` items, in input order.
+    """
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def parse_timestamp(value):
+    """
+    Parse an ISO 8601 timestamp as returned by Spotify, e.g. "2023-10-01T12:00:00.123Z".
+    
+    Args:
+        value (str): The timestamp. Datetimes and None are returned as they are.
+    
+    Returns:
+        datetime: A timezone-aware datetime.
+    """
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+def timestamp_ms(value):
+    """
+    Convert a timestamp to Unix milliseconds.
+    
+    Args:
+        value: A datetime, an ISO 8601 string, or a number of milliseconds, which is returned as is, like None.
+    
+    Returns:
+        int: The Unix timestamp in milliseconds.
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return int(parse_timestamp(value).timestamp() * 1000)
\ No newline at end of file
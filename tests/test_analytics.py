@@ -0,0 +1,73 @@
+import sys
+import os
+
+# Add the root directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from spotylog.history import HistoryStore
+
+np = pytest.importorskip("numpy")
+from spotylog.analytics import ListeningStats
+
+def play(track_id, played_at, artists=("Imagine Dragons",), album="Evolve", duration_ms=180000):
+    track = {"id": track_id, "name": track_id.title(), "artists": [{"id": name.lower().replace(",", "").replace(" ", "_"), "name": name} for name in artists],
+             "album": {"name": album}, "duration_ms": duration_ms}
+    return {"track": track, "played_at": played_at}
+
+@pytest.fixture
+def store():
+    with HistoryStore(":memory:") as store:
+        store.add([
+            play("believer", "2023-10-02T08:00:00Z"),
+            play("thunder", "2023-10-02T09:00:00Z"),
+            play("believer", "2023-10-03T10:00:00Z"),
+            play("sucker", "2023-10-04T10:00:00Z", artists=("Jonas Brothers", "Imagine Dragons"), album="Happiness Begins", duration_ms=120000),
+            play("earfquake", "2023-10-04T11:00:00Z", artists=("Tyler, The Creator",), album="IGOR", duration_ms=60000),
+        ])
+        yield store
+
+# Test top tracks, artists and albums over all time and a window
+def test_top_items(store):
+    stats = ListeningStats(store)
+
+    # Assert all-time rankings, counting every artist of a track
+    assert stats.top_tracks(1) == [("believer", "Believer", 2)]
+    assert stats.top_artists() == [("imagine_dragons", "Imagine Dragons", 4), ("jonas_brothers", "Jonas Brothers", 1),
+                                   ("tyler_the_creator", "Tyler, The Creator", 1)]
+    assert stats.top_albums(by="minutes") == [("Evolve", 9.0), ("Happiness Begins", 2.0), ("IGOR", 1.0)]
+
+    # Assert a window only counts the plays inside it
+    assert stats.top_tracks(start="2023-10-02T08:30:00Z", end="2023-10-04T00:00:00Z") == [("believer", "Believer", 1), ("thunder", "Thunder", 1)]
+    assert stats.top_artists(2, start="2023-10-04T00:00:00Z") == [("imagine_dragons", "Imagine Dragons", 1), ("jonas_brothers", "Jonas Brothers", 1)]
+
+# Test genres, listening minutes and play counts
+def test_genres_and_minutes(store):
+    stats = ListeningStats(store)
+    genres = {"imagine_dragons": ["pop rock"], "jonas_brothers": ["pop", "pop rock"]}
+
+    # Assert genres are counted through the artists' genres
+    assert stats.top_genres(genres) == [("pop rock", 5), ("pop", 1)]
+    assert stats.listening_minutes() == 12.0
+    assert stats.play_count(end="2023-10-03T00:00:00Z") == 2
+
+# Test the day-of-week and hour-of-day heatmap
+def test_hour_heatmap(store):
+    heatmap = ListeningStats(store).hour_heatmap(utc_offset=3600)
+
+    # Assert plays land in their local weekday and hour (2 October 2023 was a Monday)
+    assert heatmap.shape == (7, 24)
+    assert heatmap[0, 9] == 1 and heatmap[0, 10] == 1
+    assert heatmap[1, 11] == 1 and heatmap[2, 11] == 1 and heatmap[2, 12] == 1
+    assert heatmap.sum() == 5
+
+# Test refresh only folds in new plays
+def test_refresh(store):
+    stats = ListeningStats(store)
+    store.add([play("thunder", "2023-10-05T10:00:00Z"), play("thunder", "2023-10-05T10:05:00Z")])
+
+    # Assert only the new plays were loaded and the totals moved with them
+    assert stats.refresh() == 2
+    assert stats.refresh() == 0
+    assert stats.top_tracks(1) == [("thunder", "Thunder", 3)]
+    assert stats.play_count() == 7
\ No newline at end of file
@@ -0,0 +1,79 @@
+import sys
+import os
+
+# Add the root directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from spotylog import api
+
+# Test that builders leave out parameters set to None
+def test_recommendations_request():
+    request = api.recommendations(seed_tracks=["track_id_1", "track_id_2"])
+
+    # Assert the request is built without sending it
+    assert request.method == "get"
+    assert request.endpoint == "recommendations"
+    assert request.params == {"seed_tracks": "track_id_1,track_id_2", "limit": 20}
+    assert request.parse({"tracks": [{"id": "track_id_3"}]}) == [{"id": "track_id_3"}]
+
+# Test playlist requests with a fields projection
+def test_playlist_fields():
+    # Assert fields is only sent when given
+    assert api.playlist("playlist_id").params is None
+    assert api.playlist("playlist_id", fields="name").params == {"fields": "name"}
+    assert api.playlist_tracks("playlist_id", fields="items(track(id))").params == {"limit": 100, "fields": "items(track(id))"}
+
+# Test device-specific player requests
+def test_player_requests():
+    # Assert the device ID is added to the endpoint only when given
+    assert api.pause_playback().endpoint == "me/player/pause"
+    assert api.pause_playback("device_id").endpoint == "me/player/pause?device_id=device_id"
+    assert api.set_volume(50, "device_id").endpoint == "me/player/volume?volume_percent=50&device_id=device_id"
+
+# Test paging helpers
+def test_paging_helpers():
+    request = api.new_releases(limit=20)
+    page = api.page_of(request, {"albums": {"items": [1, 2], "limit": 2, "offset": 0, "total": 7}})
+
+    # Assert the nested paging object is found and the remaining offsets are known up front
+    assert list(api.remaining_offsets(page)) == [2, 4, 6]
+    assert api.with_offset(request, 4).params == {"limit": 20, "offset": 4}
+
+# Test format_search_results functionality
+def test_format_search_results():
+    results = {"artists": {"items": [{"name": "Imagine Dragons", "genres": ["rock", "pop"], "popularity": 85}]}}
+
+    # Assert rows are built for the requested type
+    assert api.format_search_results(results, "artist") == [{"Name": "Imagine Dragons", "Genres": "rock, pop", "Popularity": 85}]
+
+# Test track_rows functionality
+def test_track_rows():
+    items = [{"track": {"id": "track_id", "name": "Believer", "artists": [{"name": "Imagine Dragons"}], "album": {"name": "Evolve"}},
+              "played_at": "2023-10-01T12:00:00Z"}]
+    rows = api.track_rows(iter(items))
+
+    # Assert rows are produced lazily, one per item
+    assert next(rows) == {"ID": "track_id", "Name": "Believer", "Artists": "Imagine Dragons", "Album": "Evolve",
+                          "Duration (ms)": None, "Popularity": None, "Played At": "2023-10-01T12:00:00Z"}
+    assert next(rows, None) is None
+
+# Test compare_playlist_changes sees reorders and duplicates
+def test_compare_playlist_changes_order():
+    old = {"tracks": ["track_id_1", "track_id_2", "track_id_3"]}
+    new = {"tracks": ["track_id_3", "track_id_1", "track_id_2", "track_id_2"]}
+    changes = api.compare_playlist_changes(old, new)
+
+    # Assert the reorder is a move and the second copy of a track is an addition
+    assert changes["moved_tracks"] == ["track_id_3"]
+    assert changes["added_tracks"] == ["track_id_2"]
+    assert changes["removed_tracks"] == []
+
+# Test playlist snapshots list local files by URI
+def test_playlist_snapshot_local_files():
+    items = [{"track": {"id": "track_id", "uri": "spotify:track:track_id"}},
+             {"track": {"id": None, "uri": "spotify:local:Artist:Album:Title:180"}}]
+    snapshot = api.playlist_snapshot({"id": "playlist_id", "name": "My Playlist"}, items)
+
+    # Assert the local file is keyed by its URI
+    assert snapshot["tracks"] == ["track_id", "spotify:local:Artist:Album:Title:180"]
\ No newline at end of file
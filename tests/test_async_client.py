@@ -4,9 +4,12 @@ import os
 # Add the root directory to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import asyncio
 import pytest
-from unittest.mock import AsyncMock, patch
-from spotylog.async_client import AsyncSpotifyClient
+from unittest.mock import AsyncMock, Mock, patch
+from spotylog import incremental
+from spotylog.async_client import AsyncSpotifyClient, fetch_many, gather_bounded
+from spotylog.retry import CircuitBreaker, RetryPolicy
 
 # Fixture to create a mock AsyncSpotifyClient instance
 @pytest.fixture
@@ -32,4 +35,228 @@ async def test_async_search(mock_async_client):
 
         # Assert the results
         assert "tracks" in results
-        assert results["tracks"]["items"][0]["name"] == "Believer"
\ No newline at end of file
+        assert results["tracks"]["items"][0]["name"] == "Believer"
+
+# Test that identical concurrent requests share one network call
+@pytest.mark.asyncio
+async def test_async_requests_are_coalesced(mock_async_client):
+    async def slow_fetch(endpoint, params=None):
+        await asyncio.sleep(0.01)
+        return {"tracks": {"items": []}}
+
+    with patch.object(mock_async_client, "_fetch", side_effect=slow_fetch) as mock_fetch:
+        await asyncio.gather(*(mock_async_client.search("Imagine Dragons") for _ in range(5)))
+
+        # Assert only one request was made
+        mock_fetch.assert_called_once()
+
+# Test that the client keeps one session and reuses its connections
+@pytest.mark.asyncio
+async def test_async_session_reuses_connections(local_server):
+    url, connections = local_server
+    async with AsyncSpotifyClient("dummy_access_token") as client:
+        client.base_url = url
+        session = client.session
+        for offset in range(5):
+            await client._get("me/playlists", params={"offset": offset})
+
+        # Assert the same session served every request over one connection
+        assert client.session is session
+    assert len(connections) == 1
+    assert client.session is None
+
+# Test the pluggable JSON decoder and raw-bytes mode
+@pytest.mark.asyncio
+async def test_async_json_decoder_and_raw(local_server):
+    url, _ = local_server
+    async with AsyncSpotifyClient("dummy_access_token", json_decoder="auto") as client:
+        client.base_url = url
+
+        # Assert bodies are decoded, or returned as bytes in raw mode
+        assert await client._get("me/playlists") == {"items": []}
+        assert await client.get_raw("me/playlists") == b'{"items": []}'
+
+# Test that connector limits are applied to the session
+@pytest.mark.asyncio
+async def test_async_connector_limits():
+    async with AsyncSpotifyClient("dummy_access_token", limit=20, limit_per_host=5) as client:
+        # Assert the connector was built from the client's options
+        assert client.session.connector.limit == 20
+        assert client.session.connector.limit_per_host == 5
+
+# Test that every SpotifyClient method has an async counterpart
+def test_async_client_parity():
+    from spotylog.client import SpotifyClient
+
+    sync_methods = {name for name in dir(SpotifyClient) if not name.startswith("_") and name != "close"}
+    async_methods = {name for name in dir(AsyncSpotifyClient) if not name.startswith("_")}
+
+    # Assert no public method is missing from the async client
+    assert sync_methods - async_methods == set()
+
+# Test that async methods send the same requests as the blocking client
+@pytest.mark.asyncio
+async def test_async_check_saved_tracks(mock_async_client):
+    async def fake_send(method, endpoint, params=None, data=None):
+        return [True] * len(params["ids"].split(","))
+
+    with patch.object(mock_async_client, "_send", side_effect=fake_send) as mock_send:
+        results = await mock_async_client.check_saved_tracks([f"track_id_{i}" for i in range(120)])
+
+        # Assert the IDs were sent in three batches and the results are aligned with the input
+        assert mock_send.call_count == 3
+        assert results == [True] * 120
+
+# Test async playlist snapshots fetch every page
+@pytest.mark.asyncio
+async def test_async_get_playlist_snapshot(mock_async_client):
+    async def fake_send(method, endpoint, params=None, data=None):
+        if endpoint == "playlists/playlist_id":
+            items = [{"track": {"id": "track_id_0"}}]
+            return {"id": "playlist_id", "name": "My Playlist", "tracks": {"items": items, "limit": 1, "offset": 0, "total": 3}}
+        return {"items": [{"track": {"id": f"track_id_{params['offset']}"}}]}
+
+    with patch.object(mock_async_client, "_send", side_effect=fake_send):
+        snapshot = await mock_async_client.get_playlist_snapshot("playlist_id")
+
+        # Assert the tracks of every page were included in order
+        assert snapshot["tracks"] == ["track_id_0", "track_id_1", "track_id_2"]
+
+# Test gather_bounded keeps at most `limit` awaitables running
+@pytest.mark.asyncio
+async def test_gather_bounded():
+    running = []
+    peak = []
+
+    async def call(i):
+        running.append(i)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(i)
+        return i
+
+    results = await gather_bounded((call(i) for i in range(20)), limit=4)
+
+    # Assert results are in input order and concurrency was bounded
+    assert results == list(range(20))
+    assert max(peak) == 4
+
+# Test fetch_many yields results as they complete
+@pytest.mark.asyncio
+async def test_fetch_many():
+    async def call(delay):
+        await asyncio.sleep(delay)
+        return delay
+
+    results = [result async for result in fetch_many([call(0.03), call(0.01), call(0.02)], limit=3)]
+
+    # Assert results arrive in completion order with their input index
+    assert results == [(1, 0.01), (2, 0.02), (0, 0.03)]
+
+# Test async iteration over an offset-paged endpoint with bounded look-ahead
+@pytest.mark.asyncio
+async def test_async_iter_saved_tracks(mock_async_client):
+    in_flight = []
+    peak = []
+
+    async def fake_send(method, endpoint, params=None, data=None):
+        offset = (params or {}).get("offset", 0)
+        in_flight.append(offset)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(offset)
+        items = [{"track": {"id": f"track_id_{i}"}} for i in range(offset, min(offset + 10, 95))]
+        return {"items": items, "limit": 10, "offset": offset, "total": 95}
+
+    with patch.object(mock_async_client, "_send", side_effect=fake_send) as mock_send:
+        ids = [item["track"]["id"] async for item in mock_async_client.iter_saved_tracks(page_size=10, lookahead=3)]
+
+        # Assert every page was read in order with at most three pages in flight
+        assert ids == [f"track_id_{i}" for i in range(95)]
+        assert mock_send.call_count == 10
+        assert max(peak) <= 3
+
+# Test that stopping early cancels the pages still in flight
+@pytest.mark.asyncio
+async def test_async_iter_stops_early(mock_async_client):
+    async def fake_send(method, endpoint, params=None, data=None):
+        offset = (params or {}).get("offset", 0)
+        return {"items": [{"name": f"Playlist {offset}"}], "limit": 1, "offset": offset, "total": 100}
+
+    with patch.object(mock_async_client, "_send", side_effect=fake_send) as mock_send:
+        playlists = mock_async_client.iter_user_playlists(page_size=1, lookahead=2)
+        async for playlist in playlists:
+            break
+        await playlists.aclose()
+
+        # Assert only the first page and the look-ahead window were requested
+        assert mock_send.call_count <= 3
+
+# Test async iteration over a cursor-paged endpoint
+@pytest.mark.asyncio
+async def test_async_iter_recently_played(mock_async_client):
+    pages = {
+        "me/player/recently-played": {"items": [{"played_at": "2"}], "next": "https://api.spotify.com/v1/me/player/recently-played?before=2"},
+        "me/player/recently-played?before=2": {"items": [{"played_at": "1"}], "next": None},
+    }
+
+    async def fake_send(method, endpoint, params=None, data=None):
+        return pages[endpoint]
+
+    with patch.object(mock_async_client, "_send", side_effect=fake_send):
+        # Assert the cursor was followed to the last page
+        assert [item["played_at"] async for item in mock_async_client.iter_recently_played()] == ["2", "1"]
+# Test async incremental export of saved tracks
+@pytest.mark.asyncio
+async def test_async_export_saved_tracks(mock_async_client, tmp_path):
+    filename = str(tmp_path / "saved.ndjson")
+    items = [
+        {"track": {"id": "track_id_2", "artists": []}, "added_at": "2023-10-02T12:00:00Z"},
+        {"track": {"id": "track_id_1", "artists": []}, "added_at": "2023-10-01T12:00:00Z"},
+    ]
+    incremental.write_watermark(filename, {"field": "added_at", "value": "2023-10-01T12:00:00Z"})
+
+    async def saved_tracks():
+        for item in items:
+            yield item
+
+    with patch.object(mock_async_client, "iter_saved_tracks", side_effect=saved_tracks):
+        # Assert only the track saved after the watermark was appended
+        assert await mock_async_client.export_saved_tracks(filename) == 1
+        assert incremental.read_watermark(filename)["value"] == "2023-10-02T12:00:00Z"
+
+# Test that a cancelled trial request reopens the circuit instead of leaving it half open
+@pytest.mark.asyncio
+async def test_async_cancelled_trial_reopens_circuit(mock_async_client):
+    mock_async_client.retry_policy = RetryPolicy(max_attempts=1)
+    mock_async_client.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    mock_async_client.circuit_breaker.record_failure()
+    with patch("aiohttp.ClientSession.get", side_effect=asyncio.CancelledError()):
+        with patch("spotylog.retry.time", Mock(monotonic=Mock(return_value=mock_async_client.circuit_breaker.opened_at + 10))):
+            with pytest.raises(asyncio.CancelledError):
+                await mock_async_client._fetch("albums/album_id")
+
+    # Assert the circuit is open again, ready for the next trial
+    assert mock_async_client.circuit_breaker.state == "open"
+    await mock_async_client.close()
+
+# Test that a 429 on a half-open trial request is re-sent instead of failing fast
+@pytest.mark.asyncio
+async def test_async_circuit_breaker_trial_rate_limited(mock_async_client):
+    def response(status, body=None):
+        context = Mock()
+        context.__aenter__ = AsyncMock(return_value=Mock(status=status, headers={"Retry-After": "1"},
+                                                         json=AsyncMock(return_value=body), raise_for_status=Mock()))
+        context.__aexit__ = AsyncMock(return_value=False)
+        return context
+
+    mock_async_client.rate_limiter = Mock(acquire_async=AsyncMock())
+    mock_async_client.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    mock_async_client.circuit_breaker.record_failure()
+    session = Mock(get=Mock(side_effect=[response(429), response(200, {"id": "album_id"})]))
+    with patch.object(mock_async_client, "_get_session", return_value=session):
+        with patch("spotylog.retry.time", Mock(monotonic=Mock(return_value=mock_async_client.circuit_breaker.opened_at + 10))):
+            # Assert the trial honoured Retry-After, succeeded and closed the circuit
+            assert await mock_async_client._fetch("albums/album_id") == {"id": "album_id"}
+    mock_async_client.rate_limiter.backoff.assert_called_once_with(1.0)
+    assert mock_async_client.circuit_breaker.state == "closed"
\ No newline at end of file
@@ -0,0 +1,120 @@
+import sys
+import os
+
+# Add the root directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from unittest.mock import patch
+from spotylog.cache import ResponseCache, invalidation_prefixes, make_cache_key
+
+# Test cache key normalization
+def test_make_cache_key():
+    # Assert parameter order and None values do not change the key
+    assert make_cache_key("search", {"q": "a", "limit": 10}) == make_cache_key("search", {"limit": 10, "q": "a", "type": None})
+    assert make_cache_key("me/playlists") == "me/playlists"
+
+    # Assert a namespace keeps the keys of different accounts apart
+    assert make_cache_key("me/playlists", namespace="a") != make_cache_key("me/playlists", namespace="b")
+
+# Test per-endpoint TTL policies
+def test_ttl_for():
+    cache = ResponseCache(ttl_policies={"playlists": 60}, default_ttl=30)
+
+    # Assert the longest matching prefix wins
+    assert cache.ttl_for("me/player/recently-played") == 0
+    assert cache.ttl_for("albums/album_id") == 86400
+    assert cache.ttl_for("playlists/playlist_id") == 60
+    assert cache.ttl_for("markets") == 30
+
+# Test memory tier hits, misses and expiry
+def test_memory_tier():
+    cache = ResponseCache()
+    cache.set("key", {"name": "Believer"}, ttl=10)
+
+    # Assert a fresh entry is a hit and an unknown key is a miss
+    assert cache.get("key") == {"name": "Believer"}
+    assert cache.get("other") is None
+
+    # Assert an expired entry is a miss
+    with patch("spotylog.cache.time.time", return_value=10**12):
+        assert cache.get("key") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+# Test that changing a cached result does not change the cache
+def test_cached_results_are_copies():
+    cache = ResponseCache()
+    body = {"items": []}
+    cache.set("me/playlists", body, ttl=10)
+    body["items"].append("stored")
+    cache.get("me/playlists")["items"].append("returned")
+
+    # Assert neither the stored body nor a returned one leaked into the cache
+    assert cache.get("me/playlists") == {"items": []}
+
+# Test LRU eviction in the memory tier
+def test_memory_eviction():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", 1, ttl=10)
+    cache.set("b", 2, ttl=10)
+    cache.get("a")
+    cache.set("c", 3, ttl=10)
+
+    # Assert the least recently used entry was evicted
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+# Test the on-disk tier survives a new cache instance
+def test_disk_tier(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path=path)
+    cache.set("key", {"name": "Believer"}, ttl=10)
+    cache.close()
+
+    # Assert a fresh instance reads the entry back from disk
+    cache = ResponseCache(path=path)
+    assert cache.get("key") == {"name": "Believer"}
+    cache.close()
+
+# Test size-capped eviction in the on-disk tier
+def test_disk_eviction(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"), max_entries=1, max_disk_bytes=40)
+    cache.set("a", "x" * 20, ttl=10)
+    cache.set("b", "y" * 20, ttl=10)
+
+    # Assert the older entry was dropped from both tiers
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 20
+    cache.close()
+
+# Test that expired entries with an ETag can be revalidated
+def test_revalidate():
+    cache = ResponseCache()
+    cache.set("key", {"name": "Believer"}, ttl=10, etag='"v1"')
+    cache.set("plain", {"name": "Thunder"}, ttl=10)
+
+    with patch("spotylog.cache.time.time", return_value=10**12):
+        # Assert only the entry with an ETag is kept for revalidation
+        assert cache.get("key") is None
+        assert cache.get_stale("key") == ({"name": "Believer"}, '"v1"')
+        assert cache.get_stale("plain") is None
+
+        # Assert revalidating makes the entry fresh again
+        cache.revalidate("key", ttl=10)
+        assert cache.get("key") == {"name": "Believer"}
+    assert cache.stats()["revalidations"] == 1
+
+# Test invalidating an endpoint and everything under it
+def test_invalidate(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    for endpoint in ("me/tracks", "me/tracks?limit=50", "me/tracks/contains?ids=a", "me/tracksx", "me/playlists"):
+        cache.set(make_cache_key(endpoint, namespace="user"), {"endpoint": endpoint}, ttl=10)
+    cache.invalidate("me/tracks", namespace="user")
+
+    # Assert only me/tracks and the keys under it were removed, from both tiers
+    cache._memory.clear()
+    assert [endpoint for endpoint in ("me/tracks", "me/tracks?limit=50", "me/tracks/contains?ids=a", "me/tracksx", "me/playlists")
+            if cache.get(make_cache_key(endpoint, namespace="user"))] == ["me/tracksx", "me/playlists"]
+    assert invalidation_prefixes("playlists/playlist_id/tracks") == ["playlists/playlist_id", "me/playlists"]
\ No newline at end of file
@@ -4,9 +4,16 @@ import os
 # Add the root directory to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import json
+import threading
+import time
 import pytest
+import requests
 from unittest.mock import Mock, patch
+from spotylog import api
+from spotylog.cache import ResponseCache
 from spotylog.client import SpotifyClient
+from spotylog.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
 
 # Fixture to create a mock SpotifyClient instance
 @pytest.fixture
@@ -15,9 +22,57 @@ def mock_client():
     client = SpotifyClient("dummy_access_token")
     return client
 
+# Test that the pooled session reuses one connection across requests
+def test_session_reuses_connections(local_server):
+    url, connections = local_server
+    with SpotifyClient("dummy_access_token") as client:
+        client.base_url = url
+        for offset in range(5):
+            client._get("me/playlists", params={"offset": offset})
+
+    # Assert every request went over the same connection
+    assert len(connections) == 1
+
+# Test that disabling keep-alive opens a new connection per request
+def test_session_without_keep_alive(local_server):
+    url, connections = local_server
+    with SpotifyClient("dummy_access_token", keep_alive=False) as client:
+        client.base_url = url
+        for offset in range(3):
+            client._get("me/playlists", params={"offset": offset})
+
+    # Assert each request opened its own connection
+    assert len(connections) == 3
+
+# Test the pluggable JSON decoder and raw-bytes mode
+def test_json_decoder_and_raw(local_server):
+    url, _ = local_server
+    decoded = []
+
+    def loads(body):
+        decoded.append(body)
+        return json.loads(body)
+
+    with SpotifyClient("dummy_access_token", cache=False, json_decoder=loads) as client:
+        client.base_url = url
+
+        # Assert bodies go through the configured decoder, and raw bodies skip it
+        assert client._get("me/playlists") == {"items": []}
+        assert client.get_raw("me/playlists") == b'{"items": []}'
+        assert decoded == [b'{"items": []}']
+
+# Test that closing the client closes its session
+def test_close_closes_session(mock_client):
+    with patch.object(mock_client.session, "close") as mock_close:
+        with mock_client:
+            pass
+
+        # Assert the session was closed on exit
+        mock_close.assert_called_once()
+
 # Test search functionality
 def test_search(mock_client):
-    with patch("requests.get") as mock_get:
+    with patch.object(mock_client.session, "get") as mock_get:
         # Mock the API response
         mock_get.return_value.json.return_value = {
             "tracks": {
@@ -37,7 +92,7 @@ def test_search(mock_client):
 
 # Test get_user_playlists functionality
 def test_get_user_playlists(mock_client):
-    with patch("requests.get") as mock_get:
+    with patch.object(mock_client.session, "get") as mock_get:
         # Mock the API response
         mock_get.return_value.json.return_value = {
             "items": [
@@ -55,7 +110,7 @@ def test_get_user_playlists(mock_client):
 
 # Test create_playlist functionality
 def test_create_playlist(mock_client):
-    with patch("requests.post") as mock_post:
+    with patch.object(mock_client.session, "post") as mock_post:
         # Mock the API response
         mock_post.return_value.json.return_value = {
             "id": "playlist_id",
@@ -74,7 +129,7 @@ def test_create_playlist(mock_client):
 
 # Test save_search_results_to_excel functionality
 def test_save_search_results_to_excel(mock_client):
-    with patch("requests.get") as mock_get:
+    with patch.object(mock_client.session, "get") as mock_get:
         # Mock the API response
         mock_get.return_value.json.return_value = {
             "tracks": {
@@ -94,7 +149,7 @@ def test_save_search_results_to_excel(mock_client):
 
 # Test save_user_playlists_to_excel functionality
 def test_save_user_playlists_to_excel(mock_client):
-    with patch("requests.get") as mock_get:
+    with patch.object(mock_client.session, "get") as mock_get:
         # Mock the API response
         mock_get.return_value.json.return_value = {
             "items": [
@@ -112,7 +167,7 @@ def test_save_user_playlists_to_excel(mock_client):
 
 # Test get_recently_played_tracks functionality
 def test_get_recently_played_tracks(mock_client):
-    with patch("requests.get") as mock_get:
+    with patch.object(mock_client.session, "get") as mock_get:
         # Mock the API response
         mock_get.return_value.json.return_value = {
             "items": [
@@ -130,7 +185,7 @@ def test_get_recently_played_tracks(mock_client):
 
 # Test get_top_tracks functionality
 def test_get_top_tracks(mock_client):
-    with patch("requests.get") as mock_get:
+    with patch.object(mock_client.session, "get") as mock_get:
         # Mock the API response
         mock_get.return_value.json.return_value = {
             "items": [
@@ -148,7 +203,7 @@ def test_get_top_tracks(mock_client):
 
 # Test get_top_artists functionality
 def test_get_top_artists(mock_client):
-    with patch("requests.get") as mock_get:
+    with patch.object(mock_client.session, "get") as mock_get:
         # Mock the API response
         mock_get.return_value.json.return_value = {
             "items": [
@@ -166,7 +221,7 @@ def test_get_top_artists(mock_client):
 
 # Test get_playlist_snapshot functionality
 def test_get_playlist_snapshot(mock_client):
-    with patch("requests.get") as mock_get:
+    with patch.object(mock_client.session, "get") as mock_get:
         # Mock the API response
         mock_get.return_value.json.return_value = {
             "id": "playlist_id",
@@ -207,9 +262,60 @@ def test_compare_playlist_changes(mock_client):
     assert changes["added_tracks"] == ["track_id_3"]
     assert changes["removed_tracks"] == ["track_id_1"]
 
+# Test export_saved_tracks only appends tracks saved since the last run
+def test_export_saved_tracks(mock_client, tmp_path):
+    filename = str(tmp_path / "saved.csv")
+    first = [{"track": {"id": "track_id_1", "artists": []}, "added_at": "2023-10-01T12:00:00Z"}]
+    second = [{"track": {"id": "track_id_2", "artists": []}, "added_at": "2023-10-02T12:00:00Z"}] + first
+
+    with patch.object(mock_client, "iter_saved_tracks", side_effect=[iter(first), iter(second)]):
+        # Assert each run appends only the new tracks
+        assert mock_client.export_saved_tracks(filename) == 1
+        assert mock_client.export_saved_tracks(filename) == 1
+
+    with open(filename, encoding="utf-8") as file:
+        assert [line.split(",")[0] for line in file.read().splitlines()] == ["ID", "track_id_1", "track_id_2"]
+
+# Test export_recently_played resumes from the watermark
+def test_export_recently_played(mock_client, tmp_path):
+    filename = str(tmp_path / "history.ndjson")
+    items = [{"track": {"id": "track_id_1", "artists": []}, "played_at": "2023-10-01T12:00:00Z"}]
+
+    with patch.object(mock_client, "get_recently_played_tracks", return_value=items) as mock_recent:
+        mock_client.export_recently_played(filename)
+        mock_client.export_recently_played(filename)
+
+        # Assert the second run asked only for plays after the first one
+        assert mock_recent.call_args_list[0].kwargs["after"] is None
+        assert mock_recent.call_args_list[1].kwargs["after"] == 1696161600000
+
+# Test export_recently_played keeps fetching while pages are full
+def test_export_recently_played_pages(mock_client, tmp_path):
+    filename = str(tmp_path / "history.ndjson")
+    full = [{"track": {"id": f"track_id_{i}", "artists": []}, "played_at": f"2023-10-01T12:{i:02d}:00Z"} for i in range(50)]
+    last = [{"track": {"id": "track_id_50", "artists": []}, "played_at": "2023-10-01T13:00:00Z"}]
+
+    with patch.object(mock_client, "get_recently_played_tracks", side_effect=[full, last]) as mock_recent:
+        # Assert both pages were appended, the second fetched after the first one's newest play
+        assert mock_client.export_recently_played(filename) == 51
+        assert mock_recent.call_args_list[1].kwargs["after"] == 1696164540000
+
+# Test export_playlist_tracks skips unchanged playlists
+def test_export_playlist_tracks_unchanged(mock_client, tmp_path):
+    filename = str(tmp_path / "playlist.csv")
+    items = [{"track": {"id": "track_id_1", "artists": []}, "added_at": "2023-10-01T12:00:00Z"}]
+
+    with patch.object(mock_client, "get_playlist", return_value={"snapshot_id": "abc"}), \
+         patch.object(mock_client, "iter_playlist_tracks", return_value=iter(items)) as mock_iter:
+        assert mock_client.export_playlist_tracks("playlist_id", filename) == 1
+        assert mock_client.export_playlist_tracks("playlist_id", filename) == 0
+
+        # Assert the tracks were only fetched while the snapshot was unknown
+        mock_iter.assert_called_once()
+
 # Test start_playback functionality
 def test_start_playback(mock_client):
-    with patch("requests.put") as mock_put:
+    with patch.object(mock_client.session, "put") as mock_put:
         # Mock the API response
         mock_put.return_value.raise_for_status.return_value = None
 
@@ -221,7 +327,7 @@ def test_start_playback(mock_client):
 
 # Test pause_playback functionality
 def test_pause_playback(mock_client):
-    with patch("requests.put") as mock_put:
+    with patch.object(mock_client.session, "put") as mock_put:
         # Mock the API response
         mock_put.return_value.raise_for_status.return_value = None
 
@@ -233,7 +339,7 @@ def test_pause_playback(mock_client):
 
 # Test skip_to_next functionality
 def test_skip_to_next(mock_client):
-    with patch("requests.post") as mock_post:
+    with patch.object(mock_client.session, "post") as mock_post:
         # Mock the API response
         mock_post.return_value.raise_for_status.return_value = None
 
@@ -245,7 +351,7 @@ def test_skip_to_next(mock_client):
 
 # Test skip_to_previous functionality
 def test_skip_to_previous(mock_client):
-    with patch("requests.post") as mock_post:
+    with patch.object(mock_client.session, "post") as mock_post:
         # Mock the API response
         mock_post.return_value.raise_for_status.return_value = None
 
@@ -257,7 +363,7 @@ def test_skip_to_previous(mock_client):
 
 # Test set_volume functionality
 def test_set_volume(mock_client):
-    with patch("requests.put") as mock_put:
+    with patch.object(mock_client.session, "put") as mock_put:
         # Mock the API response
         mock_put.return_value.raise_for_status.return_value = None
 
@@ -269,7 +375,7 @@ def test_set_volume(mock_client):
 
 # Test save_tracks functionality
 def test_save_tracks(mock_client):
-    with patch("requests.put") as mock_put:
+    with patch.object(mock_client.session, "put") as mock_put:
         # Mock the API response
         mock_put.return_value.raise_for_status.return_value = None
 
@@ -281,7 +387,7 @@ def test_save_tracks(mock_client):
 
 # Test remove_tracks functionality
 def test_remove_tracks(mock_client):
-    with patch("requests.delete") as mock_delete:
+    with patch.object(mock_client.session, "delete") as mock_delete:
         # Mock the API response
         mock_delete.return_value.raise_for_status.return_value = None
 
@@ -293,7 +399,7 @@ def test_remove_tracks(mock_client):
 
 # Test check_saved_tracks functionality
 def test_check_saved_tracks(mock_client):
-    with patch("requests.get") as mock_get:
+    with patch.object(mock_client.session, "get") as mock_get:
         # Mock the API response
         mock_get.return_value.json.return_value = [True, False]
         mock_get.return_value.raise_for_status.return_value = None
@@ -306,7 +412,7 @@ def test_check_saved_tracks(mock_client):
 
 # Test get_new_releases functionality
 def test_get_new_releases(mock_client):
-    with patch("requests.get") as mock_get:
+    with patch.object(mock_client.session, "get") as mock_get:
         # Mock the API response
         mock_get.return_value.json.return_value = {
             "albums": {
@@ -326,7 +432,7 @@ def test_get_new_releases(mock_client):
 
 # Test get_featured_playlists functionality
 def test_get_featured_playlists(mock_client):
-    with patch("requests.get") as mock_get:
+    with patch.object(mock_client.session, "get") as mock_get:
         # Mock the API response
         mock_get.return_value.json.return_value = {
             "playlists": {
@@ -346,7 +452,7 @@ def test_get_featured_playlists(mock_client):
 
 # Test get_recommendations functionality
 def test_get_recommendations(mock_client):
-    with patch("requests.get") as mock_get:
+    with patch.object(mock_client.session, "get") as mock_get:
         # Mock the API response
         mock_get.return_value.json.return_value = {
             "tracks": [
@@ -364,7 +470,7 @@ def test_get_recommendations(mock_client):
 
 # Test reorder_playlist_tracks functionality
 def test_reorder_playlist_tracks(mock_client):
-    with patch("requests.put") as mock_put:
+    with patch.object(mock_client.session, "put") as mock_put:
         # Mock the API response
         mock_put.return_value.raise_for_status.return_value = None
 
@@ -376,7 +482,7 @@ def test_reorder_playlist_tracks(mock_client):
 
 # Test add_tracks_to_playlist functionality
 def test_add_tracks_to_playlist(mock_client):
-    with patch("requests.post") as mock_post:
+    with patch.object(mock_client.session, "post") as mock_post:
         # Mock the API response
         mock_post.return_value.raise_for_status.return_value = None
 
@@ -388,7 +494,7 @@ def test_add_tracks_to_playlist(mock_client):
 
 # Test remove_tracks_from_playlist functionality
 def test_remove_tracks_from_playlist(mock_client):
-    with patch("requests.delete") as mock_delete:
+    with patch.object(mock_client.session, "delete") as mock_delete:
         # Mock the API response
         mock_delete.return_value.raise_for_status.return_value = None
 
@@ -400,7 +506,7 @@ def test_remove_tracks_from_playlist(mock_client):
 
 # Test update_playlist_details functionality
 def test_update_playlist_details(mock_client):
-    with patch("requests.put") as mock_put:
+    with patch.object(mock_client.session, "put") as mock_put:
         # Mock the API response
         mock_put.return_value.raise_for_status.return_value = None
 
@@ -408,4 +514,345 @@ def test_update_playlist_details(mock_client):
         mock_client.update_playlist_details("playlist_id", name="Updated Playlist", description="Updated Description", public=True)
 
         # Assert the request was made
-        mock_put.assert_called_once()
\ No newline at end of file
+        mock_put.assert_called_once()
+
+# Test that catalog GETs are served from the client's cache
+def test_get_uses_cache(mock_client):
+    with patch.object(mock_client.session, "get") as mock_get:
+        # Mock the API response
+        mock_get.return_value.json.return_value = {"id": "album_id"}
+        mock_get.return_value.raise_for_status.return_value = None
+
+        # Request the same album twice
+        mock_client._get("albums/album_id")
+        mock_client._get("albums/album_id")
+
+        # Assert only one request reached the network
+        mock_get.assert_called_once()
+        assert mock_client.cache.stats()["hits"] == 1
+
+# Test that player endpoints are never cached
+def test_get_skips_cache_for_player(mock_client):
+    with patch.object(mock_client.session, "get") as mock_get:
+        # Mock the API response
+        mock_get.return_value.json.return_value = {"items": []}
+        mock_get.return_value.raise_for_status.return_value = None
+
+        # Request recently played tracks twice
+        mock_client.get_recently_played_tracks()
+        mock_client.get_recently_played_tracks()
+
+        # Assert both requests reached the network
+        assert mock_get.call_count == 2
+
+# Test that caches are scoped to each client
+def test_cache_is_per_client():
+    client = SpotifyClient("dummy_access_token")
+    other = SpotifyClient("dummy_access_token")
+
+    # Assert each client owns a separate cache
+    assert client.cache is not other.cache
+    assert SpotifyClient("dummy_access_token", cache=False).cache is None
+
+# Test that expired cache entries are revalidated with If-None-Match
+def test_get_revalidates_with_etag(mock_client):
+    with patch.object(mock_client.session, "get") as mock_get:
+        # Mock a first response with an ETag, then a 304 Not Modified
+        first = Mock(status_code=200, headers={"ETag": '"v1"'})
+        first.json.return_value = {"id": "playlist_id"}
+        not_modified = Mock(status_code=304, headers={})
+        not_modified.json.side_effect = ValueError("304 has no body")
+        mock_get.side_effect = [first, not_modified]
+
+        mock_client._get("playlists/playlist_id")
+        with patch("spotylog.cache.time.time", return_value=10**12):
+            playlist = mock_client._get("playlists/playlist_id")
+
+        # Assert the stored body was reused and the ETag was sent
+        assert playlist == {"id": "playlist_id"}
+        assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+
+# Helper to build a paging object whose `next` link points at the following offset
+def make_page(endpoint, items, offset, total):
+    next_offset = offset + len(items)
+    return {
+        "items": items,
+        "total": total,
+        "offset": offset,
+        "next": f"https://api.spotify.com/v1/{endpoint}?offset={next_offset}" if next_offset < total else None,
+    }
+
+# Test iter_user_playlists follows next links
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_iter_user_playlists(mock_client, prefetch):
+    pages = {
+        "me/playlists": make_page("me/playlists", [{"name": "A"}, {"name": "B"}], 0, 3),
+        "me/playlists?offset=2": make_page("me/playlists", [{"name": "C"}], 2, 3),
+    }
+    with patch.object(mock_client, "_get", side_effect=lambda endpoint, params=None: pages[endpoint]) as mock_get:
+        playlists = mock_client.iter_user_playlists(prefetch=prefetch)
+
+        # Assert nothing is requested until iteration starts
+        mock_get.assert_not_called()
+        assert [playlist["name"] for playlist in playlists] == ["A", "B", "C"]
+        assert mock_get.call_count == 2
+
+# Test iter_new_releases reads the nested paging object
+def test_iter_new_releases(mock_client):
+    pages = {
+        "browse/new-releases": {"albums": make_page("browse/new-releases", [{"name": "A"}], 0, 2)},
+        "browse/new-releases?offset=1": {"albums": make_page("browse/new-releases", [{"name": "B"}], 1, 2)},
+    }
+    with patch.object(mock_client, "_get", side_effect=lambda endpoint, params=None: pages[endpoint]):
+        # Assert albums from both pages are yielded
+        assert [album["name"] for album in mock_client.iter_new_releases()] == ["A", "B"]
+
+# Helper to serve numbered playlist items by offset, answering later pages faster than earlier ones
+def fake_playlist_tracks(endpoint, params=None):
+    offset = (params or {}).get("offset", 0)
+    time.sleep(0.01 * (250 - offset) / 100)
+    items = [{"track": {"id": f"track_id_{i}"}} for i in range(offset, min(offset + 100, 250))]
+    return {"items": items, "limit": 100, "offset": offset, "total": 250}
+
+# Test get_playlist_snapshot includes tracks beyond the first page
+def test_get_playlist_snapshot_pages(mock_client):
+    def fake_get(endpoint, params=None):
+        if endpoint == "playlists/playlist_id":
+            return {"id": "playlist_id", "name": "My Playlist", "tracks": fake_playlist_tracks(endpoint)}
+        return fake_playlist_tracks(endpoint, params)
+
+    with patch.object(mock_client, "_get", side_effect=fake_get):
+        snapshot = mock_client.get_playlist_snapshot("playlist_id")
+
+        # Assert every page was included, in order
+        assert snapshot["tracks"] == [f"track_id_{i}" for i in range(250)]
+
+# Test get_playlist_snapshot only asks for the fields it needs
+def test_get_playlist_snapshot_fields(mock_client):
+    def fake_get(endpoint, params=None):
+        if endpoint == "playlists/playlist_id":
+            return {"id": "playlist_id", "name": "My Playlist", "snapshot_id": "abc", "tracks": fake_playlist_tracks(endpoint)}
+        return fake_playlist_tracks(endpoint, params)
+
+    with patch.object(mock_client, "_get", side_effect=fake_get) as mock_get:
+        snapshot = mock_client.get_playlist_snapshot("playlist_id")
+
+        # Assert the playlist and every track page were projected to track IDs
+        assert snapshot["snapshot_id"] == "abc"
+        assert mock_get.call_args_list[0].kwargs["params"] == {"fields": api.SNAPSHOT_FIELDS}
+        assert all(call.kwargs["params"]["fields"] == api.SNAPSHOT_TRACK_FIELDS for call in mock_get.call_args_list[1:])
+
+# Test get_playlist_tracks_page functionality
+def test_get_playlist_tracks_page(mock_client):
+    with patch.object(mock_client, "_get", side_effect=fake_playlist_tracks) as mock_get:
+        page = mock_client.get_playlist_tracks_page("playlist_id", offset=200)
+
+        # Assert only the requested page was fetched
+        assert page["items"][0]["track"]["id"] == "track_id_200"
+        mock_get.assert_called_once_with("playlists/playlist_id/tracks", params={"limit": 100, "offset": 200})
+
+# Test get_all_playlist_tracks fans out the remaining offsets and keeps order
+def test_get_all_playlist_tracks(mock_client):
+    with patch.object(mock_client, "_get", side_effect=fake_playlist_tracks) as mock_get:
+        items = mock_client.get_all_playlist_tracks("playlist_id", max_workers=4)
+
+        # Assert each offset was requested once and items were reassembled in order
+        assert sorted(call.kwargs["params"]["offset"] for call in mock_get.call_args_list) == [0, 100, 200]
+        assert [item["track"]["id"] for item in items] == [f"track_id_{i}" for i in range(250)]
+
+# Test check_saved_tracks splits IDs into batches and keeps results aligned with the input
+def test_check_saved_tracks_chunks(mock_client):
+    track_ids = [f"track_id_{i}" for i in range(120)]
+
+    def fake_get(endpoint, params=None):
+        return [int(track_id.rsplit("_", 1)[1]) % 2 == 0 for track_id in params["ids"].split(",")]
+
+    with patch.object(mock_client, "_get", side_effect=fake_get) as mock_get:
+        results = mock_client.check_saved_tracks(track_ids)
+
+        # Assert three batches of at most 50 IDs were sent and the results are in input order
+        assert mock_get.call_count == 3
+        assert max(len(call.kwargs["params"]["ids"].split(",")) for call in mock_get.call_args_list) == 50
+        assert results == [i % 2 == 0 for i in range(120)]
+
+# Test save_tracks sends batches of 50 IDs
+def test_save_tracks_chunks(mock_client):
+    with patch.object(mock_client, "_put") as mock_put:
+        mock_client.save_tracks([f"track_id_{i}" for i in range(101)])
+
+        # Assert every ID was sent in batches of at most 50
+        sizes = sorted(len(call.kwargs["data"]["ids"]) for call in mock_put.call_args_list)
+        assert sizes == [1, 50, 50]
+
+# Test add_tracks_to_playlist sends batches of 100 URIs in order
+def test_add_tracks_to_playlist_chunks(mock_client):
+    track_uris = [f"spotify:track:{i}" for i in range(250)]
+    with patch.object(mock_client, "_post") as mock_post:
+        mock_client.add_tracks_to_playlist("playlist_id", track_uris)
+
+        # Assert the batches were sent sequentially, preserving order
+        sent = [uri for call in mock_post.call_args_list for uri in call.kwargs["data"]["uris"]]
+        assert mock_post.call_count == 3
+        assert sent == track_uris
+
+# Test that a 429 response backs off for Retry-After and is retried
+def test_rate_limited_request_is_retried(mock_client):
+    mock_client.rate_limiter = Mock()
+    with patch.object(mock_client.session, "post") as mock_post:
+        # Mock a 429 with Retry-After, then a success
+        limited = Mock(status_code=429, headers={"Retry-After": "2"})
+        success = Mock(status_code=201, headers={})
+        success.json.return_value = {"id": "playlist_id"}
+        mock_post.side_effect = [limited, success]
+
+        playlist = mock_client.create_playlist("user_id", "New Playlist")
+
+        # Assert the limiter backed off for the Retry-After delay before retrying
+        mock_client.rate_limiter.backoff.assert_called_once_with(2.0)
+        assert mock_client.rate_limiter.acquire.call_count == 2
+        assert playlist["id"] == "playlist_id"
+
+# Helper to build a mocked response with a status code
+def make_response(status_code, body=None):
+    response = Mock(status_code=status_code, headers={})
+    response.json.return_value = body
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.HTTPError(f"{status_code} Error")
+    return response
+
+# Test that a 404 is raised straight away without retries
+def test_client_error_is_not_retried(mock_client):
+    with patch.object(mock_client.session, "get") as mock_get:
+        mock_get.return_value = make_response(404)
+
+        # Assert the error surfaces after a single request
+        with pytest.raises(requests.HTTPError):
+            mock_client._get("albums/missing")
+        mock_get.assert_called_once()
+
+# Test that transient errors on GET are retried
+def test_server_error_is_retried(mock_client):
+    mock_client.retry_policy = RetryPolicy(base_delay=0, max_delay=0)
+    with patch.object(mock_client.session, "get") as mock_get:
+        mock_get.side_effect = [make_response(503), requests.ConnectionError(), make_response(200, {"id": "album_id"})]
+
+        # Assert the request succeeded on the third attempt
+        assert mock_client._get("albums/album_id") == {"id": "album_id"}
+        assert mock_get.call_count == 3
+
+# Test that non-idempotent requests are not retried
+def test_post_is_not_retried(mock_client):
+    mock_client.retry_policy = RetryPolicy(base_delay=0, max_delay=0)
+    with patch.object(mock_client.session, "post") as mock_post:
+        mock_post.return_value = make_response(503)
+
+        # Assert the POST was sent once
+        with pytest.raises(requests.HTTPError):
+            mock_client.create_playlist("user_id", "New Playlist")
+        mock_post.assert_called_once()
+
+# Test that the circuit breaker fails fast once the API is degraded
+def test_circuit_breaker_fails_fast(mock_client):
+    mock_client.retry_policy = RetryPolicy(max_attempts=1)
+    mock_client.circuit_breaker = CircuitBreaker(failure_threshold=2)
+    with patch.object(mock_client.session, "get") as mock_get:
+        mock_get.return_value = make_response(503)
+        for offset in range(2):
+            with pytest.raises(requests.HTTPError):
+                mock_client._get("albums/album_id", params={"offset": offset})
+
+        # Assert the next request fails without reaching the network
+        with pytest.raises(CircuitOpenError):
+            mock_client._get("albums/album_id")
+        assert mock_get.call_count == 2
+
+# Test that a trial request failing on an unexpected error does not leave the circuit stuck half open
+def test_circuit_breaker_recovers_after_failed_trial(mock_client):
+    mock_client.retry_policy = RetryPolicy(max_attempts=1)
+    mock_client.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    mock_client.circuit_breaker.record_failure()
+    with patch.object(mock_client.session, "get") as mock_get:
+        mock_get.side_effect = [requests.exceptions.ChunkedEncodingError(), make_response(200, {"id": "album_id"})]
+        with patch("spotylog.retry.time", Mock(monotonic=Mock(return_value=mock_client.circuit_breaker.opened_at + 10))):
+            with pytest.raises(requests.exceptions.ChunkedEncodingError):
+                mock_client._fetch("albums/album_id")
+
+        # Assert the failed trial reopened the circuit
+        assert mock_client.circuit_breaker.state == "open"
+
+        # Assert the next trial goes through and closes the circuit
+        with patch("spotylog.retry.time", Mock(monotonic=Mock(return_value=mock_client.circuit_breaker.opened_at + 10))):
+            assert mock_client._fetch("albums/album_id").status_code == 200
+        assert mock_client.circuit_breaker.state == "closed"
+
+# Test that cached results are private to the caller and to the account
+def test_cache_is_isolated(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with SpotifyClient("token_a", cache=ResponseCache(path)) as client_a, SpotifyClient("token_b", cache=ResponseCache(path)) as client_b:
+        with patch.object(client_a.session, "get", return_value=make_response(200, {"items": ["a"]})):
+            client_a.get_user_playlists()["items"].append("changed")
+
+            # Assert the next call is served from the cache, unchanged
+            assert client_a.get_user_playlists()["items"] == ["a"]
+        with patch.object(client_b.session, "get", return_value=make_response(200, {"items": ["b"]})) as mock_get:
+            # Assert another account sharing the cache file fetches its own playlists
+            assert client_b.get_user_playlists()["items"] == ["b"]
+            mock_get.assert_called_once()
+
+# Test that a 429 on a half-open trial request is re-sent instead of failing fast
+def test_circuit_breaker_trial_rate_limited(mock_client):
+    mock_client.rate_limiter = Mock()
+    mock_client.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    mock_client.circuit_breaker.record_failure()
+    limited = Mock(status_code=429, headers={"Retry-After": "1"})
+    with patch.object(mock_client.session, "get", side_effect=[limited, make_response(200, {"id": "album_id"})]):
+        with patch("spotylog.retry.time", Mock(monotonic=Mock(return_value=mock_client.circuit_breaker.opened_at + 10))):
+            # Assert the trial honoured Retry-After, succeeded and closed the circuit
+            assert mock_client._fetch("albums/album_id").status_code == 200
+    mock_client.rate_limiter.backoff.assert_called_once_with(1.0)
+    assert mock_client.circuit_breaker.state == "closed"
+
+# Test that cached bodies are stored as they arrived and decoded with the client's decoder
+def test_cache_uses_json_decoder():
+    decoded = []
+
+    def loads(content):
+        decoded.append(content)
+        return json.loads(content)
+
+    with SpotifyClient("dummy_access_token", json_decoder=loads) as client:
+        response = make_response(200)
+        response.content = b'{"id": "album_id"}'
+        with patch.object(client.session, "get", return_value=response):
+            client._get("albums/album_id")
+
+            # Assert the hit decoded the original bytes with the client's decoder
+            assert client._get("albums/album_id") == {"id": "album_id"}
+            assert decoded == [b'{"id": "album_id"}'] * 2
+
+# Test that a write drops the cached responses it makes stale
+def test_write_invalidates_cache(mock_client):
+    with patch.object(mock_client.session, "get", side_effect=[make_response(200, {"items": ["a"]}), make_response(200, {"items": ["a", "b"]})]) as mock_get, \
+         patch.object(mock_client.session, "put", return_value=make_response(200)):
+        assert mock_client._get("me/tracks", params={"limit": 50}) == {"items": ["a"]}
+        mock_client.save_tracks(["b"])
+
+        # Assert the saved tracks were fetched again after the write
+        assert mock_client._get("me/tracks", params={"limit": 50}) == {"items": ["a", "b"]}
+        assert mock_get.call_count == 2
+
+# Test that identical concurrent GETs share one network call
+def test_concurrent_gets_are_coalesced(mock_client):
+    def slow_get(url, **kwargs):
+        time.sleep(0.05)
+        return make_response(200, {"tracks": {"items": []}})
+
+    with patch.object(mock_client.session, "get", side_effect=slow_get) as mock_get:
+        threads = [threading.Thread(target=mock_client.search, args=("Imagine Dragons",)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert only one request reached the network
+        mock_get.assert_called_once()
\ No newline at end of file
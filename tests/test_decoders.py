@@ -0,0 +1,29 @@
+import sys
+import os
+
+# Add the root directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import pytest
+from unittest.mock import patch
+from spotylog import decoders
+from spotylog.decoders import get_decoder
+
+# Test get_decoder functionality
+def test_get_decoder():
+    # Assert named decoders decode bytes and callables are used as given
+    assert get_decoder("json")(b'{"id": "track_id"}') == {"id": "track_id"}
+    assert get_decoder("auto")(b'{"id": "track_id"}') == {"id": "track_id"}
+    assert get_decoder(len) is len
+
+    with pytest.raises(ValueError):
+        get_decoder("yaml")
+
+# Test that "auto" falls back to the standard library without orjson
+def test_get_decoder_without_orjson():
+    with patch.object(decoders, "orjson", None):
+        # Assert the standard library is used and orjson can't be requested
+        assert get_decoder("auto") is json.loads
+        with pytest.raises(ImportError):
+            get_decoder("orjson")
\ No newline at end of file
@@ -0,0 +1,69 @@
+import sys
+import os
+
+# Add the root directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+import time
+import pytest
+from spotylog.diff import Edit, apply_edits, diff_tracks, longest_common_subsequence
+
+# Test longest_common_subsequence functionality
+def test_longest_common_subsequence():
+    old = ["a", "b", "c", "a", "b", "b", "a"]
+    new = ["c", "b", "a", "b", "a", "c"]
+    pairs = longest_common_subsequence(old, new)
+
+    # Assert the matches are in order, match equal items and are as long as possible
+    assert len(pairs) == 4
+    assert all(old[i] == new[j] for i, j in pairs)
+    assert all(a[0] < b[0] and a[1] < b[1] for a, b in zip(pairs, pairs[1:]))
+
+# Test inserts, deletes and range moves
+def test_diff_tracks():
+    old = ["a", "b", "c", "d", "e", "f"]
+    new = ["a", "x", "y", "e", "f", "c", "d"]
+    edits = diff_tracks(old, new)
+
+    # Assert the moved block is one range move and the rest are minimal inserts and deletes
+    assert [(edit.op, len(edit.track_ids)) for edit in edits] == [("delete", 1), ("insert", 2), ("move", 2)]
+    assert edits[:2] == [Edit("delete", 1, None, ["b"]), Edit("insert", None, 1, ["x", "y"])]
+    assert apply_edits(old, edits) == new
+
+# Test duplicated tracks
+def test_diff_tracks_duplicates():
+    # Assert each copy of a duplicate is tracked on its own
+    assert diff_tracks(["a", "b"], ["a", "b", "a"]) == [Edit("insert", None, 2, ["a"])]
+    assert diff_tracks(["a", "a", "b"], ["a", "b"]) == [Edit("delete", 1, None, ["a"])]
+    assert diff_tracks(["a", "b", "a"], ["a", "a", "b"]) == [Edit("move", 2, 1, ["a"])]
+
+# Test random edits round-trip on a 10k-track playlist
+def test_diff_tracks_large():
+    rng = random.Random(0)
+    old = [f"track_{rng.randrange(9000)}" for _ in range(10000)]
+    new = list(old)
+    for _ in range(200):
+        new.insert(rng.randrange(len(new)), new.pop(rng.randrange(len(new))))
+    del new[100:150]
+    new[5000:5000] = [f"new_{i}" for i in range(30)]
+
+    started = time.perf_counter()
+    edits = diff_tracks(old, new)
+
+    # Assert the script rebuilds the new playlist, quickly
+    assert time.perf_counter() - started < 2
+    assert apply_edits(old, edits) == new
+    assert sum(len(edit.track_ids) for edit in edits if edit.op == "insert") == 30
+
+# Test that many unknown (None) tracks don't slow the diff down
+def test_diff_tracks_unknown_tracks():
+    old = [None] * 5000 + [f"track_{i}" for i in range(5000)]
+    new = old[::-1]
+
+    started = time.perf_counter()
+    edits = diff_tracks(old, new)
+
+    # Assert the script is still correct, and found quickly
+    assert time.perf_counter() - started < 2
+    assert apply_edits(old, edits) == new
\ No newline at end of file
@@ -6,7 +6,10 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 import pytest
 # import os
-from spotylog.excel_utils import save_to_excel, save_to_csv, save_to_json
+import csv
+import gzip
+import json
+from spotylog.excel_utils import save_to_arrow, save_to_excel, save_to_csv, save_to_json, save_to_ndjson, save_to_parquet
 
 # Test save_to_excel functionality
 def test_save_to_excel():
@@ -21,6 +24,31 @@ def test_save_to_excel():
     assert os.path.exists(filename)
     os.remove(filename)  # Clean up
 
+# Test save_to_excel streams an iterator across sheets
+def test_save_to_excel_splits_sheets(tmp_path):
+    from openpyxl import load_workbook
+
+    rows = ({"Name": f"Track {i}", "Popularity": i} for i in range(5))
+    filename = str(tmp_path / "test_excel_sheets.xlsx")
+    count = save_to_excel(rows, filename, max_rows_per_sheet=3)
+
+    # Assert every row was written, two per sheet, under a bold, centered header
+    wb = load_workbook(filename)
+    assert count == 5
+    assert wb.sheetnames == ["Sheet", "Sheet2", "Sheet3"]
+    assert [cell.value for cell in wb["Sheet2"][1]] == ["Name", "Popularity"]
+    assert [row[0].value for row in wb["Sheet3"].iter_rows(min_row=2)] == ["Track 4"]
+    assert wb["Sheet"]["A1"].font.bold
+    assert wb["Sheet"]["A1"].alignment.horizontal == "center"
+
+# Test save_to_excel with no rows
+def test_save_to_excel_empty(tmp_path):
+    filename = str(tmp_path / "test_excel_empty.xlsx")
+
+    # Assert an empty workbook is still created
+    assert save_to_excel(iter([]), filename) == 0
+    assert os.path.exists(filename)
+
 # Test save_to_csv functionality
 def test_save_to_csv():
     data = [
@@ -45,4 +73,68 @@ def test_save_to_json():
 
     # Assert the file was created
     assert os.path.exists(filename)
-    os.remove(filename)  # Clean up
\ No newline at end of file
+    os.remove(filename)  # Clean up
+
+# Test save_to_csv streams a generator into a gzip file
+def test_save_to_csv_gzip(tmp_path):
+    rows = ({"Name": f"Track {i}", "Popularity": i} for i in range(3))
+    filename = str(tmp_path / "test_csv.csv.gz")
+
+    # Assert every row was compressed on the fly under the inferred header
+    assert save_to_csv(rows, filename) == 3
+    with gzip.open(filename, "rt", newline="") as file:
+        assert list(csv.reader(file)) == [["Name", "Popularity"], ["Track 0", "0"], ["Track 1", "1"], ["Track 2", "2"]]
+
+# Test save_to_csv with no rows
+def test_save_to_csv_empty(tmp_path):
+    filename = str(tmp_path / "test_csv_empty.csv")
+
+    # Assert empty input writes just the explicit header instead of crashing
+    assert save_to_csv(iter([]), filename, headers=["Name", "Popularity"]) == 0
+    with open(filename, encoding="utf-8", newline="") as file:
+        assert file.read() == "Name,Popularity\r\n"
+
+# Test save_to_json streams a generator in the same format as json.dump
+def test_save_to_json_stream(tmp_path):
+    data = [{"Name": "Believer", "Genres": ["rock"]}, {"Name": "Thunder", "Genres": []}]
+    filename = str(tmp_path / "test_json_stream.json")
+    save_to_json(iter(data), filename)
+
+    # Assert the output matches the non-streaming format
+    with open(filename, encoding="utf-8") as file:
+        assert file.read() == json.dumps(data, indent=4)
+
+# Test save_to_ndjson functionality
+def test_save_to_ndjson(tmp_path):
+    data = [{"Name": "Believer"}, {"Name": "Thunder"}]
+    filename = str(tmp_path / "test_ndjson.ndjson.gz")
+
+    # Assert one JSON object was written per line
+    assert save_to_ndjson(iter(data), filename) == 2
+    with gzip.open(filename, "rt", encoding="utf-8") as file:
+        assert [json.loads(line) for line in file] == data
+
+# Test save_to_parquet writes typed columns in row groups
+def test_save_to_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    rows = ({"Name": f"Track {i}", "Artists": "Imagine Dragons", "Duration (ms)": 200000 + i, "Popularity": 85,
+             "Played At": "2023-10-01T12:00:00.123Z"} for i in range(5))
+    filename = str(tmp_path / "test_parquet.parquet")
+
+    # Assert the rows were streamed into row groups with typed, dictionary-encoded columns
+    assert save_to_parquet(rows, filename, row_group_size=2) == 5
+    file = pq.ParquetFile(filename)
+    assert file.num_row_groups == 3
+    assert str(file.schema_arrow.field("Played At").type) == "timestamp[ms, tz=UTC]"
+    assert str(file.schema_arrow.field("Popularity").type) == "int16"
+    assert "RLE_DICTIONARY" in file.metadata.row_group(0).column(1).encodings
+    assert file.read().column("Duration (ms)").to_pylist() == [200000, 200001, 200002, 200003, 200004]
+
+# Test save_to_arrow functionality
+def test_save_to_arrow(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    filename = str(tmp_path / "test_arrow.arrow")
+
+    # Assert the rows can be read back from the Arrow file
+    assert save_to_arrow(iter([{"Name": "Believer", "Tracks": 11}]), filename) == 1
+    assert pa.ipc.open_file(filename).read_all().to_pylist() == [{"Name": "Believer", "Tracks": 11}]
\ No newline at end of file
@@ -0,0 +1,124 @@
+import sys
+import os
+
+# Add the root directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+import requests
+from unittest.mock import Mock
+from datetime import date, datetime, timezone
+from spotylog.history import HistoryLogger, HistoryStore
+
+def play(track_id, played_at, artist_id="artist_id"):
+    return {"track": {"id": track_id, "name": track_id, "artists": [{"id": artist_id, "name": "Imagine Dragons"}]}, "played_at": played_at}
+
+@pytest.fixture
+def store():
+    with HistoryStore(":memory:") as store:
+        yield store
+
+# Test HistoryStore deduplicates on played_at
+def test_history_store_dedupe(store):
+    # Assert plays already stored are skipped and the cursor is the newest play
+    assert store.add([play("a", "2023-10-01T12:00:00Z"), play("b", "2023-10-01T12:03:00.250Z")]) == 2
+    assert store.add([play("b", "2023-10-01T12:03:00.250Z"), play("c", "2023-10-01T12:06:00Z")]) == 1
+    assert len(store) == 3
+    assert store.cursor() == 1696161960000
+
+# Test HistoryStore survives a restart
+def test_history_store_reopen(tmp_path):
+    path = str(tmp_path / "history.sqlite")
+    with HistoryStore(path) as store:
+        store.add([play("a", "2023-10-01T12:00:00Z")])
+
+    # Assert the cursor is read back from the file
+    with HistoryStore(path) as store:
+        assert store.cursor() == 1696161600000
+
+# Test time-range, track and artist queries
+def test_history_store_queries(store):
+    store.add([
+        play("a", "2023-10-01T23:30:00Z", "artist_1"),
+        play("b", "2023-10-02T08:00:00Z", "artist_2"),
+        play("a", "2023-10-02T09:00:00Z", "artist_1"),
+        play("c", "2023-10-03T10:00:00Z", "artist_1"),
+    ])
+
+    # Assert ranges include the start, exclude the end and accept any timestamp form
+    plays = store.plays("2023-10-02T00:00:00Z", datetime(2023, 10, 3, tzinfo=timezone.utc))
+    assert [row["track_id"] for row in plays] == ["b", "a"]
+    assert store.count(start=1696204800000) == 3
+
+    # Assert plays can be looked up by track or artist, oldest first
+    assert [row["played_at"] for row in store.plays(track_id="a")] == [1696203000000, 1696237200000]
+    assert [row["track_id"] for row in store.plays(end="2023-10-03T00:00:00Z", artist_id="artist_1")] == ["a", "a"]
+
+    # Assert plays are counted per day, in the requested time zone
+    assert store.plays_per_day() == [(date(2023, 10, 1), 1), (date(2023, 10, 2), 2), (date(2023, 10, 3), 1)]
+    assert store.plays_per_day(utc_offset=3600)[0] == (date(2023, 10, 2), 3)
+
+# Test plays are read lazily in batches
+def test_history_store_lazy(store):
+    store.add([play(f"track_{i}", f"2023-10-01T12:{i:02d}:00Z") for i in range(10)])
+    plays = store.plays(batch_size=3)
+
+    # Assert rows come one at a time and other calls still work mid-iteration
+    assert next(plays)["track_id"] == "track_0"
+    assert len(store) == 10
+    assert len(list(plays)) == 9
+
+# Test HistoryLogger polls with the stored cursor
+def test_history_logger_poll(store):
+    client = Mock()
+    client.get_recently_played_tracks.side_effect = [[play("a", "2023-10-01T12:00:00Z")], []]
+    logger = HistoryLogger(client, store)
+
+    # Assert the first poll starts from scratch and the next one from the newest play
+    assert logger.poll() == 1
+    assert logger.poll() == 0
+    assert client.get_recently_played_tracks.call_args_list[0].kwargs["after"] is None
+    assert client.get_recently_played_tracks.call_args_list[1].kwargs["after"] == 1696161600000
+
+# Test HistoryLogger keeps fetching while pages are full
+def test_history_logger_catches_up(store):
+    client = Mock()
+    full = [play(f"track_{i}", f"2023-10-01T12:{i:02d}:00Z") for i in range(50)]
+    client.get_recently_played_tracks.side_effect = [full, [play("last", "2023-10-01T13:00:00Z")]]
+
+    # Assert both pages were stored in a single poll
+    assert HistoryLogger(client, store).poll() == 51
+
+# Test the polling interval adapts to activity
+def test_history_logger_interval(store):
+    logger = HistoryLogger(Mock(), store, active_interval=60, idle_interval=300)
+
+    # Assert idle polls back off up to the idle interval and new plays reset it
+    assert [logger.next_interval(0) for _ in range(4)] == [120, 240, 300, 300]
+    assert logger.next_interval(3) == 60
+
+# Test HistoryLogger.run survives connection errors
+def test_history_logger_run(store):
+    client = Mock()
+    client.get_recently_played_tracks.side_effect = [requests.ConnectionError(), [play("a", "2023-10-01T12:00:00Z")]]
+    logger = HistoryLogger(client, store, active_interval=0, idle_interval=0)
+
+    # Assert the failed poll was skipped and the logger kept going
+    assert logger.run(max_polls=2) == 1
+
+# Test HistoryLogger.run rides out server errors but stops on an expired token
+def test_history_logger_run_http_errors(store):
+    def http_error(status_code):
+        return requests.HTTPError(f"{status_code} Error", response=Mock(status_code=status_code))
+
+    client = Mock()
+    client.get_recently_played_tracks.side_effect = [http_error(503), http_error(429), [play("a", "2023-10-01T12:00:00Z")]]
+    logger = HistoryLogger(client, store, active_interval=0, idle_interval=0)
+
+    # Assert the outage polls were skipped and the logger kept going
+    assert logger.run(max_polls=3) == 1
+
+    # Assert a 401 stops the logger
+    client.get_recently_played_tracks.side_effect = [http_error(401)]
+    with pytest.raises(requests.HTTPError):
+        logger.run(max_polls=1)
\ No newline at end of file
@@ -0,0 +1,108 @@
+import sys
+import os
+
+# Add the root directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from spotylog import incremental
+
+def play(track_id, played_at):
+    return {"track": {"id": track_id, "name": track_id, "artists": []}, "played_at": played_at}
+
+# Test watermark files
+def test_watermark_roundtrip(tmp_path):
+    filename = str(tmp_path / "history.csv")
+
+    # Assert a missing watermark reads as empty and a written one is read back
+    assert incremental.read_watermark(filename) == {}
+    incremental.write_watermark(filename, {"field": "played_at", "value": "2023-10-01T12:00:00Z"})
+    assert incremental.read_watermark(filename)["value"] == "2023-10-01T12:00:00Z"
+    assert os.path.exists(str(tmp_path / "history.csv.watermark.json"))
+
+# Test export_format functionality
+def test_export_format():
+    # Assert the format follows the extension, ignoring compression
+    assert incremental.export_format("history.parquet") == "parquet"
+    assert incremental.export_format("history.ndjson.gz") == "ndjson"
+    assert incremental.export_format("history.csv.zst") == "csv"
+
+# Test new_items compares timestamps, not strings
+def test_new_items():
+    watermark = {"value": "2023-10-01T12:00:00Z"}
+    items = [play("b", "2023-10-01T12:05:00Z"), play("old", "2023-10-01T11:59:59.999Z"), play("a", "2023-10-01T12:00:00.500Z")]
+
+    # Assert only newer items are kept, oldest first
+    assert [item["track"]["id"] for item in incremental.new_items(items, "played_at", watermark)] == ["a", "b"]
+    assert incremental.after_cursor(watermark) == 1696161600000
+
+# Test append_items moves the watermark forward and keeps appending
+def test_append_items(tmp_path):
+    filename = str(tmp_path / "history.ndjson")
+    incremental.append_items([play("a", "2023-10-01T12:00:00Z")], filename, "played_at", {})
+    watermark = incremental.read_watermark(filename)
+    incremental.append_items([play("b", "2023-10-01T13:00:00Z")], filename, "played_at", watermark)
+
+    # Assert both runs were appended and the watermark holds the newest timestamp
+    with open(filename, encoding="utf-8") as file:
+        assert len(file.readlines()) == 2
+    assert incremental.read_watermark(filename) == {"field": "played_at", "value": "2023-10-01T13:00:00Z", "rows": 2, "boundary_ids": ["b"],
+                                                    "columns": ["ID", "Name", "Artists", "Album", "Duration (ms)", "Popularity", "Played At"]}
+
+# Test tracks added in the same second as the watermark are exported once
+def test_new_items_same_second(tmp_path):
+    filename = str(tmp_path / "saved.ndjson")
+    incremental.append_items([play("a", "2023-10-01T12:00:00Z")], filename, "played_at", {})
+    watermark = incremental.read_watermark(filename)
+    items = [play("a", "2023-10-01T12:00:00Z"), play("b", "2023-10-01T12:00:00Z")]
+
+    # Assert only the track not yet written at that second is new, and both are then remembered
+    assert [item["track"]["id"] for item in incremental.new_items(items, "played_at", watermark)] == ["b"]
+    incremental.append_items(incremental.new_items(items, "played_at", watermark), filename, "played_at", watermark)
+    assert incremental.read_watermark(filename)["boundary_ids"] == ["a", "b"]
+    assert not incremental.is_older(items[0], "played_at", watermark)
+
+# Test items without a timestamp do not break the export
+def test_new_items_missing_timestamp():
+    items = [play("b", "2023-10-01T12:00:00Z"), play("a", None)]
+
+    # Assert they are exported first on the first run and count as older afterwards
+    assert [item["track"]["id"] for item in incremental.new_items(items, "played_at", {})] == ["a", "b"]
+    watermark = {"value": "2023-10-01T11:00:00Z"}
+    assert [item["track"]["id"] for item in incremental.new_items(items, "played_at", watermark)] == ["b"]
+    assert incremental.is_older(items[1], "played_at", watermark)
+
+# Test CSV appends keep the columns of the first run
+def test_append_items_csv_columns(tmp_path):
+    filename = str(tmp_path / "history.csv")
+    incremental.append_items([play("a", "2023-10-01T12:00:00Z")], filename, "played_at", {})
+    watermark = incremental.read_watermark(filename)
+    incremental.append_items([{"track": {"id": "b", "artists": []}, "added_at": "2023-10-01T13:00:00Z"}], filename, "added_at", watermark)
+
+    # Assert the second row was written in the first run's columns
+    with open(filename, encoding="utf-8") as file:
+        assert [len(line.split(",")) for line in file.read().splitlines()] == [7, 7, 7]
+
+# Test the after cursor follows full pages of recently played tracks
+def test_next_after_cursor():
+    page = [play(str(i), f"2023-10-01T12:{i:02d}:00Z") for i in range(3)]
+
+    # Assert a full page moves the cursor to its newest play and a short one ends paging
+    assert incremental.next_after_cursor(page, None, limit=3) == 1696161720000
+    assert incremental.next_after_cursor(page, 1696161720000, limit=3) is None
+    assert incremental.next_after_cursor(page[:2], None, limit=3) is None
+
+# Test RecentlyPlayedExport pages from the watermark until a short page
+def test_recently_played_export(tmp_path):
+    filename = str(tmp_path / "history.ndjson")
+    incremental.write_watermark(filename, {"field": "played_at", "value": "2023-10-01T12:00:00Z", "boundary_ids": ["old"]})
+    export = incremental.RecentlyPlayedExport(filename)
+    full = [play(str(i), f"2023-10-01T12:{i:02d}:00Z") for i in range(incremental.RECENTLY_PLAYED_LIMIT)]
+
+    # Assert it resumes from the watermark, follows the full page and stops after the short one
+    assert export.after == 1696161600000 and not export.done
+    export.add(full)
+    assert export.after == 1696161600000 + (incremental.RECENTLY_PLAYED_LIMIT - 1) * 60000 and not export.done
+    export.add([play("last", "2023-10-01T13:00:00Z")])
+    assert export.done
+    assert [item["track"]["id"] for item in export.items()][-2:] == [str(incremental.RECENTLY_PLAYED_LIMIT - 1), "last"]
\ No newline at end of file
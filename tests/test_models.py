@@ -5,7 +5,8 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import pytest
-from spotylog.models import Track, Playlist
+from unittest.mock import Mock
+from spotylog.models import Album, Artist, Playlist, Track, TrackBatch
 
 # Test Track class
 def test_track():
@@ -42,4 +43,97 @@ def test_playlist():
     assert playlist.name == "My Playlist"
     assert playlist.description == "A test playlist"
     assert len(playlist.tracks) == 2
-    assert str(playlist) == "My Playlist - 2 tracks"
\ No newline at end of file
+    assert str(playlist) == "My Playlist - 2 tracks"
+
+# Test from_json constructors
+def test_from_json():
+    track = Track.from_json(b'{"track": {"id": "track_id", "name": "Believer", "artists": [{"name": "Imagine Dragons"}], "duration_ms": 204000}}')
+    artist = Artist.from_json({"id": "artist_id", "name": "Imagine Dragons", "genres": ["rock"], "popularity": 85})
+    album = Album.from_json('{"id": "album_id", "name": "Evolve", "artists": [{"name": "Imagine Dragons"}], "total_tracks": 11}')
+
+    # Assert JSON text, decoded objects and wrapped items are all accepted
+    assert str(track) == "Believer by Imagine Dragons"
+    assert track.duration_ms == 204000
+    assert artist.genres == ("rock",)
+    assert str(album) == "Evolve by Imagine Dragons"
+
+    # Assert the models are slotted
+    with pytest.raises(AttributeError):
+        track.extra = True
+
+# Test TrackBatch functionality
+def test_track_batch():
+    items = [
+        {"track": {"id": "track_id_1", "name": "Believer", "artists": [{"name": "Imagine Dragons"}], "duration_ms": 204000, "popularity": 85}},
+        {"track": {"id": "track_id_2", "name": "Thunder", "artists": [{"name": "Imagine Dragons"}], "duration_ms": 187000, "popularity": 90}},
+        {"track": {"id": "track_id_3", "name": "Local file", "artists": []}},
+        {"track": {"id": "track_id_4", "name": "Earfquake", "artists": [{"name": "Tyler, The Creator"}]}},
+    ]
+    batch = TrackBatch.from_items(items)
+
+    # Assert each column holds one value per item, with repeated strings shared
+    assert len(batch) == 4
+    assert batch.ids == ["track_id_1", "track_id_2", "track_id_3", "track_id_4"]
+    assert list(batch.durations) == [204000, 187000, -1, -1]
+    assert batch.artists[0] is batch.artists[1]
+    assert batch[2].popularity is None
+
+    # Assert artist names containing commas come back whole
+    assert batch[3].artists == ["Tyler, The Creator"]
+    assert batch[2].artists == []
+
+    # Assert filtering and sorting work on a single column and keep rows together
+    assert batch.filter("durations", lambda duration: duration > 190000).names == ["Believer"]
+    popular = batch.sort("popularity", reverse=True)
+    assert popular.ids == ["track_id_2", "track_id_1", "track_id_3", "track_id_4"]
+    assert list(popular.popularity) == [90, 85, -1, -1]
+    assert [str(track) for track in popular][:1] == ["Thunder by Imagine Dragons"]
+
+# Test that playlist tracks are fetched lazily, one page at a time
+def test_playlist_lazy_tracks():
+    def page(offset):
+        items = [{"track": {"id": f"track_id_{i}", "name": f"Track {i}"}} for i in range(offset, min(offset + 2, 5))]
+        return {"items": items, "limit": 2, "offset": offset, "total": 5}
+
+    fetched = []
+
+    def fetch_page(offset):
+        fetched.append(offset)
+        return page(offset)
+
+    playlist = Playlist({"id": "playlist_id", "name": "My Playlist", "tracks": page(0)}, fetch_page)
+
+    # Assert the true total is known without fetching anything
+    assert playlist.total == 5
+    assert str(playlist) == "My Playlist - 5 tracks"
+    assert fetched == []
+
+    # Assert indexing fetches only the page holding the track, and only once
+    assert playlist.tracks[-1].id == "track_id_4"
+    assert playlist.tracks[4].name == "Track 4"
+    assert fetched == [4]
+
+    # Assert iterating fetches the remaining pages in order
+    assert [track.id for track in playlist.tracks] == [f"track_id_{i}" for i in range(5)]
+    assert fetched == [4, 2]
+    assert playlist.tracks.to_batch().ids == [f"track_id_{i}" for i in range(5)]
+
+# Test that a playlist without a client can't fetch more pages
+def test_playlist_without_client():
+    playlist = Playlist({"name": "My Playlist", "tracks": {"items": [{"track": {"id": "track_id_1"}}], "limit": 1, "total": 2}})
+
+    # Assert the loaded page is usable and the missing one raises
+    assert playlist.tracks[0].id == "track_id_1"
+    with pytest.raises(LookupError):
+        playlist.tracks[1]
+
+# Test Playlist.from_client functionality
+def test_playlist_from_client():
+    client = Mock()
+    client.get_playlist.return_value = {"id": "playlist_id", "name": "My Playlist", "tracks": {"items": [], "limit": 50, "offset": 0, "total": 60}}
+    client.get_playlist_tracks_page.return_value = {"items": [{"track": {"id": "track_id_59"}}] * 10, "limit": 50, "offset": 50, "total": 60}
+    playlist = Playlist.from_client(client, "playlist_id")
+
+    # Assert later pages are requested from the client with the first page's limit
+    assert playlist.tracks[55].id == "track_id_59"
+    client.get_playlist_tracks_page.assert_called_once_with("playlist_id", offset=50, limit=50)
\ No newline at end of file
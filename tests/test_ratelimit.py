@@ -0,0 +1,64 @@
+import sys
+import os
+
+# Add the root directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import threading
+import time
+import pytest
+from spotylog.ratelimit import RateLimiter, get_rate_limiter, parse_retry_after
+
+# Test that requests beyond the burst are paced at the sustained rate
+def test_acquire_paces_requests():
+    limiter = RateLimiter(rate=100, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+
+    # Assert five paced requests took at least 5 / 100 seconds
+    assert time.monotonic() - start >= 0.045
+
+# Test that a backoff holds requests from every thread
+def test_backoff_holds_all_threads():
+    limiter = RateLimiter(rate=1000)
+    limiter.backoff(0.1)
+    finished = []
+
+    def worker():
+        limiter.acquire()
+        finished.append(time.monotonic())
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert no thread went through before the backoff ended
+    assert min(finished) - start >= 0.09
+
+# Test that coroutines wait on the same limiter
+@pytest.mark.asyncio
+async def test_acquire_async():
+    limiter = RateLimiter(rate=1000)
+    limiter.backoff(0.05)
+    start = time.monotonic()
+    await limiter.acquire_async()
+
+    # Assert the coroutine waited out the backoff
+    assert time.monotonic() - start >= 0.04
+
+# Test Retry-After parsing
+def test_parse_retry_after():
+    # Assert numeric values are used and invalid or missing ones fall back to the default
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) == 1.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", default=5) == 5
+
+# Test that limiters are shared per access token
+def test_get_rate_limiter():
+    # Assert the same token gets the same limiter
+    assert get_rate_limiter("token_a") is get_rate_limiter("token_a")
+    assert get_rate_limiter("token_a") is not get_rate_limiter("token_b")
\ No newline at end of file
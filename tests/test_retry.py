@@ -0,0 +1,85 @@
+import sys
+import os
+
+# Add the root directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from unittest.mock import patch
+from spotylog.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+# Test which failures count as transient
+def test_is_transient():
+    policy = RetryPolicy()
+
+    # Assert 5xx responses and connection errors are transient but 4xx responses are not
+    assert policy.is_transient(503)
+    assert policy.is_transient(error=ConnectionError())
+    assert not policy.is_transient(404)
+
+# Test that only idempotent methods are retried, up to max_attempts
+def test_should_retry():
+    policy = RetryPolicy(max_attempts=3)
+
+    # Assert POST is never retried and attempts are capped
+    assert policy.should_retry("get", 1)
+    assert not policy.should_retry("post", 1)
+    assert not policy.should_retry("get", 3)
+
+# Test that the retry budget caps retries
+def test_retry_budget():
+    policy = RetryPolicy(retry_budget=2, budget_ratio=0.5)
+
+    # Assert the budget runs out and is refilled by requests
+    assert policy.should_retry("get", 1)
+    assert policy.should_retry("get", 1)
+    assert not policy.should_retry("get", 1)
+    policy.record_request()
+    policy.record_request()
+    assert policy.should_retry("get", 1)
+
+# Test decorrelated jitter stays within bounds
+def test_next_delay():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+    delay = None
+    for _ in range(20):
+        delay = policy.next_delay(delay)
+
+        # Assert every delay is between the base and the cap
+        assert 1 <= delay <= 5
+
+# Test the circuit breaker opens, fails fast and recovers
+def test_circuit_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    breaker.before_request()
+    breaker.record_failure()
+
+    # Assert the open circuit fails fast
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    # Assert a trial request is let through after the timeout and success closes the circuit
+    with patch("spotylog.retry.time.monotonic", return_value=breaker.opened_at + 10):
+        breaker.before_request()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+    breaker.record_success()
+    breaker.before_request()
+    assert breaker.state == "closed"
+
+# Test that a trial request that never reports back is replaced after another timeout
+def test_circuit_breaker_replaces_lost_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    with patch("spotylog.retry.time.monotonic", return_value=breaker.opened_at + 10):
+        breaker.before_request()
+    trial_started = breaker.opened_at
+
+    # Assert other requests fail fast while the trial is out, then a new trial is let through
+    with patch("spotylog.retry.time.monotonic", return_value=trial_started + 5):
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request()
+    with patch("spotylog.retry.time.monotonic", return_value=trial_started + 10):
+        breaker.before_request()
+    assert breaker.state == "half_open"
\ No newline at end of file
@@ -0,0 +1,72 @@
+import sys
+import os
+
+# Add the root directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from spotylog.history import HistoryStore
+from spotylog.sessions import Sessionizer, sessionize
+
+MINUTE = 60 * 1000
+
+def play(minute, artist_ids="imagine_dragons", duration_ms=3 * MINUTE, context_uri="spotify:album:evolve"):
+    return {"played_at": minute * MINUTE, "duration_ms": duration_ms, "artist_ids": artist_ids, "context_uri": context_uri}
+
+# Test sessions are split on idle gaps
+def test_sessionize():
+    plays = [
+        play(0),
+        play(1, artist_ids="jonas_brothers,imagine_dragons"),
+        play(4),
+        play(60, artist_ids="jonas_brothers", context_uri=None),
+    ]
+    sessions = list(sessionize(iter(plays), idle_gap=30 * 60))
+
+    # Assert the 53-minute silence started a new session
+    assert [session.tracks for session in sessions] == [3, 1]
+    first = sessions[0]
+    assert first.start == 0
+    assert first.duration_ms == 7 * MINUTE
+    assert first.artist_id == "imagine_dragons"
+    assert first.context_uri == "spotify:album:evolve"
+
+    # Assert the play cut short by the next one counts as a skip and only up to the next play
+    assert first.skips == 1
+    assert first.listened_ms == (1 + 3 + 3) * MINUTE
+    assert sessions[1].artist_id == "jonas_brothers"
+
+# Test the session artist is the most played one even without a majority
+def test_session_artist_plurality():
+    plays = [play(minute * 3, artist_ids=artist_id) for minute, artist_id in enumerate("AABCD")]
+    session = next(sessionize(plays))
+
+    # Assert the plurality artist wins over the latest ones
+    assert session.artist_id == "A"
+    assert session.context_uri == "spotify:album:evolve"
+
+# Test the sessionizer works incrementally
+def test_sessionizer_incremental():
+    sessionizer = Sessionizer(idle_gap=30 * 60)
+
+    # Assert an open session is kept across feeds until it goes idle
+    assert list(sessionizer.feed([play(0), play(3)])) == []
+    assert sessionizer.flush(now=10 * MINUTE) is None
+    assert list(sessionizer.feed([play(6)])) == []
+    closed = list(sessionizer.feed([play(120)]))
+    assert [session.tracks for session in closed] == [3]
+    assert sessionizer.cursor == 120 * MINUTE
+    assert sessionizer.flush(now=200 * MINUTE).tracks == 1
+    assert sessionizer.flush() is None
+
+# Test sessionizing rows read from the history store
+def test_sessionize_history_store():
+    with HistoryStore(":memory:") as store:
+        track = {"id": "track_id", "name": "Believer", "artists": [{"id": "artist_id", "name": "Imagine Dragons"}], "duration_ms": 204000}
+        store.add([{"track": track, "played_at": played_at} for played_at in
+                   ("2023-10-01T12:00:00Z", "2023-10-01T12:03:24Z", "2023-10-02T12:00:00Z")])
+
+        # Assert stored rows stream straight into sessions
+        sessions = list(sessionize(store.plays()))
+        assert [(session.tracks, session.skips) for session in sessions] == [(2, 0), (1, 0)]
+        assert sessions[0].artist_id == "artist_id"
\ No newline at end of file
@@ -0,0 +1,102 @@
+import sys
+import os
+
+# Add the root directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+import copy
+import threading
+import time
+import pytest
+from spotylog.singleflight import AsyncSingleFlight, SingleFlight
+
+# Test that concurrent identical calls run once and share the result
+def test_single_flight():
+    flight = SingleFlight()
+    calls = []
+    results = []
+
+    def slow_call():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"id": "playlist_id"}
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("playlists/playlist_id", slow_call))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert one call was made and every thread got its result
+    assert len(calls) == 1
+    assert results == [{"id": "playlist_id"}] * 5
+
+# Test that errors are shared with every waiter and the key is released
+def test_single_flight_error():
+    flight = SingleFlight()
+
+    def failing_call():
+        raise ValueError("boom")
+
+    # Assert the error is raised and a later call runs again
+    with pytest.raises(ValueError):
+        flight.do("key", failing_call)
+    assert flight.do("key", lambda: 1) == 1
+
+# Test that concurrent identical coroutines run once
+@pytest.mark.asyncio
+async def test_async_single_flight():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def slow_call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"id": "playlist_id"}
+
+    results = await asyncio.gather(*(flight.do("playlists/playlist_id", slow_call) for _ in range(5)))
+
+    # Assert one call was made and every waiter got its result
+    assert len(calls) == 1
+    assert results == [{"id": "playlist_id"}] * 5
+
+# Test that each waiter gets its own copy of the shared result
+def test_single_flight_copies():
+    flight = SingleFlight(copy=copy.deepcopy)
+    results = []
+
+    def slow_call():
+        time.sleep(0.05)
+        return {"items": []}
+
+    def call():
+        result = flight.do("me/playlists", slow_call)
+        result["items"].append(1)
+        results.append(result)
+
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert every caller changed only its own result
+    assert results == [{"items": [1]}] * 5
+
+# Test that async waiters get their own copy of the shared result
+@pytest.mark.asyncio
+async def test_async_single_flight_copies():
+    flight = AsyncSingleFlight(copy=copy.deepcopy)
+
+    async def slow_call():
+        await asyncio.sleep(0.01)
+        return {"items": []}
+
+    async def call():
+        result = await flight.do("me/playlists", slow_call)
+        result["items"].append(1)
+        return result
+
+    # Assert every caller changed only its own result
+    assert await asyncio.gather(*(call() for _ in range(5))) == [{"items": [1]}] * 5
\ No newline at end of file
@@ -0,0 +1,21 @@
+import sys
+import os
+
+# Add the root directory to sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from spotylog.utils import chunked, format_track_info
+
+# Test format_track_info functionality
+def test_format_track_info():
+    track_data = {"name": "Believer", "artists": [{"name": "Imagine Dragons"}], "album": {"name": "Evolve"}}
+
+    # Assert the track is formatted for display
+    assert format_track_info(track_data) == "Believer by Imagine Dragons"
+
+# Test chunked functionality
+def test_chunked():
+    # Assert items are split into ordered chunks of at most the given size
+    assert chunked(range(5), 2) == [[0, 1], [2, 3], [4]]
+    assert chunked([], 50) == []
\ No newline at end of file